@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Stitched batch OCR benchmark
+
+Compares one tesseract call per image against --batch-size K, where K
+preprocessed images are stitched into one page and OCR'd once. Reports
+throughput for each batch size and the number of images whose cleaned
+text differs from the one-image-at-a-time path. The OCR cache is
+disabled so every image is recognized by tesseract.
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from faa_test_parser import OCR_BACKENDS, ImageProcessor, get_image_files  # noqa: E402
+
+
+def run_batch_size(batch_size: int, image_paths, workers: int, backend: str):
+    """
+    Process every image with one batch size.
+
+    Args:
+        batch_size: Images stitched per OCR call
+        image_paths: List of image file paths
+        workers: Number of worker threads
+        backend: Name of the OCR backend
+
+    Returns:
+        Tuple of (elapsed seconds, dict mapping image path to cleaned text)
+    """
+    processor = ImageProcessor(max_workers=workers, ocr_backend=backend, batch_size=batch_size)
+    try:
+        # Warm up so engine start-up is not attributed to the first batch
+        processor.process_image(image_paths[0])
+        start = time.perf_counter()
+        texts = {path: text for path, _, text, _, _ in processor.iter_results(image_paths)}
+        return time.perf_counter() - start, texts
+    finally:
+        processor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-image and stitched batch OCR")
+    parser.add_argument('--source', '-s', required=True, help='Folder containing question images')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Number of worker threads')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--backend', choices=OCR_BACKENDS, default='pytesseract')
+    parser.add_argument('--show-diffs', action='store_true', help='Print texts that differ from batch size 1')
+    args = parser.parse_args()
+
+    image_paths = get_image_files(Path(args.source).resolve())
+    if not image_paths:
+        sys.exit("No images found")
+
+    baseline_elapsed, baseline = run_batch_size(1, image_paths, args.workers, args.backend)
+    count = len(image_paths)
+    print(f"{'batch':>6}{'images':>8}{'ms/image':>12}{'images/sec':>12}{'speedup':>10}{'mismatches':>12}")
+    print(f"{1:>6}{count:>8}{baseline_elapsed / count * 1000:>12.1f}{count / baseline_elapsed:>12.2f}"
+          f"{1.0:>10.2f}{0:>12}")
+
+    for batch_size in args.batch_sizes:
+        elapsed, texts = run_batch_size(batch_size, image_paths, args.workers, args.backend)
+        mismatches = [path for path in image_paths if texts[path] != baseline[path]]
+        print(f"{batch_size:>6}{count:>8}{elapsed / count * 1000:>12.1f}{count / elapsed:>12.2f}"
+              f"{baseline_elapsed / elapsed:>10.2f}{len(mismatches):>12}")
+        if args.show_diffs:
+            for path in mismatches:
+                print(f"--- {path.name} (batch size 1)\n{baseline[path]}\n+++ {path.name} (batch size {batch_size})\n"
+                      f"{texts[path]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Executor benchmark
+
+Compares ImageProcessor's thread and process executors on a large synthetic
+batch. By default OCR is replaced with a canned-text backend that sleeps for
+--ocr-ms (releasing the GIL like a tesseract subprocess would), so the run
+isolates the Python stages: decode, preprocess, cleanup and parse. Pass
+--real-ocr to use tesseract instead.
+"""
+import argparse
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+import faa_test_parser  # noqa: E402
+from faa_test_parser import ImageProcessor, process_folders_to_csv  # noqa: E402
+
+CANNED_TEXT = """Cc) What is the purpose of the red and green lights on
+the wingtips? :
+A. Cc) To indicate the direction of flight.
+B. . To help identify the aircraft's position at night.
+c. Cc) To warn of a stall.
+"""
+
+
+class CannedBackend:
+    """Stand-in OCR backend returning fixed text after a fixed delay."""
+
+    name = 'canned'
+    delay = 0.0
+
+    def __init__(self, pool_size: int = 1):
+        pass
+
+    def version(self) -> str:
+        return 'canned'
+
+    def image_to_string(self, image, config: str, timeout=None) -> str:
+        time.sleep(self.delay)
+        return CANNED_TEXT
+
+    def close(self) -> None:
+        pass
+
+
+# Registered at import time so process-pool workers see it under any start method
+faa_test_parser.OCR_BACKENDS['canned'] = CannedBackend
+
+
+def render_batch(folder: Path, count: int, width: int, height: int) -> None:
+    """Write count synthetic question screenshots and an answer key to folder."""
+    rng = random.Random(0)
+    for q_num in range(1, count + 1):
+        image = Image.new('RGB', (width, height), (240, 240, 244))
+        draw = ImageDraw.Draw(image)
+        for line in range(4):
+            draw.text((rng.randint(20, 200), 100 + line * 40),
+                      f"Question {q_num} line {line}: what is the VOR radial?", fill=(20, 20, 20))
+        image.save(folder / f"q{q_num}.png")
+    (folder / 'answer-key.md').write_text('\n'.join(f"answer {n}" for n in range(1, count + 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare thread and process executors")
+    parser.add_argument('--count', type=int, default=200, help='Number of synthetic images')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--workers', '-w', type=int, default=None)
+    parser.add_argument('--ocr-ms', type=float, default=0.0, help='Simulated OCR latency per image')
+    parser.add_argument('--real-ocr', action='store_true', help='Use tesseract instead of canned text')
+    args = parser.parse_args()
+
+    CannedBackend.delay = args.ocr_ms / 1000
+    backend = 'pytesseract' if args.real_ocr else 'canned'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        render_batch(folder, args.count, args.width, args.height)
+        print(f"{'executor':<10}{'images':>8}{'seconds':>10}{'images/sec':>12}")
+        for executor in ('thread', 'process'):
+            processor = ImageProcessor(max_workers=args.workers, executor=executor, ocr_backend=backend)
+            try:
+                start = time.perf_counter()
+                process_folders_to_csv([folder], processor)
+                elapsed = time.perf_counter() - start
+            finally:
+                processor.close()
+            print(f"{executor:<10}{args.count:>8}{elapsed:>10.2f}{args.count / elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
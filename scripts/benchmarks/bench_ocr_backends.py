@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+OCR backend benchmark
+
+Measures per-image OCR throughput of each ImageProcessor backend over a
+folder of question screenshots. The OCR cache is disabled so every image
+is recognized by tesseract. Per-image latencies come from the stage
+timings of each image, and the speedup is relative to the first backend.
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from faa_test_parser import OCR_BACKENDS, ImageProcessor, get_image_files, percentile  # noqa: E402
+
+
+def run_backend(backend: str, image_paths, workers: int, preprocessing: bool) -> Tuple[float, List[float]]:
+    """
+    Process every image with one backend.
+
+    Args:
+        backend: Name of the OCR backend
+        image_paths: List of image file paths
+        workers: Number of worker threads
+        preprocessing: Whether to preprocess images before OCR
+
+    Returns:
+        Tuple of (elapsed wall-clock seconds, sorted per-image seconds)
+    """
+    processor = ImageProcessor(max_workers=workers, enable_preprocessing=preprocessing,
+                               ocr_backend=backend, collect_stats=True)
+    latencies = []
+    try:
+        # Warm up so engine start-up is not attributed to the first batch
+        processor.process_image(image_paths[0])
+        processor.pop_stage_times(image_paths[0])
+        processor.stats_hooks.append(lambda record: latencies.append(record['total']))
+        start = time.perf_counter()
+        processor.process_images_parallel(image_paths)
+        return time.perf_counter() - start, sorted(latencies)
+    finally:
+        processor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR backend throughput")
+    parser.add_argument('--source', '-s', required=True, help='Folder containing question images')
+    parser.add_argument('--workers', '-w', type=int, default=4, help='Number of worker threads')
+    parser.add_argument('--backends', nargs='+', choices=OCR_BACKENDS, default=list(OCR_BACKENDS))
+    parser.add_argument('--no-preprocessing', action='store_true')
+    args = parser.parse_args()
+
+    image_paths = get_image_files(Path(args.source).resolve())
+    if not image_paths:
+        sys.exit("No images found")
+
+    print(f"{'backend':<14}{'images':>8}{'ms/image':>12}{'images/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'speedup':>9}")
+    baseline = None
+    for backend in args.backends:
+        try:
+            elapsed, latencies = run_backend(backend, image_paths, args.workers, not args.no_preprocessing)
+        except RuntimeError as e:
+            print(f"{backend:<14}skipped: {e}")
+            continue
+        count = len(image_paths)
+        rate = count / elapsed
+        baseline = baseline or rate
+        print(f"{backend:<14}{count:>8}{elapsed / count * 1000:>12.1f}{rate:>12.2f}"
+              f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}"
+              f"{rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+OCR cleanup benchmark
+
+Times ImageProcessor.postprocess_ocr_text against the original sequential
+re.sub implementation and checks that both produce identical output over a
+corpus of realistic OCR text plus randomly generated artifact strings.
+"""
+import argparse
+from pathlib import Path
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from faa_test_parser import ImageProcessor  # noqa: E402
+
+SAMPLE_TEXT = """Cc) What is the purpose of the red and green lights on
+the wingtips? :
+A. Cc) To indicate the direction of flight.
+B. . To help identify the aircraft's position at night.
+c. Cc) To warn of a stall.
+"""
+
+ARTIFACT_TOKENS = [
+    'C', 'c', 'Cc', ')', 'D', 'O', 'o', '0', ' ', '  ', '\n', '\n', '\t', ':', ';', '.', "'", '>',
+    '-', '_', 'A', 'B', 'a', 'b', 'x', 'lift', 'Cc)', '. ', 'A. ', '? ', '\n\n', ' \n', '9,500',
+    'C >', '.C', 'c.', 'feet MSL', 'VOR',
+]
+
+
+def legacy_postprocess(text: str) -> str:
+    """
+    Clean OCR text by removing common artifacts and unwanted characters.
+    
+    Args:
+        text: Raw OCR text
+        
+    Returns:
+        Cleaned text
+    """
+    # Remove OCR noise
+    # Patterns like "CD)", "Cc)", "0)", "O)", "A. Cc)", ". Cc)", etc.
+    text = re.sub(r'[CDOo0]+\s*\)', '', text)
+    text = re.sub(r'0\s+0\s*:', '', text)
+    text = re.sub(r'0\s+0\s*', '', text)
+
+    # Remove "Cc)" and "Cc" artifacts in various contexts
+    text = re.sub(r'Cc\s*\)', '', text)                                     # Remove "Cc)" anywhere
+    text = re.sub(r'[A-Z]\.\s*Cc\)', '', text)                              # Remove "A. Cc)", "B. Cc)", etc.
+    text = re.sub(r'\.\s*Cc\)', '', text)                                   # Remove ". Cc)"
+    text = re.sub(r'c\.\s*Cc\)', '', text)                                  # Remove "c. Cc)" (lowercase)
+    text = re.sub(r'\s+Cc\s+', ' ', text)                                   # Remove " Cc " (with spaces on both sides)
+    text = re.sub(r'^Cc\s+', '', text, flags=re.MULTILINE)                  # Remove "Cc " at start of line
+
+    # Remove ".C >)" and ".C >" patterns
+    text = re.sub(r'\.\s*C\s*>\s*\)', '', text)                             # Remove ".C >)"
+    text = re.sub(r'\.\s*C\s*>', '', text)                                  # Remove ".C >"
+    text = re.sub(r'\s+\.\s*C\s*>', '', text)                               # Remove " .C >" (with leading space)
+
+    # Remove "-C _)" pattern
+    text = re.sub(r'-C\s*_\s*\)', '', text)                                 # Remove "-C _)"
+
+    # Remove standalone colons that are OCR artifacts (before removing answer prefixes)
+    text = re.sub(r'^:\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone ":"
+    text = re.sub(r'^;\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone ";"
+    text = re.sub(r'\n:\s*\n', '\n', text)                                  # Remove ":" on its own line
+    text = re.sub(r'\n;\s*\n', '\n', text)                                  # Remove ";" on its own line
+    text = re.sub(r'\s+:\s+([a-zA-Z0-9])', r' \1', text)                    # " : lift" -> " lift" (colon artifact)
+    text = re.sub(r'\.\s*:\s+([a-zA-Z0-9])', r'. \1', text)                 # ". : lift" -> ". lift"
+    text = re.sub(r'^\.\s+', '', text, flags=re.MULTILINE)                  # Remove ". " at start of line
+    text = re.sub(r'\n\.\s+', '\n', text)                                   # Remove ". " after newline
+    text = re.sub(r"^'\s+", '', text, flags=re.MULTILINE)                   # Remove "' " at start of line
+    text = re.sub(r"\n'\s+", '\n', text)                                    # Remove "' " after newline
+
+    # Remove standalone c that appear without content
+    text = re.sub(r'^c\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone "c"
+    text = re.sub(r'\nc\s*\n', '\n', text)                                  # Remove "c" on its own line
+
+    # Remove answer choice prefixes (A., B., C., Cc., a., b., c., etc.) EVERYWHERE
+    # These come from the OCR picking up the letter labels on answer choices
+    text = re.sub(r'\b[ABCabc]\.\s+', '', text)                             # Remove "A. " to "C. ", any case, anywhere
+    text = re.sub(r'\bCc\.\s+', '', text)                                   # Remove "Cc. " anywhere
+
+    # Also handle lowercase "c " or "c." that might be standalone answer markers
+    text = re.sub(r'\bc\s+(?=[a-z])', '', text)                             # Drop "c " before lowercase (answer marker)
+
+    # Clean up multiple spaces but preserve newlines
+    text = re.sub(r'[ \t]+', ' ', text)
+
+    # Clean up multiple newlines
+    text = re.sub(r'\n\s*\n', '\n', text)
+
+    lines = text.split('\n')
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+        # Skip lines that are just a single character (likely OCR artifacts)
+        if len(line) == 1 and line in '0Oo':
+            continue
+        # Skip empty lines
+        if not line:
+            continue
+        cleaned_lines.append(line)
+
+    return '\n'.join(cleaned_lines)
+
+
+def build_corpus(size: int, seed: int):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        if rng.random() < 0.5:
+            corpus.append(SAMPLE_TEXT.replace('wingtips', rng.choice(['wingtips', 'tail', 'VOR'])))
+        else:
+            corpus.append(''.join(rng.choice(ARTIFACT_TOKENS) for _ in range(rng.randint(0, 60))))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR text cleanup")
+    parser.add_argument('--size', type=int, default=100000, help='Number of corpus strings')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, args.seed)
+    processor = ImageProcessor()
+
+    mismatches = 0
+    for text in corpus:
+        if legacy_postprocess(text) != processor.postprocess_ocr_text(text):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH: {text!r}")
+
+    for name, func in (('legacy', legacy_postprocess), ('rule table', processor.postprocess_ocr_text)):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12}{elapsed / len(corpus) * 1e6:>10.1f} us/text")
+
+    print(f"{mismatches} mismatching outputs out of {len(corpus)}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
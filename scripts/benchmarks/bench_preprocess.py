@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Preprocessing benchmark
+
+Compares the original three-pass ImageEnhance preprocessing with
+ImageProcessor.preprocess_image: per-image time, peak RSS growth and the
+largest pixel difference between the two outputs. Each variant runs in its
+own subprocess so peak memory readings do not bleed into each other.
+"""
+import argparse
+from multiprocessing import get_context
+from pathlib import Path
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageChops, ImageDraw, ImageEnhance  # noqa: E402
+
+from faa_test_parser import ImageProcessor, get_image_files  # noqa: E402
+
+
+def legacy_preprocess(image: Image.Image) -> Image.Image:
+    """The original three-pass ImageEnhance pipeline."""
+    if image.mode != 'L':
+        image = image.convert('L')
+    image = ImageEnhance.Contrast(image).enhance(ImageProcessor.CONTRAST_FACTOR)
+    image = ImageEnhance.Brightness(image).enhance(ImageProcessor.BRIGHTNESS_FACTOR)
+    return ImageEnhance.Sharpness(image).enhance(ImageProcessor.SHARPNESS_FACTOR)
+
+
+def synthetic_screenshot(width: int, height: int, seed: int) -> Image.Image:
+    """Render a noisy screenshot-like RGB image with scattered text."""
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), (236, 236, 240))
+    draw = ImageDraw.Draw(image)
+    for _ in range(height // 20):
+        shade = rng.randint(0, 90)
+        draw.text((rng.randint(0, width - 300), rng.randint(0, height - 20)),
+                  "What is the VOR radial at 9,500 feet MSL?", fill=(shade, shade, shade))
+    for _ in range(width * height // 100):
+        value = rng.randrange(256)
+        image.putpixel((rng.randrange(width), rng.randrange(height)), (value, value, value))
+    return image
+
+
+def load_images(source: str, count: int, width: int, height: int):
+    if source:
+        images = []
+        for path in get_image_files(Path(source).resolve())[:count]:
+            with Image.open(path) as img:
+                img.load()
+                images.append(img)
+        return images
+    return [synthetic_screenshot(width, height, seed) for seed in range(count)]
+
+
+def measure(variant: str, source: str, count: int, width: int, height: int, repeat: int, result_queue):
+    images = load_images(source, count, width, height)
+    processor = ImageProcessor(binarize=(variant == 'fused+otsu'))
+    preprocess = legacy_preprocess if variant == 'legacy' else processor.preprocess_image
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for image in images:
+            preprocess(image)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    max_diff = 0
+    if variant == 'fused':
+        for image in images:
+            diff = ImageChops.difference(legacy_preprocess(image), processor.preprocess_image(image))
+            max_diff = max(max_diff, diff.getextrema()[1])
+    result_queue.put((elapsed / (repeat * len(images)), peak_rss, max_diff))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image preprocessing")
+    parser.add_argument('--source', '-s', help='Folder of real screenshots (default: synthetic images)')
+    parser.add_argument('--count', type=int, default=20, help='Number of images')
+    parser.add_argument('--width', type=int, default=2560)
+    parser.add_argument('--height', type=int, default=1440)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    ctx = get_context('spawn')
+    print(f"{'variant':<12}{'ms/image':>10}{'peak RSS growth (KiB)':>24}{'max pixel diff':>16}")
+    for variant in ('legacy', 'fused', 'fused+otsu'):
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=measure, args=(variant, args.source, args.count, args.width,
+                                                 args.height, args.repeat, result_queue))
+        proc.start()
+        per_image, peak_rss, max_diff = result_queue.get()
+        proc.join()
+        diff = str(max_diff) if variant == 'fused' else '-'
+        print(f"{variant:<12}{per_image * 1000:>10.1f}{peak_rss:>24}{diff:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite
+
+Renders a deterministic synthetic corpus (see corpus.py) and times
+ImageProcessor over it: every pipeline stage (decode, preprocess, OCR,
+cleanup, parse) through the --stats instrumentation, plus the end-to-end
+process_images_parallel and process_folder_to_csv paths. Results are
+written as JSON, tagged with the git commit, so runs on different commits
+can be compared with --compare.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from corpus import LENGTHS, NOISE_LEVELS, RESOLUTIONS, render_corpus  # noqa: E402
+from bench_executors import CannedBackend  # noqa: E402,F401  (registers the 'canned' backend)
+from faa_test_parser import (OCR_BACKENDS, ImageProcessor, StatsReport, get_image_files,  # noqa: E402
+                             process_folders_to_csv)
+
+
+def git_commit() -> str:
+    """Commit of the working tree, with a '+dirty' suffix if it has changes."""
+    repo = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+dirty' if dirty else '')
+
+
+def run_path(name: str, folder: Path, processor_kwargs: dict, repeat: int) -> dict:
+    """
+    Time one end-to-end path over the corpus.
+
+    Args:
+        name: 'process_images_parallel' or 'process_folder_to_csv'
+        folder: Corpus folder
+        processor_kwargs: ImageProcessor arguments
+        repeat: Number of timed runs; stage stats come from the fastest
+
+    Returns:
+        Dictionary with every run's seconds, the best, images/sec and per-stage stats
+    """
+    image_paths = get_image_files(folder)
+    runs = []
+    best = None
+    for _ in range(repeat):
+        processor = ImageProcessor(collect_stats=True, **processor_kwargs)
+        report = StatsReport()
+        processor.stats_hooks.append(report)
+        try:
+            start = time.perf_counter()
+            if name == 'process_images_parallel':
+                processor.process_images_parallel(image_paths)
+            else:
+                process_folders_to_csv([folder], processor, incremental=False)
+            elapsed = time.perf_counter() - start
+        finally:
+            processor.close()
+        report.finish()
+        runs.append(elapsed)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, report.summary())
+
+    elapsed, summary = best
+    return {
+        'seconds': runs,
+        'best': elapsed,
+        'images_per_sec': len(image_paths) / elapsed,
+        'stages': summary['stages'],
+        'slowest': summary['slowest'],
+    }
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Print how current differs from a baseline result file."""
+    print(f"\nCompared with {baseline['meta']['commit']} (ratio < 1 is faster now):")
+    print(f"{'path':<26}{'stage':<16}{'baseline ms':>13}{'current ms':>12}{'ratio':>8}")
+    for path, result in current['results'].items():
+        old = baseline['results'].get(path)
+        if old is None:
+            continue
+        print(f"{path:<26}{'total':<16}{old['best'] * 1000:>13.1f}{result['best'] * 1000:>12.1f}"
+              f"{result['best'] / old['best']:>8.2f}")
+        for stage, stats in result['stages'].items():
+            if stage not in old['stages']:
+                continue
+            before, after = old['stages'][stage]['wall']['p50'], stats['wall']['p50']
+            ratio = f"{after / before:>8.2f}" if before else f"{'-':>8}"
+            print(f"{'':<26}{stage + ' p50':<16}{before * 1000:>13.2f}{after * 1000:>12.2f}{ratio}")
+
+
+def parse_resolution(value: str):
+    width, _, height = value.partition('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageProcessor on a synthetic FAA-style corpus")
+    parser.add_argument('--count', type=int, default=60, help='Number of synthetic question images')
+    parser.add_argument('--resolutions', type=parse_resolution, nargs='+', default=RESOLUTIONS,
+                        metavar='WxH', help='Screenshot sizes to cycle through')
+    parser.add_argument('--noise', type=float, nargs='+', default=NOISE_LEVELS,
+                        help='Fractions of noisy pixels to cycle through')
+    parser.add_argument('--lengths', nargs='+', choices=list(LENGTHS), default=list(LENGTHS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', '-w', type=int, default=None)
+    parser.add_argument('--executor', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--backend', choices=sorted(OCR_BACKENDS), default='pytesseract',
+                        help="OCR backend; 'canned' skips tesseract to isolate the Python stages")
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per path; the fastest is reported')
+    parser.add_argument('--corpus-dir', help='Keep the corpus in this folder instead of a temporary one')
+    parser.add_argument('--output', '-o', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(args.corpus_dir or tmp).resolve()
+        start = time.perf_counter()
+        render_corpus(folder, args.count, args.resolutions, args.noise, args.lengths, args.seed)
+        print(f"Rendered {args.count} images in {time.perf_counter() - start:.1f} s")
+
+        processor_kwargs = dict(max_workers=args.workers, executor=args.executor, ocr_backend=args.backend)
+        probe = ImageProcessor(**processor_kwargs)
+        try:
+            settings = json.loads(probe.cache_settings())
+            workers, ocr_threads = probe.max_workers, probe.ocr_threads
+        finally:
+            probe.close()
+
+        results = {
+            'meta': {
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'workers': workers,
+                'ocr_threads': ocr_threads,
+                'executor': args.executor,
+                'settings': settings,
+            },
+            'corpus': {
+                'count': args.count,
+                'resolutions': [list(size) for size in args.resolutions],
+                'noise': args.noise,
+                'lengths': args.lengths,
+                'seed': args.seed,
+            },
+            'results': {},
+        }
+
+        print(f"{'path':<26}{'images':>8}{'best s':>10}{'images/sec':>12}")
+        for name in ('process_images_parallel', 'process_folder_to_csv'):
+            result = run_path(name, folder, processor_kwargs, args.repeat)
+            results['results'][name] = result
+            print(f"{name:<26}{args.count:>8}{result['best']:>10.2f}{result['images_per_sec']:>12.2f}")
+            for stage, stats in result['stages'].items():
+                wall = stats['wall']
+                print(f"  {stage:<12}p50 {wall['p50'] * 1000:8.2f} ms   p95 {wall['p95'] * 1000:8.2f} ms   "
+                      f"cpu {stats['cpu']['total']:7.2f} s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+        print(f"Wrote {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Synthetic FAA-style question corpus
+
+Renders deterministic knowledge-test screenshots: a question stem followed by
+three lettered options, drawn on a light background at a chosen resolution,
+text length and noise level. The same seed always produces the same pixels,
+so runs on different commits OCR identical images. Each corpus folder gets
+an answer key and a labels.json with the ground-truth text of every image.
+"""
+import json
+from pathlib import Path
+import random
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+STEMS = [
+    "What is the purpose of the red and green lights on the wingtips",
+    "Which airspeed indicator marking identifies the maximum flap extended speed",
+    "When flying over a congested area, what minimum altitude must be maintained",
+    "What effect does high density altitude have on aircraft performance",
+    "Which VOR radial is the aircraft on if the CDI centers with a TO indication",
+    "What action is required when two aircraft approach each other head-on",
+    "How should a pilot correct for a left crosswind during the landing flare",
+    "What is the standard temperature lapse rate in the troposphere",
+    "Which cloud type indicates the greatest turbulence and possible hail",
+    "What is the recommended entry to a nontowered airport traffic pattern",
+]
+
+OPTIONS = [
+    "To indicate the direction of flight",
+    "To help identify the aircraft's position at night",
+    "To warn of an approaching stall",
+    "The upper limit of the white arc",
+    "1,000 feet above the highest obstacle within 2,000 feet",
+    "Takeoff distance increases and climb performance decreases",
+    "Both aircraft alter course to the right",
+    "Lower the upwind wing and apply opposite rudder",
+    "2 degrees Celsius per 1,000 feet",
+    "Cumulonimbus",
+    "45 degrees to the downwind leg at pattern altitude",
+    "The 175 radial",
+]
+
+# Sentences appended to the stem for longer questions
+CLAUSES = [
+    "given a pressure altitude of 4,500 feet and a temperature of 30 degrees Celsius",
+    "assuming the aircraft is operating at maximum gross weight",
+    "while operating under visual flight rules in Class E airspace",
+    "refer to the figure and the chart supplement excerpt",
+]
+
+LENGTHS = {'short': 0, 'medium': 1, 'long': 3}
+RESOLUTIONS = [(1280, 720), (1920, 1080), (2560, 1440)]
+NOISE_LEVELS = [0.0, 0.02, 0.05]
+
+
+def load_font(size: int) -> ImageFont.ImageFont:
+    """Load Pillow's bundled font at a size, or its fixed bitmap font without FreeType."""
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, OSError, ImportError):
+        return ImageFont.load_default()
+
+
+def wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, width: int) -> List[str]:
+    """Break text into lines no wider than width pixels."""
+    lines = []
+    line = ''
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if line and draw.textlength(candidate, font=font) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+
+def question_text(rng: random.Random, length: str) -> Tuple[str, List[str]]:
+    """Pick a question stem and three options."""
+    stem = rng.choice(STEMS)
+    clauses = rng.sample(CLAUSES, LENGTHS[length])
+    if clauses:
+        stem = f"{stem}, {', '.join(clauses)}"
+    return stem + "?", rng.sample(OPTIONS, 3)
+
+
+def render_question(question: str, options: List[str], size: Tuple[int, int], noise: float,
+                    rng: random.Random) -> Image.Image:
+    """
+    Draw one question screenshot.
+
+    Args:
+        question: Question stem
+        options: Option texts, lettered A to C
+        size: (width, height) of the screenshot
+        noise: Fraction of pixels replaced with random gray values
+        rng: Random source for layout and noise
+
+    Returns:
+        RGB image
+    """
+    width, height = size
+    image = Image.new('RGB', size, (rng.randint(236, 250),) * 3)
+    draw = ImageDraw.Draw(image)
+    font = load_font(max(12, height // 40))
+    line_height = int(font.size * 1.6) if hasattr(font, 'size') else 16
+    left = rng.randint(width // 20, width // 8)
+    text_width = width - 2 * left
+    y = rng.randint(height // 12, height // 6)
+
+    for line in wrap(draw, question, font, text_width):
+        draw.text((left, y), line, font=font, fill=(20, 20, 20))
+        y += line_height
+    y += line_height
+    for letter, option in zip('ABC', options):
+        for index, line in enumerate(wrap(draw, f"{letter}. {option}.", font, text_width)):
+            draw.text((left + (0 if index == 0 else line_height), y), line, font=font, fill=(20, 20, 20))
+            y += line_height
+        y += line_height // 2
+
+    if noise:
+        pixels = image.load()
+        for _ in range(int(width * height * noise)):
+            value = rng.randrange(256)
+            pixels[rng.randrange(width), rng.randrange(height)] = (value, value, value)
+    return image
+
+
+def corpus_variants(resolutions: List[Tuple[int, int]], noise_levels: List[float],
+                    lengths: List[str]) -> List[Dict]:
+    """Every combination of resolution, noise level and length."""
+    return [{'width': width, 'height': height, 'noise': noise, 'length': length}
+            for width, height in resolutions for noise in noise_levels for length in lengths]
+
+
+def render_corpus(folder: Path, count: int, resolutions: List[Tuple[int, int]] = RESOLUTIONS,
+                  noise_levels: List[float] = NOISE_LEVELS, lengths: List[str] = tuple(LENGTHS),
+                  seed: int = 0) -> List[Dict]:
+    """
+    Write a practice-test folder of synthetic question images.
+
+    Images cycle through every combination of resolution, noise level and
+    length. The folder gets q1.png..qN.png, an answer-key.md and a labels.json
+    holding each image's parameters and ground-truth text.
+
+    Args:
+        folder: Folder to write to
+        count: Number of question images
+        resolutions: (width, height) sizes to cycle through
+        noise_levels: Noise fractions to cycle through
+        lengths: Names from LENGTHS to cycle through
+        seed: Base random seed
+
+    Returns:
+        One dictionary per image with 'image', the variant parameters, 'question' and 'options'
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    variants = corpus_variants(resolutions, noise_levels, lengths)
+    entries = []
+    answers = []
+    for q_num in range(1, count + 1):
+        rng = random.Random(f"{seed}-{q_num}")
+        variant = variants[(q_num - 1) % len(variants)]
+        question, options = question_text(rng, variant['length'])
+        image = render_question(question, options, (variant['width'], variant['height']), variant['noise'], rng)
+        image.save(folder / f"q{q_num}.png")
+        answers.append(rng.choice(options))
+        entries.append(dict(variant, image=f"q{q_num}.png", question=question, options=options))
+
+    (folder / 'answer-key.md').write_text('\n'.join(answers) + '\n', encoding='utf-8')
+    (folder / 'labels.json').write_text(json.dumps(entries, indent=1), encoding='utf-8')
+    return entries
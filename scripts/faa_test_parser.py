@@ -7,16 +7,46 @@ using OCR. Processes question images in parallel and exports to CSV format
 when paired with an answer key file.
 """
 import argparse
+import asyncio
+import base64
+import binascii
+import bisect
+import collections
+import contextlib
 import csv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import ctypes
+import ctypes.util
+import difflib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import errno
+import functools
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import ipaddress
+import itertools
+import json
 import logging
+import os
 from pathlib import Path
+import platform
+import queue
 import re
+import select
+import shlex
+import sqlite3
+import struct
+import subprocess
 import sys
-from typing import Dict, List, Tuple, Optional
+import tempfile
+import threading
+import time
+import urllib.request
+import weakref
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 
 try:
-    from PIL import Image, ImageEnhance
+    from PIL import Image, ImageFilter
 except ImportError:
     print("Error: PIL (Pillow) is not installed. Please run: pip install -r requirements.txt")
     sys.exit(1)
@@ -27,533 +57,5342 @@ except ImportError:
     print("Error: pytesseract is not installed. Please run: pip install -r requirements.txt")
     sys.exit(1)
 
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_TESSERACT_CONFIG = '--oem 3 --psm 3'
+# First pass of two-tier OCR: LSTM only, one uniform block of text (no layout analysis)
+DEFAULT_FAST_TESSERACT_CONFIG = '--oem 1 --psm 6'
+# Mean word confidence (0-100) a fast-pass result needs to skip the second pass
+DEFAULT_MIN_CONFIDENCE = 80.0
+# Retry of an image whose OCR exceeded --ocr-timeout: downscaled, binarized, no layout analysis
+DEFAULT_FALLBACK_TESSERACT_CONFIG = '--oem 1 --psm 6'
+DEFAULT_FALLBACK_DOWNSCALE = 0.5
+
+# Result text of an image that could not be OCR'd, and of one whose OCR timed out even on retry
+ERROR_PREFIX = "ERROR:"
+TIMEOUT_PREFIX = "TIMEOUT:"
+FAILURE_PREFIXES = (ERROR_PREFIX, TIMEOUT_PREFIX)
+
 SUPPORTED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif'}
+# Each page of a multi-page TIFF is a separate image, referenced as '<file name>#<page>'
+MULTIPAGE_EXTENSIONS = {'.tiff', '.tif'}
+PAGE_REFERENCE_PATTERN = re.compile(r'^(.+\.tiff?)#(\d+)$', re.IGNORECASE)
 
+# Formats tesseract (leptonica) decodes itself, so unmodified images can be passed by path
+PASSTHROUGH_FORMATS = {'PNG', 'JPEG', 'BMP', 'TIFF'}
+
+DEFAULT_TARGET_LINE_HEIGHT = 36
+DEFAULT_SCALE_BOUNDS = (0.25, 1.5)
+DEFAULT_CROP_MARGIN = 16
+
+# OCR cleanup rules applied in order by postprocess_ocr_text:
+# (pattern, replacement, regex flags, guards). Guards are literals of which at least one
+# must be present for the pattern to match at all (None = always run). Order matters;
+# most neighbouring rules cannot be merged into one alternation without changing output.
+CLEANUP_RULES = [
+    # Remove OCR noise
+    # Patterns like "CD)", "Cc)", "0)", "O)", "A. Cc)", ". Cc)", etc.
+    (r'[CDOo0]+\s*\)', '', 0, (')',)),
+    (r'0\s+0\s*:', '', 0, (':',)),
+    (r'0\s+0\s*', '', 0, ('0',)),
+
+    # Remove "Cc)" and "Cc" artifacts in various contexts
+    (r'Cc\s*\)', '', 0, ('Cc',)),                                        # Remove "Cc)" anywhere
+    (r'[A-Z]\.\s*Cc\)', '', 0, ('Cc)',)),                                # Remove "A. Cc)", "B. Cc)", etc.
+    (r'\.\s*Cc\)', '', 0, ('Cc)',)),                                     # Remove ". Cc)"
+    (r'c\.\s*Cc\)', '', 0, ('Cc)',)),                                    # Remove "c. Cc)" (lowercase)
+    (r'\s+Cc\s+', ' ', 0, ('Cc',)),                                      # Remove " Cc " (with spaces on both sides)
+    (r'^Cc\s+', '', re.MULTILINE, ('Cc',)),                              # Remove "Cc " at start of line
+
+    # Remove ".C >)" and ".C >" patterns
+    (r'\.\s*C\s*>\s*\)', '', 0, ('>',)),                                # Remove ".C >)"
+    (r'\.\s*C\s*>', '', 0, ('>',)),                                      # Remove ".C >"
+    (r'\s+\.\s*C\s*>', '', 0, ('>',)),                                   # Remove " .C >" (with leading space)
+
+    # Remove "-C _)" pattern
+    (r'-C\s*_\s*\)', '', 0, ('-C',)),                                    # Remove "-C _)"
+
+    # Remove standalone colons that are OCR artifacts (before removing answer prefixes)
+    (r'^[:;]\s*$', '', re.MULTILINE, (':', ';')),                        # Remove standalone ":" or ";"
+    (r'\n[:;]\s*\n', '\n', 0, (':', ';')),                                # Remove ":" or ";" on its own line
+    (r'\s+:\s+([a-zA-Z0-9])', r' \1', 0, (':',)),                        # " : lift" -> " lift" (remove colon artifact)
+    (r'\.\s*:\s+([a-zA-Z0-9])', r'. \1', 0, (':',)),                     # ". : lift" -> ". lift"
+    (r'^\.\s+', '', re.MULTILINE, ('.',)),                               # Remove ". " at start of line
+    (r'\n\.\s+', '\n', 0, ('\n.',)),                                      # Remove ". " after newline
+    (r"^'\s+", '', re.MULTILINE, ("'",)),                                # Remove "' " at start of line
+    (r"\n'\s+", '\n', 0, ("\n'",)),                                       # Remove "' " after newline
+
+    # Remove standalone c that appear without content
+    (r'^c\s*$', '', re.MULTILINE, ('c',)),                               # Remove standalone "c"
+    (r'\nc\s*\n', '\n', 0, ('\nc',)),                                     # Remove "c" on its own line
+
+    # Remove answer choice prefixes (A., B., C., Cc., a., b., c., etc.) EVERYWHERE
+    # These come from the OCR picking up the letter labels on answer choices
+    (r'\b[ABCabc]\.\s+', '', 0, ('.',)),                                 # Remove "A. " to "C. ", any case, anywhere
+    (r'\bCc\.\s+', '', 0, ('Cc.',)),                                     # Remove "Cc. " anywhere
+
+    # Also handle lowercase "c " or "c." that might be standalone answer markers
+    (r'\bc\s+(?=[a-z])', '', 0, ('c',)),                                 # Drop "c " before lowercase (answer marker)
+
+    # Clean up multiple spaces but preserve newlines (single spaces are left alone)
+    (r'[ \t]{2,}|\t', ' ', 0, None),
+
+    # Clean up multiple newlines
+    (r'\n\s*\n', '\n', 0, ('\n',)),
+]
+
+COMPILED_CLEANUP_RULES = [
+    (re.compile(pattern, flags), replacement, guards)
+    for pattern, replacement, flags, guards in CLEANUP_RULES
+]
+
+# Identifies the rule set, so cached cleaned text produced by older rules is re-cleaned
+CLEANUP_RULES_VERSION = hashlib.sha256(repr(CLEANUP_RULES).encode()).hexdigest()[:16]
+
+SINGLE_CHAR_ARTIFACTS = {'0', 'O', 'o'}
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'faa-test-parser'
+DEFAULT_CACHE_MAX_MB = 512
+
+# dHash grid (columns x rows) over the cropped text region: 1024 bits
+PHASH_GRID = (64, 16)
+DEFAULT_PHASH_THRESHOLD = 0
+
+# White space between question images stitched into one page for --batch-size
+STITCH_GAP = 64
+# Tesseract rejects images taller than 32767 pixels
+MAX_STITCH_HEIGHT = 30000
+
+# Pipeline stages timed with --stats, in pipeline order
+STATS_STAGES = ('lookup', 'decode', 'preprocess', 'ocr', 'escalate', 'retry', 'cleanup', 'parse')
+DEFAULT_STATS_TOP_N = 10
+
+DEFAULT_CONFIG_DIR = Path(os.environ.get('XDG_CONFIG_HOME', Path.home() / '.config')) / 'faa-test-parser'
+AUTOTUNE_FILE = DEFAULT_CONFIG_DIR / 'autotune.json'
+DEFAULT_AUTOTUNE_SAMPLE = 8
+# Autotune samples at least this many images per worker of the largest candidate, so no worker sits idle
+AUTOTUNE_IMAGES_PER_WORKER = 4
+
+
+def file_sha256(file_path: Path) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _file_sha256_at(file_path: Path, size: int, mtime_ns: int) -> str:
+    # Keyed by size and mtime so a rewritten file is hashed again
+    return file_sha256(file_path)
 
-class ImageProcessor:
-    """Handles image processing and OCR operations."""
 
-    def __init__(self, max_workers: int = None, enable_preprocessing: bool = True):
+class OCRCache:
+    """Content-addressed on-disk cache of OCR results."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
         """
-        Initialize the image processor.
+        Initialize the OCR cache.
 
         Args:
-            max_workers: Maximum number of worker threads. Defaults to CPU count.
-            enable_preprocessing: Whether to apply image preprocessing for better OCR
+            cache_dir: Directory where cache entries are stored
+            max_bytes: Total size the cache may grow to before old entries are evicted
         """
-        self.max_workers = max_workers
-        self.enable_preprocessing = enable_preprocessing
-        self.tesseract_config = '--oem 3 --psm 3'
+        self.cache_dir = Path(cache_dir) / 'ocr'
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
 
-    def preprocess_image(self, image: Image.Image) -> Image.Image:
+    def __reduce__(self):
+        # Lets process-pool workers open the same cache directory
+        return (OCRCache, (self.cache_dir.parent, self.max_bytes))
+
+    def make_key(self, image_path: Path, settings: str) -> str:
         """
-        Preprocess image to improve OCR accuracy.
-        
+        Build a cache key from the image content and the OCR settings.
+
         Args:
-            image: PIL Image object
-            
+            image_path: Path to the image file
+            settings: Fingerprint of every setting that affects OCR output
+
         Returns:
-            Preprocessed PIL Image object
+            Hex digest identifying the cache entry
         """
-        # Convert to grayscale
-        if image.mode != 'L':
-            image = image.convert('L')
+        digest = hashlib.sha256()
+        file_path, page = split_page_reference(image_path)
+        if page is None:
+            digest.update(file_sha256(image_path).encode())
+        else:
+            # All pages of a TIFF share one hash of the file
+            stat = file_path.stat()
+            digest.update(f"{_file_sha256_at(file_path, stat.st_size, stat.st_mtime_ns)}#{page}".encode())
+        digest.update(b'\0')
+        digest.update(settings.encode())
+        return digest.hexdigest()
 
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(1.5)
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
 
-        enhancer = ImageEnhance.Brightness(image)
-        image = enhancer.enhance(1.1)
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        Look up a cache entry.
 
-        enhancer = ImageEnhance.Sharpness(image)
-        image = enhancer.enhance(1.5)
+        Args:
+            key: Cache key from make_key()
 
-        return image
+        Returns:
+            Dictionary with 'raw' and 'cleaned' text, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Bump mtime so eviction drops the least recently used entries first
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return entry
 
-    def postprocess_ocr_text(self, text: str) -> str:
+    def put(self, key: str, raw_text: str, cleaned_text: str, extra: Optional[Dict] = None) -> None:
         """
-        Clean OCR text by removing common artifacts and unwanted characters.
-        
+        Store an OCR result, evicting old entries if the cache grows too large.
+
         Args:
-            text: Raw OCR text
-            
-        Returns:
-            Cleaned text
+            key: Cache key from make_key()
+            raw_text: Text as returned by tesseract
+            cleaned_text: Text after postprocess_ocr_text()
+            extra: Optional JSON-serializable metadata stored alongside the text
         """
-        # Remove OCR noise
-        # Patterns like "CD)", "Cc)", "0)", "O)", "A. Cc)", ". Cc)", etc.
-        text = re.sub(r'[CDOo0]+\s*\)', '', text)
-        text = re.sub(r'0\s+0\s*:', '', text)
-        text = re.sub(r'0\s+0\s*', '', text)
-
-        # Remove "Cc)" and "Cc" artifacts in various contexts
-        text = re.sub(r'Cc\s*\)', '', text)                                     # Remove "Cc)" anywhere
-        text = re.sub(r'[A-Z]\.\s*Cc\)', '', text)                              # Remove "A. Cc)", "B. Cc)", etc.
-        text = re.sub(r'\.\s*Cc\)', '', text)                                   # Remove ". Cc)"
-        text = re.sub(r'c\.\s*Cc\)', '', text)                                  # Remove "c. Cc)" (lowercase)
-        text = re.sub(r'\s+Cc\s+', ' ', text)                                   # Remove " Cc " (with spaces on both sides)
-        text = re.sub(r'^Cc\s+', '', text, flags=re.MULTILINE)                  # Remove "Cc " at start of line
-
-        # Remove ".C >)" and ".C >" patterns
-        text = re.sub(r'\.\s*C\s*>\s*\)', '', text)                             # Remove ".C >)"
-        text = re.sub(r'\.\s*C\s*>', '', text)                                  # Remove ".C >"
-        text = re.sub(r'\s+\.\s*C\s*>', '', text)                               # Remove " .C >" (with leading space)
-
-        # Remove "-C _)" pattern
-        text = re.sub(r'-C\s*_\s*\)', '', text)                                 # Remove "-C _)"
-
-        # Remove standalone colons that are OCR artifacts (before removing answer prefixes)
-        text = re.sub(r'^:\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone ":"
-        text = re.sub(r'^;\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone ";"
-        text = re.sub(r'\n:\s*\n', '\n', text)                                  # Remove ":" on its own line
-        text = re.sub(r'\n;\s*\n', '\n', text)                                  # Remove ";" on its own line
-        text = re.sub(r'\s+:\s+([a-zA-Z0-9])', r' \1', text)                    # " : lift" -> " lift" (remove colon artifact)
-        text = re.sub(r'\.\s*:\s+([a-zA-Z0-9])', r'. \1', text)                 # ". : lift" -> ". lift"
-        text = re.sub(r'^\.\s+', '', text, flags=re.MULTILINE)                  # Remove ". " at start of line
-        text = re.sub(r'\n\.\s+', '\n', text)                                   # Remove ". " after newline
-        text = re.sub(r"^'\s+", '', text, flags=re.MULTILINE)                   # Remove "' " at start of line
-        text = re.sub(r"\n'\s+", '\n', text)                                    # Remove "' " after newline
-
-        # Remove standalone c that appear without content
-        text = re.sub(r'^c\s*$', '', text, flags=re.MULTILINE)                  # Remove standalone "c"
-        text = re.sub(r'\nc\s*\n', '\n', text)                                  # Remove "c" on its own line
-
-        # Remove answer choice prefixes (A., B., C., Cc., a., b., c., etc.) EVERYWHERE
-        # These come from the OCR picking up the letter labels on answer choices
-        text = re.sub(r'\b[ABCabc]\.\s+', '', text)                             # Remove "A. ", "B. ", "C. ", "a. ", "b. ", "c. " anywhere
-        text = re.sub(r'\bCc\.\s+', '', text)                                   # Remove "Cc. " anywhere
-
-        # Also handle lowercase "c " or "c." that might be standalone answer markers
-        text = re.sub(r'\bc\s+(?=[a-z])', '', text)                             # Remove "c " before lowercase (likely answer marker)
-
-        # Clean up multiple spaces but preserve newlines
-        text = re.sub(r'[ \t]+', ' ', text)
-
-        # Clean up multiple newlines
-        text = re.sub(r'\n\s*\n', '\n', text)
-
-        lines = text.split('\n')
-        cleaned_lines = []
+        entry_path = self._entry_path(key)
+        entry = dict(extra or {})
+        entry.update({'raw': raw_text, 'cleaned': cleaned_text})
+        data = json.dumps(entry).encode('utf-8')
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_name(f"{entry_path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            try:
+                # Re-storing a key (e.g. after a cleanup-rules change) replaces the old entry
+                replaced_size = entry_path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            logger.warning("Could not write OCR cache entry %s: %s", entry_path, str(e))
+            return
 
-        for line in lines:
-            line = line.strip()
-            # Skip lines that are just a single character (likely OCR artifacts)
-            if len(line) == 1 and line in '0Oo':
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(data) - replaced_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
                 continue
-            # Skip empty lines
-            if not line:
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries
+
+    def _evict(self) -> None:
+        # Trim to 90% of the limit so we do not rescan on every subsequent put
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
                 continue
-            cleaned_lines.append(line)
+            total -= size
+            removed += 1
+        self._size = total
+        logger.debug("Evicted %d OCR cache entries, cache size now %d bytes", removed, total)
 
-        return '\n'.join(cleaned_lines)
 
-    def parse_question_and_options(self, text: str) -> Tuple[str, List[str]]:
+class PerceptualIndex:
+    """
+    Nearest-neighbour index of perceptual image hashes with their OCR text.
+
+    Uses multi-index hashing: each hash is split into threshold + 1 chunks and
+    every chunk is indexed exactly. By the pigeonhole principle, any hash within
+    `threshold` bits of a query shares at least one chunk with it. A lookup is a
+    handful of dict probes plus popcounts on the few candidates, regardless of
+    index size. Entries are appended to a JSON-lines file so the index persists.
+    """
+
+    def __init__(self, path: Optional[Path], bits: int, threshold: int = DEFAULT_PHASH_THRESHOLD):
         """
-        Parse OCR text into question and options.
-        
-        Uses the structure of options B and C to find where option A starts.
-        Options in multiple choice questions often have similar patterns.
-        
+        Initialize the index, loading previously stored entries.
+
         Args:
-            text: Cleaned OCR text with newlines preserved
-            
+            path: JSON-lines file backing the index, or None for an in-memory index
+            bits: Number of bits in each hash
+            threshold: Maximum Hamming distance at which two images count as the same
+        """
+        self.path = path
+        self.threshold = threshold
+        chunk_count = threshold + 1
+        bounds = [bits * i // chunk_count for i in range(chunk_count + 1)]
+        self._chunks = [((1 << (end - start)) - 1, start) for start, end in zip(bounds, bounds[1:])]
+        self._tables = [{} for _ in self._chunks]
+        self._hashes = []
+        self._entries = []
+        self._lock = threading.Lock()
+
+        if path is not None and path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted run
+                        continue
+                    self._insert(int(entry.pop('h'), 16), entry)
+            logger.debug("Loaded %d perceptual hashes from %s", len(self._hashes), path)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _insert(self, phash: int, entry: Dict) -> None:
+        index = len(self._hashes)
+        self._hashes.append(phash)
+        self._entries.append(entry)
+        for table, (mask, shift) in zip(self._tables, self._chunks):
+            table.setdefault((phash >> shift) & mask, []).append(index)
+
+    def lookup(self, phash: int) -> Optional[Dict]:
+        """
+        Find the closest stored image within the threshold.
+
+        Args:
+            phash: Perceptual hash of the query image
+
         Returns:
-            Tuple of (question_text, list of options)
+            Stored entry with 'raw' OCR text and 'src' path, or None if nothing is close enough
         """
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        best = None
+        best_distance = self.threshold + 1
+        with self._lock:
+            for table, (mask, shift) in zip(self._tables, self._chunks):
+                for index in table.get((phash >> shift) & mask, ()):
+                    distance = (phash ^ self._hashes[index]).bit_count()
+                    if distance < best_distance:
+                        best, best_distance = self._entries[index], distance
+        return best
 
-        if not lines:
-            return '', []
+    def add(self, phash: int, raw_text: str, source: Path) -> None:
+        """
+        Store the OCR text of an image under its perceptual hash.
 
-        full_text = ' '.join(lines)
+        Args:
+            phash: Perceptual hash of the image
+            raw_text: Text as returned by tesseract
+            source: Path of the image, kept for auditing matches
+        """
+        entry = {'raw': raw_text, 'src': str(source)}
+        with self._lock:
+            self._insert(phash, entry)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(dict(entry, h=format(phash, 'x'))) + '\n')
 
-        if '?' in full_text:
-            q_end = full_text.rfind('?')
-            question = full_text[:q_end + 1].strip()
-            rest = full_text[q_end + 1:].strip()
-            options = [s.strip().rstrip('.') for s in re.split(r'\.\s+', rest) if s.strip()]
-            if len(options) >= 3:
-                return question, options[-3:]
-            elif options:
-                return question, options
 
-        segments = re.split(r'\.\s+', full_text)
-        segments = [s.strip() for s in segments if s.strip()]
+def parse_tesseract_config(config: str) -> Tuple[Optional[int], Optional[int], Dict[str, str]]:
+    """
+    Split a tesseract command-line config into engine settings.
 
-        if len(segments) >= 4:
-            # Last 3 are options, rest is question
-            options = [s.rstrip('.') for s in segments[-3:]]
-            question = '. '.join(segments[:-3]) + '.'
-            return question, options
+    Args:
+        config: Config string such as '--oem 3 --psm 3 -c preserve_interword_spaces=1'
 
-        elif len(segments) == 3:
-            seg_a, seg_b, seg_c = segments
+    Returns:
+        Tuple of (oem, psm, variables), with None for options that are not set
+    """
+    oem = psm = None
+    variables = {}
+    tokens = shlex.split(config)
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else ''
+        if token == '--oem':
+            oem = int(value)
+            i += 2
+        elif token == '--psm':
+            psm = int(value)
+            i += 2
+        elif token == '-c' and '=' in value:
+            name, _, var_value = value.partition('=')
+            variables[name] = var_value
+            i += 2
+        else:
+            logger.debug("Ignoring unsupported tesseract option: %s", token)
+            i += 1
+    return oem, psm, variables
 
-            words_b = seg_b.split()
-            words_c = seg_c.split()
 
-            if words_b and words_c:
-                first_b = words_b[0].lower().rstrip('.,;:')
-                first_c = words_c[0].lower().rstrip('.,;:')
+@functools.lru_cache(maxsize=256)
+def tone_lut(mean: int, contrast: float, brightness: float) -> Tuple[int, ...]:
+    """
+    Build a lookup table applying contrast then brightness in one point operation.
 
-                # If options B and C start with same word (not too common), find it in segment A
-                common_words = {'a', 'an', 'the', 'to', 'in', 'on', 'at', 'of', 'or', 'and', 'is', 'are'}
-                if first_b == first_c and len(first_b) > 1 and first_b not in common_words:
-                    pattern = r'\b(' + re.escape(first_b) + r')\b'
-                    match = re.search(pattern, seg_a, re.IGNORECASE)
-                    if match:
-                        question = seg_a[:match.start()].strip()
-                        first_option = seg_a[match.start():].strip().rstrip('.')
-                        return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+    The table is computed by running Image.blend over a 0-255 ramp, so the
+    result is identical to ImageEnhance.Contrast followed by ImageEnhance.Brightness.
 
-                # Check if options B and C have same ending (e.g., "feet MSL", "knots")
-                last_b = words_b[-1].lower().rstrip('.,;:') if words_b else ''
-                last_c = words_c[-1].lower().rstrip('.,;:') if words_c else ''
+    Args:
+        mean: Rounded mean grayscale value of the image (the contrast pivot)
+        contrast: Contrast enhancement factor
+        brightness: Brightness enhancement factor
 
-                if last_b == last_c and len(last_b) > 2:
-                    # Find where this ending pattern appears in seg_a
-                    # Look for: number + ending (e.g., "9,500 feet")
-                    pattern = r'(\d[\d,]*\s+' + re.escape(last_b) + r')\b'
-                    match = re.search(pattern, seg_a, re.IGNORECASE)
-                    if match:
-                        question = seg_a[:match.start()].strip()
-                        first_option = seg_a[match.start():].strip().rstrip('.')
-                        return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+    Returns:
+        256-entry lookup table
+    """
+    ramp = Image.frombytes('L', (256, 1), bytes(range(256)))
+    ramp = Image.blend(Image.new('L', ramp.size, mean), ramp, contrast)
+    ramp = Image.blend(Image.new('L', ramp.size, 0), ramp, brightness)
+    return tuple(ramp.tobytes())
 
-            stem_patterns = [
-                r'^(.*\bindicates)\s+(.+)$',      # "indicates X"
-                r'^(.*\bis)\s+(.+)$',             # "is X" 
-                r'^(.*\bare)\s+(.+)$',            # "are X"
-                r'^(.*\bequipped with)\s+(.+)$',  # "equipped with X"
-                r'^(.*\bcaused by)\s+(.+)$',      # "caused by X"
-            ]
 
-            for pattern in stem_patterns:
-                match = re.match(pattern, seg_a, re.IGNORECASE)
-                if match:
-                    question = match.group(1).strip()
-                    first_option = match.group(2).strip().rstrip('.')
-                    return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+def sharpen_kernel(factor: float) -> ImageFilter.Kernel:
+    """
+    Build a single 3x3 kernel equivalent to ImageEnhance.Sharpness(factor).
 
-            # Final fallback: return all as options with empty question
-            return '', [s.rstrip('.') for s in segments]
+    ImageEnhance.Sharpness blends the image with its SMOOTH-filtered copy:
+    factor * x - (factor - 1) * smooth(x). SMOOTH is [1 1 1; 1 5 1; 1 1 1] / 13,
+    so the blend folds into one kernel with the same scale.
 
-        else:
-            return full_text.rstrip('.'), []
+    Args:
+        factor: Sharpness enhancement factor
 
-    def process_image(self, image_path: Path, base_paths: List[Path] = None) -> Tuple[str, str]:
-        """
-        Process a single image and extract text.
+    Returns:
+        Convolution kernel
+    """
+    edge = -(factor - 1)
+    return ImageFilter.Kernel((3, 3), [edge] * 4 + [8 * factor + 5] + [edge] * 4, scale=13)
 
-        Args:
-            image_path: Path to the image file
-            base_paths: List of base paths to compute relative path from
 
-        Returns:
-            Tuple of (display_key, extracted_text) where display_key includes folder info
-        """
-        try:
-            logger.info("Processing: %s", image_path.name)
-            img = Image.open(image_path)
+def otsu_threshold(histogram: List[int]) -> int:
+    """
+    Find the Otsu threshold of a 256-bin grayscale histogram.
 
-            if self.enable_preprocessing:
-                processed_img = self.preprocess_image(img)
-            else:
-                processed_img = img
+    Args:
+        histogram: Pixel counts for values 0-255
 
-            text = pytesseract.image_to_string(processed_img, config=self.tesseract_config).strip()
+    Returns:
+        Threshold value; pixels at or below it are foreground (text)
+    """
+    total = sum(histogram)
+    weighted_total = sum(value * count for value, count in enumerate(histogram))
+    background_count = 0
+    background_sum = 0
+    best_threshold = 0
+    best_variance = -1.0
+    for value, count in enumerate(histogram):
+        background_count += count
+        if background_count == 0:
+            continue
+        foreground_count = total - background_count
+        if foreground_count == 0:
+            break
+        background_sum += value * count
+        mean_background = background_sum / background_count
+        mean_foreground = (weighted_total - background_sum) / foreground_count
+        variance = background_count * foreground_count * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            best_threshold = value
+    return best_threshold
 
-            cleaned_text = self.postprocess_ocr_text(text)
 
-            if base_paths and len(base_paths) > 1:
-                for base_path in base_paths:
-                    try:
-                        relative_path = image_path.relative_to(base_path)
-                        if relative_path.parent == Path('.'):
-                            display_key = f"{base_path.name}/{relative_path.name}"
-                        else:
-                            display_key = f"{base_path.name}/{relative_path}"
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    display_key = str(image_path)
-            else:
-                display_key = image_path.name
+def encode_pnm(image: Image.Image) -> bytes:
+    """
+    Encode an image as uncompressed PBM/PGM/PPM for streaming to tesseract.
 
-            return display_key, cleaned_text
-        except Exception as e:
-            logger.error("Error processing %s: %s", image_path.name, str(e))
-            display_key = image_path.name if not base_paths else str(image_path)
-            return display_key, f"ERROR: {str(e)}"
+    Args:
+        image: PIL Image object
 
-    def process_images_parallel(self, image_paths: List[Path], base_paths: List[Path] = None) -> Dict[str, str]:
-        """
-        Process multiple images in parallel.
+    Returns:
+        PNM-encoded image bytes
+    """
+    if 'A' in image.getbands():
+        # Match pytesseract: flatten transparency onto a white background
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, (0, 0), image.getchannel('A'))
+        image = background
+    elif image.mode not in ('1', 'L', 'RGB'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PPM')
+    return buffer.getvalue()
 
-        Args:
-            image_paths: List of image file paths
-            base_paths: List of base paths to compute relative paths from
 
-        Returns:
-            Dictionary mapping display key (with folder info) to extracted text
-        """
-        results = {}
+def split_page_reference(image_path: Path) -> Tuple[Path, Optional[int]]:
+    """
+    Split a reference to one page of a multi-page TIFF into the file and the page.
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_path = {
-                executor.submit(self.process_image, path, base_paths): path
-                for path in image_paths
-            }
+    Args:
+        image_path: Image path, or page reference such as 'scans.tiff#03'
 
-            for future in as_completed(future_to_path):
-                display_key, text = future.result()
-                results[display_key] = text
-                logger.info("Completed: %s", display_key)
+    Returns:
+        Tuple of (file_path, page) where page is 1-based, or None for a plain image path
+    """
+    match = PAGE_REFERENCE_PATTERN.match(image_path.name)
+    if match is None:
+        return image_path, None
+    return image_path.with_name(match.group(1)), int(match.group(2))
 
-        return results
 
+def image_file_size(image_path: Path) -> int:
+    """
+    Size on disk of an image file, or of the TIFF holding a page reference.
+
+    Args:
+        image_path: Image path or page reference from image_pages()
+
+    Returns:
+        Size in bytes
+    """
+    return split_page_reference(image_path)[0].stat().st_size
+
+
+def open_image(image_path: Path) -> Image.Image:
+    """
+    Open an image file, or only the referenced page of a multi-page TIFF.
+
+    Like Image.open(), nothing is decoded until the image is loaded, and
+    the result should be used as a context manager so the file is closed.
+
+    Args:
+        image_path: Image path or page reference from image_pages()
+
+    Returns:
+        Lazily loaded PIL Image positioned at the page
+
+    Raises:
+        ValueError: If the file has no such page
+    """
+    file_path, page = split_page_reference(image_path)
+    img = Image.open(file_path)
+    if page is not None:
+        try:
+            img.seek(page - 1)
+        except EOFError:
+            img.close()
+            raise ValueError(f"{file_path.name} has no page {page}")
+    return img
+
+
+def image_pages(file_path: Path) -> List[Path]:
+    """
+    List the images in an image file: one page reference per page of a multi-page TIFF.
+
+    Only the TIFF page directories are read, not the pixel data.
+
+    Args:
+        file_path: Path to the image file
+
+    Returns:
+        [file_path] for single-page files, otherwise references that sort in page order
+    """
+    if file_path.suffix.lower() not in MULTIPAGE_EXTENSIONS:
+        return [file_path]
+    try:
+        with Image.open(file_path) as img:
+            page_count = getattr(img, 'n_frames', 1)
+    except (OSError, ValueError):
+        # Unreadable files are reported when they are processed
+        return [file_path]
+    if page_count == 1:
+        return [file_path]
+    width = len(str(page_count))
+    return [file_path.with_name(f"{file_path.name}#{page:0{width}d}") for page in range(1, page_count + 1)]
+
+
+def close_images(images: Iterable[Union[Image.Image, Path]]) -> None:
+    """Release the pixel memory of decoded images as soon as OCR is done with them."""
+    for image in images:
+        if isinstance(image, Image.Image):
+            image.close()
+
+
+def is_passthrough_image(image_path: Path) -> bool:
+    """
+    Check whether tesseract can read an image file as-is, without decoding it in Python.
+
+    Only the image header is read.
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        True if the file can be handed to tesseract by path
+    """
+    with open_image(image_path) as img:
+        return (img.format in PASSTHROUGH_FORMATS
+                and 'A' not in img.getbands()
+                and getattr(img, 'n_frames', 1) == 1)
+
+
+def parse_tesseract_tsv(tsv: str) -> List[Dict]:
+    """
+    Parse tesseract TSV output into word records.
+
+    Args:
+        tsv: Output of tesseract's 'tsv' config
+
+    Returns:
+        Words in reading order, each a dict with 'line' (block, paragraph, line
+        numbers), 'left', 'top', 'width', 'height', 'conf' and 'text'
+    """
+    rows = tsv.splitlines()
+    if not rows:
+        return []
+    header = rows[0].split('\t')
+    words = []
+    for row in rows[1:]:
+        values = row.split('\t')
+        if len(values) != len(header):
+            continue
+        fields = dict(zip(header, values))
+        if fields['level'] != '5' or not fields['text'].strip():
+            continue
+        words.append({
+            'line': (int(fields['block_num']), int(fields['par_num']), int(fields['line_num'])),
+            'left': int(fields['left']),
+            'top': int(fields['top']),
+            'width': int(fields['width']),
+            'height': int(fields['height']),
+            'conf': float(fields['conf']),
+            'text': fields['text'],
+        })
+    return words
+
+
+def words_to_text(words: List[Dict]) -> str:
+    """
+    Join word records back into text, one line per tesseract text line.
+
+    Args:
+        words: Words in reading order from parse_tesseract_tsv()
+
+    Returns:
+        Text with words separated by spaces and lines by newlines
+    """
+    lines = {}
+    for word in words:
+        lines.setdefault(word['line'], []).append(word['text'])
+    return '\n'.join(' '.join(line) for line in lines.values())
+
+
+def stitch_images(images: List[Image.Image], gap: int = STITCH_GAP) -> Tuple[Image.Image, List[int]]:
+    """
+    Stack grayscale images into one tall page separated by white gaps.
+
+    Args:
+        images: Images to stack, top to bottom
+        gap: White space in pixels around and between images
+
+    Returns:
+        Tuple of (montage, tops) where tops[i] is the y offset of images[i]
+    """
+    width = max(image.width for image in images) + 2 * gap
+    height = sum(image.height for image in images) + gap * (len(images) + 1)
+    montage = Image.new('L', (width, height), 255)
+    tops = []
+    y = gap
+    for image in images:
+        montage.paste(image if image.mode == 'L' else image.convert('L'), (gap, y))
+        tops.append(y)
+        y += image.height + gap
+    return montage, tops
+
+
+def split_words_by_tile(words: List[Dict], tops: List[int]) -> List[List[Dict]]:
+    """
+    Assign the words of a stitched page back to the image each came from.
+
+    Each word goes to the last tile starting above its vertical centre, so
+    words that stray into a gap still land on the closest preceding tile.
+
+    Args:
+        words: Words from parse_tesseract_tsv() for the montage
+        tops: Tile offsets from stitch_images()
+
+    Returns:
+        Words of each tile, in reading order
+    """
+    tiles = [[] for _ in tops]
+    for word in words:
+        center = word['top'] + word['height'] / 2
+        tiles[max(0, bisect.bisect_right(tops, center) - 1)].append(word)
+    return tiles
+
+
+class OCRTimeout(Exception):
+    """Raised by an OCR backend when a call exceeds its deadline; the OCR work has been stopped."""
+
+
+class PytesseractBackend:
+    """
+    OCR backend that runs one tesseract subprocess per image.
+
+    Image files are passed to tesseract by path. In-memory images are streamed
+    to tesseract's stdin as uncompressed PNM instead of being re-encoded to a
+    temporary PNG. Results are read from tesseract's stdout.
+    """
+
+    name = 'pytesseract'
+
+    def __init__(self, pool_size: int = 1, ocr_threads: Optional[int] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            pool_size: Unused; every call starts its own tesseract process
+            ocr_threads: OpenMP threads each tesseract process may use; None keeps the
+                inherited OMP_THREAD_LIMIT
+        """
+        # Passed to each subprocess, so backends with different limits can share a process
+        self._env = None if ocr_threads is None else dict(os.environ, OMP_THREAD_LIMIT=str(ocr_threads))
+
+    def version(self) -> str:
+        """
+        Get the version of the tesseract binary.
+
+        Returns:
+            Version string, or 'unknown' if tesseract cannot be found
+        """
+        try:
+            return str(pytesseract.get_tesseract_version())
+        except (pytesseract.TesseractNotFoundError, SystemExit):
+            return 'unknown'
+
+    def _run(self, args: List[str], stdin: Optional[bytes], timeout: Optional[float]) -> str:
+        stdin_kwargs = {'stdin': subprocess.DEVNULL} if stdin is None else {'input': stdin}
+        try:
+            # On timeout, subprocess.run() kills tesseract before raising
+            proc = subprocess.run([pytesseract.pytesseract.tesseract_cmd] + args, **stdin_kwargs, env=self._env,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            raise OCRTimeout(f"tesseract exceeded {timeout:g}s") from e
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            raise pytesseract.TesseractNotFoundError()
+        if proc.returncode:
+            raise pytesseract.TesseractError(proc.returncode, pytesseract.pytesseract.get_errors(proc.stderr))
+        return proc.stdout.decode('utf-8')
+
+    async def _arun(self, args: List[str], stdin: Optional[bytes] = None) -> str:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                pytesseract.pytesseract.tesseract_cmd, *args,
+                stdin=subprocess.DEVNULL if stdin is None else subprocess.PIPE,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self._env)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            raise pytesseract.TesseractNotFoundError()
+        try:
+            stdout, stderr = await proc.communicate(stdin)
+        except asyncio.CancelledError:
+            # Do not leave an orphaned tesseract running after the caller gave up
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            raise
+        if proc.returncode:
+            raise pytesseract.TesseractError(proc.returncode, pytesseract.pytesseract.get_errors(stderr))
+        return stdout.decode('utf-8')
+
+    async def _arun_within(self, args: List[str], stdin: Optional[bytes], timeout: Optional[float]) -> str:
+        try:
+            # Cancelling _arun() on timeout kills the subprocess
+            return await asyncio.wait_for(self._arun(args, stdin), timeout)
+        except asyncio.TimeoutError as e:
+            raise OCRTimeout(f"tesseract exceeded {timeout:g}s") from e
+
+    def image_to_string(self, image: Union[Image.Image, Path], config: str,
+                        timeout: Optional[float] = None) -> str:
+        """
+        Run OCR on an image.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which tesseract is killed; None waits indefinitely
+
+        Returns:
+            Extracted text
+
+        Raises:
+            OCRTimeout: If tesseract ran longer than timeout
+        """
+        if isinstance(image, Path):
+            return self._run([str(image), 'stdout'] + shlex.split(config), None, timeout)
+        return self._run(['stdin', 'stdout'] + shlex.split(config), encode_pnm(image), timeout)
+
+    def image_to_data(self, image: Union[Image.Image, Path], config: str,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Run OCR on an image and return word boxes.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which tesseract is killed; None waits indefinitely
+
+        Returns:
+            Words from parse_tesseract_tsv()
+
+        Raises:
+            OCRTimeout: If tesseract ran longer than timeout
+        """
+        if isinstance(image, Path):
+            return parse_tesseract_tsv(self._run([str(image), 'stdout'] + shlex.split(config) + ['tsv'], None, timeout))
+        return parse_tesseract_tsv(self._run(['stdin', 'stdout'] + shlex.split(config) + ['tsv'],
+                                             encode_pnm(image), timeout))
+
+    async def aimage_to_string(self, image: Union[Image.Image, Path], config: str,
+                               timeout: Optional[float] = None) -> str:
+        """
+        Run OCR on an image in a tesseract subprocess driven by the event loop.
+
+        Cancelling the call kills the subprocess.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which tesseract is killed; None waits indefinitely
+
+        Returns:
+            Extracted text
+
+        Raises:
+            OCRTimeout: If tesseract ran longer than timeout
+        """
+        if isinstance(image, Path):
+            return await self._arun_within([str(image), 'stdout'] + shlex.split(config), None, timeout)
+        return await self._arun_within(['stdin', 'stdout'] + shlex.split(config), encode_pnm(image), timeout)
+
+    async def aimage_to_data(self, image: Union[Image.Image, Path], config: str,
+                             timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Async version of image_to_data(); cancelling the call kills the subprocess.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which tesseract is killed; None waits indefinitely
+
+        Returns:
+            Words from parse_tesseract_tsv()
+
+        Raises:
+            OCRTimeout: If tesseract ran longer than timeout
+        """
+        if isinstance(image, Path):
+            return parse_tesseract_tsv(await self._arun_within(
+                [str(image), 'stdout'] + shlex.split(config) + ['tsv'], None, timeout))
+        return parse_tesseract_tsv(await self._arun_within(
+            ['stdin', 'stdout'] + shlex.split(config) + ['tsv'], encode_pnm(image), timeout))
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class TesserocrBackend:
+    """OCR backend that keeps a pool of warm in-process tesseract engines via tesserocr."""
+
+    name = 'tesserocr'
+    # Seconds between checks for a free engine slot while every engine is busy
+    ENGINE_RECHECK = 1.0
+
+    def __init__(self, pool_size: int, ocr_threads: Optional[int] = None):
+        """
+        Initialize the engine pool. Engines are created lazily, up to pool_size per config.
+
+        Args:
+            pool_size: Maximum number of engines kept warm for each tesseract config
+            ocr_threads: Unused; the OpenMP runtime linked into tesserocr reads
+                OMP_THREAD_LIMIT once, when the library is loaded
+        """
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed. Please run: pip install tesserocr")
+        self.pool_size = pool_size
+        self._pools = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+    def version(self) -> str:
+        """
+        Get the version of the linked tesseract library.
+
+        Returns:
+            Version string
+        """
+        return tesserocr.tesseract_version().split()[1]
+
+    def _create_engine(self, config: str):
+        oem, psm, variables = parse_tesseract_config(config)
+        kwargs = {}
+        if oem is not None:
+            kwargs['oem'] = oem
+        if psm is not None:
+            kwargs['psm'] = psm
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        for name, value in variables.items():
+            api.SetVariable(name, value)
+        return api
+
+    def _acquire(self, config: str):
+        while True:
+            with self._lock:
+                pool = self._pools.setdefault(config, queue.Queue())
+                try:
+                    return pool, pool.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._created.get(config, 0) < self.pool_size:
+                    self._created[config] = self._created.get(config, 0) + 1
+                    break
+            try:
+                return pool, pool.get(timeout=self.ENGINE_RECHECK)
+            except queue.Empty:
+                # A failed engine start may have freed a slot in the meantime
+                continue
+        logger.debug("Starting tesserocr engine for config: %s", config)
+        try:
+            return pool, self._create_engine(config)
+        except BaseException:
+            # Free the slot, or callers would wait forever for an engine that never comes
+            with self._lock:
+                if self._pools.get(config) is pool:
+                    self._created[config] -= 1
+            raise
+
+    def _recognize(self, image: Union[Image.Image, Path], config: str, output,
+                   timeout: Optional[float] = None) -> str:
+        pool, api = self._acquire(config)
+        try:
+            if isinstance(image, Path):
+                api.SetImageFile(str(image))
+            else:
+                api.SetImage(image)
+            # The engine checks the deadline as it goes and abandons the page
+            if timeout and not api.Recognize(int(timeout * 1000)):
+                raise OCRTimeout(f"tesseract exceeded {timeout:g}s")
+            return output(api)
+        finally:
+            api.Clear()
+            with self._lock:
+                closed = self._pools.get(config) is not pool
+            if closed:
+                # close() ran while this call was in flight
+                api.End()
+            else:
+                pool.put(api)
+
+    def image_to_string(self, image: Union[Image.Image, Path], config: str,
+                        timeout: Optional[float] = None) -> str:
+        """
+        Run OCR on an image using a warm engine from the pool.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which recognition is abandoned; None waits indefinitely
+
+        Returns:
+            Extracted text
+
+        Raises:
+            OCRTimeout: If recognition ran longer than timeout
+        """
+        return self._recognize(image, config, lambda api: api.GetUTF8Text(), timeout)
+
+    def image_to_data(self, image: Union[Image.Image, Path], config: str,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Run OCR on an image using a warm engine from the pool and return word boxes.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which recognition is abandoned; None waits indefinitely
+
+        Returns:
+            Words from parse_tesseract_tsv()
+
+        Raises:
+            OCRTimeout: If recognition ran longer than timeout
+        """
+        header = 'level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n'
+        # GetTSVText() omits the header row that the tesseract CLI prints
+        return parse_tesseract_tsv(header + self._recognize(image, config, lambda api: api.GetTSVText(0), timeout))
+
+    async def aimage_to_string(self, image: Union[Image.Image, Path], config: str,
+                               timeout: Optional[float] = None) -> str:
+        """
+        Run OCR on an image using a warm engine, off the event loop thread.
+
+        Engines cannot be interrupted, so a cancelled call still finishes its
+        image in the background before the engine returns to the pool.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which recognition is abandoned; None waits indefinitely
+
+        Returns:
+            Extracted text
+        """
+        return await asyncio.to_thread(self.image_to_string, image, config, timeout)
+
+    async def aimage_to_data(self, image: Union[Image.Image, Path], config: str,
+                             timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Async version of image_to_data(), off the event loop thread.
+
+        Args:
+            image: PIL Image object, or path to an image file tesseract can read directly
+            config: Tesseract command-line config
+            timeout: Seconds after which recognition is abandoned; None waits indefinitely
+
+        Returns:
+            Words from parse_tesseract_tsv()
+        """
+        return await asyncio.to_thread(self.image_to_data, image, config, timeout)
+
+    def close(self) -> None:
+        """Shut down every engine in the pool."""
+        with self._lock:
+            for pool in self._pools.values():
+                while True:
+                    try:
+                        pool.get_nowait().End()
+                    except queue.Empty:
+                        break
+            self._pools.clear()
+            self._created.clear()
+
+
+OCR_BACKENDS = {
+    'pytesseract': PytesseractBackend,
+    'tesserocr': TesserocrBackend,
+}
+
+EXECUTORS = ('thread', 'process')
+
+
+def create_ocr_backend(name: str, pool_size: int, ocr_threads: Optional[int] = None):
+    """
+    Create an OCR backend by name.
+
+    Args:
+        name: One of OCR_BACKENDS
+        pool_size: Number of warm engines for backends that keep workers alive
+        ocr_threads: OpenMP threads each tesseract subprocess may use
+
+    Returns:
+        OCR backend instance
+    """
+    if name not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {name}")
+    return OCR_BACKENDS[name](pool_size, ocr_threads)
+
+
+# ImageProcessor owned by each process-pool worker, created by _init_process_worker()
+_worker_processor = None
+
+
+def _init_process_worker(processor_kwargs: Dict, tesseract_config: str) -> None:
+    global _worker_processor
+    _worker_processor = ImageProcessor(**processor_kwargs)
+    _worker_processor.tesseract_config = tesseract_config
+
+
+def _process_in_worker(image_paths: List[Path], base_paths: Optional[List[Path]] = None,
+                       parse: bool = False) -> List[Tuple[str, str, Optional[Tuple[str, Tuple[str, ...]]],
+                                                          Dict, Optional[Dict]]]:
+    # Only paths cross the process boundary; results come back as plain tuples
+    results = []
+    for image_path, (display_key, text, question) in zip(
+            image_paths, _worker_processor.run_batch_pipeline(image_paths, base_paths, parse)):
+        record = _worker_processor.pop_image_record(image_path)
+        stats = _worker_processor.pop_stage_times(image_path)
+        if question is not None:
+            question = (question[0], tuple(question[1]))
+        results.append((display_key, text, question, record, stats))
+    return results
+
+
+def submit_bounded(executor, task: Callable, batches: Iterable[List], max_in_flight: int
+                   ) -> Iterator[Tuple[List, Future]]:
+    """
+    Run batches on an executor with at most max_in_flight submitted but not yet yielded.
+
+    Batches are pulled from the iterable only as earlier ones are yielded, so
+    a slow consumer holds back new work and memory stays flat however many
+    batches there are. Closing the iterator cancels batches that have not started.
+
+    Args:
+        executor: Executor to submit to
+        task: Callable run on each batch
+        batches: Batches of work; may be a lazy iterable
+        max_in_flight: Maximum number of batches submitted but not yet yielded
+
+    Yields:
+        Tuples of (batch, future) in completion order
+    """
+    batches = iter(batches)
+    in_flight = {}
+    try:
+        while True:
+            for batch in batches:
+                in_flight[executor.submit(task, batch)] = batch
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+class RunTally:
+    """
+    Run-wide totals of the per-image records yielded by iter_results().
+
+    Only counts are kept, so the tally stays small however long a processor
+    runs. Crop records are collected per image only if crop_audit is set.
+    """
+
+    def __init__(self):
+        """Initialize an empty tally."""
+        # Images per two-tier outcome: 'fast', 'low_confidence' or 'unparsed'
+        self.tier_counts = collections.Counter()
+        # Images per --ocr-timeout outcome: 'recovered' or 'timed_out'
+        self.timeout_counts = collections.Counter()
+        # Set to a dict to collect each image's crop record, keyed by path
+        self.crop_audit = None
+        self._lock = threading.Lock()
+
+    def add(self, image_path: Path, record: Dict) -> None:
+        """
+        Count one image's record.
+
+        Args:
+            image_path: Path to the image file
+            record: Record from ImageProcessor.pop_image_record()
+        """
+        with self._lock:
+            if 'tier' in record:
+                self.tier_counts[record['tier']] += 1
+            if 'timeout' in record:
+                self.timeout_counts[record['timeout']] += 1
+            if self.crop_audit is not None and 'crop' in record:
+                self.crop_audit[str(image_path)] = record['crop']
+
+
+class ImageProcessor:
+    """Handles image processing and OCR operations."""
+
+    CONTRAST_FACTOR = 1.5
+    BRIGHTNESS_FACTOR = 1.1
+    SHARPNESS_FACTOR = 1.5
+
+    def __init__(self, max_workers: int = None, enable_preprocessing: bool = True,
+                 cache: Optional[OCRCache] = None, ocr_backend: str = 'pytesseract',
+                 ocr_threads: int = None, executor: str = 'thread',
+                 binarize: bool = False, auto_crop: bool = False,
+                 target_line_height: int = DEFAULT_TARGET_LINE_HEIGHT,
+                 scale_bounds: Tuple[float, float] = DEFAULT_SCALE_BOUNDS,
+                 crop_margin: int = DEFAULT_CROP_MARGIN, reclean_only: bool = False,
+                 phash_threshold: Optional[int] = None, batch_size: int = 1,
+                 collect_stats: bool = False, tesseract_config: str = DEFAULT_TESSERACT_CONFIG,
+                 downscale: float = 1.0, sharpen: bool = True, two_tier: bool = False,
+                 fast_config: str = DEFAULT_FAST_TESSERACT_CONFIG,
+                 min_confidence: float = DEFAULT_MIN_CONFIDENCE, ocr_timeout: Optional[float] = None,
+                 fallback_config: str = DEFAULT_FALLBACK_TESSERACT_CONFIG,
+                 fallback_downscale: float = DEFAULT_FALLBACK_DOWNSCALE):
+        """
+        Initialize the image processor.
+
+        Args:
+            max_workers: Maximum number of worker threads. Defaults to CPU count.
+            enable_preprocessing: Whether to apply image preprocessing for better OCR
+            cache: Optional OCR cache consulted before running tesseract
+            ocr_backend: Name of the OCR backend, one of OCR_BACKENDS
+            ocr_threads: OpenMP threads each tesseract subprocess may use. Defaults to an even
+                share of the CPUs across workers, so workers x threads never oversubscribes.
+                tesserocr ignores it and follows OMP_THREAD_LIMIT from the environment.
+            executor: 'thread' runs images in a thread pool; 'process' runs the whole
+                per-image pipeline in a process pool, sidestepping the GIL
+            binarize: Whether preprocessing ends with Otsu binarization to a 1-bit image
+            auto_crop: Whether to crop to the text region and normalize text scale before OCR
+            target_line_height: Text line height in pixels that auto-crop rescales towards
+            scale_bounds: (min, max) resampling factor auto-crop may apply
+            crop_margin: Padding in source pixels kept around the detected text region
+            reclean_only: Never run OCR; re-clean cached raw text and report uncached images as errors
+            phash_threshold: Reuse the OCR text of a previously seen image whose perceptual hash
+                is within this many bits; None disables perceptual deduplication. The index
+                is stored in the cache directory, or kept in memory without a cache.
+            batch_size: Number of images stitched into one page per OCR call; 1 OCRs each
+                image on its own
+            collect_stats: Time every pipeline stage of every image. iter_results() and
+                aprocess() pass each image's record to every callable in stats_hooks.
+            tesseract_config: Tesseract command-line config, e.g. '--oem 1 --psm 6'
+            downscale: Resampling factor applied to each image before preprocessing
+            sharpen: Whether preprocessing ends with the sharpening convolution
+            two_tier: OCR each image first with fast_config and without preprocessing, and
+                run the full pipeline only on images whose mean word confidence is below
+                min_confidence or whose text does not parse into three options
+            fast_config: Tesseract command-line config of the two-tier fast pass
+            min_confidence: Mean word confidence (0-100) a fast-pass result needs to be kept
+            ocr_timeout: Seconds one image's OCR may take before tesseract is stopped and
+                the image is retried once, binarized and resampled by fallback_downscale,
+                with fallback_config. None waits indefinitely.
+            fallback_config: Tesseract command-line config of the retry after a timeout
+            fallback_downscale: Resampling factor of the retry after a timeout
+        """
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = max_workers or cpu_count
+        self.ocr_threads = ocr_threads or max(1, cpu_count // self.max_workers)
+        self.enable_preprocessing = enable_preprocessing
+        self.binarize = binarize
+        self.auto_crop = auto_crop
+        self.target_line_height = target_line_height
+        self.scale_bounds = scale_bounds
+        self.crop_margin = crop_margin
+        # Crop record of each image until iter_results() hands it on with pop_image_record()
+        self.crop_boxes = {}
+        self.reclean_only = reclean_only
+        self.batch_size = batch_size
+        # Per-image stage timings, keyed like crop_boxes, until handed to stats_hooks
+        self.stage_times = {} if collect_stats else None
+        self.stats_hooks = []
+        self.downscale = downscale
+        self.sharpen = sharpen
+        self._sharpen_kernel = sharpen_kernel(self.SHARPNESS_FACTOR)
+        self.tesseract_config = tesseract_config
+        self.two_tier = two_tier
+        self.fast_config = fast_config
+        self.min_confidence = min_confidence
+        # Which two-tier pass produced each OCR'd image's text, keyed like crop_boxes:
+        # 'fast', or the reason it was escalated ('low_confidence' or 'unparsed')
+        self.ocr_tiers = {}
+        self.tally = RunTally()
+        self.ocr_timeout = ocr_timeout
+        self.fallback_config = fallback_config
+        self.fallback_downscale = fallback_downscale
+        # Images whose OCR timed out, keyed like crop_boxes: 'recovered' if the
+        # fallback retry finished in time, otherwise 'timed_out'
+        self.ocr_timeouts = {}
+        self.cache = cache
+        self.executor = executor
+        # Process-pool workers each own a single-engine backend, so the parent needs none
+        self.backend = create_ocr_backend(ocr_backend, 1 if executor == 'process' else self.max_workers,
+                                          self.ocr_threads)
+        self._cache_settings = None
+        # Bound concurrent OCR calls from aprocess(), one semaphore per event loop that used this processor
+        self._ocr_slots = weakref.WeakKeyDictionary()
+        # Worker pool kept alive between iter_results() calls by open_pool()
+        self._pool = None
+        self._worker_kwargs = dict(
+            max_workers=1, ocr_threads=self.ocr_threads, enable_preprocessing=enable_preprocessing,
+            cache=cache, ocr_backend=ocr_backend, binarize=binarize, auto_crop=auto_crop,
+            target_line_height=target_line_height, scale_bounds=scale_bounds,
+            crop_margin=crop_margin, reclean_only=reclean_only, phash_threshold=phash_threshold,
+            batch_size=batch_size, collect_stats=collect_stats, downscale=downscale, sharpen=sharpen,
+            two_tier=two_tier, fast_config=fast_config, min_confidence=min_confidence,
+            ocr_timeout=ocr_timeout, fallback_config=fallback_config, fallback_downscale=fallback_downscale,
+        )
+
+        self.phash_index = None
+        if phash_threshold is not None:
+            index_path = None
+            if cache is not None:
+                # One index per OCR configuration, like the OCR cache keys
+                settings_digest = hashlib.sha256(self.cache_settings().encode()).hexdigest()[:16]
+                index_path = cache.cache_dir.parent / 'phash' / f"{settings_digest}.jsonl"
+            self.phash_index = PerceptualIndex(index_path, PHASH_GRID[0] * PHASH_GRID[1], phash_threshold)
+
+    def close(self) -> None:
+        """Shut down the worker pool, if open, and release OCR backend resources."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self.backend.close()
+
+    def _create_executor(self):
+        if self.executor == 'process':
+            return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_process_worker,
+                                       initargs=(self._worker_kwargs, self.tesseract_config))
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def open_pool(self) -> None:
+        """
+        Keep one worker pool alive until close() instead of starting one per iter_results() call.
+
+        Process-pool workers then keep their warm OCR engines between calls,
+        and several threads may run iter_results() over the shared pool at once.
+        """
+        if self._pool is None:
+            self._pool = self._create_executor()
+
+    def cache_settings(self) -> str:
+        """
+        Fingerprint of every setting that changes OCR output, used in cache keys.
+
+        Returns:
+            JSON string describing the OCR configuration
+        """
+        if self._cache_settings is None:
+            settings = {
+                'ocr_backend': self.backend.name,
+                'tesseract_version': self.backend.version(),
+                'tesseract_config': self.tesseract_config,
+                'preprocessing': {
+                    'pipeline': 'fused',
+                    # A sharpness factor of 1.0 is the identity, i.e. no sharpening
+                    'factors': [self.CONTRAST_FACTOR, self.BRIGHTNESS_FACTOR,
+                                self.SHARPNESS_FACTOR if self.sharpen else 1.0],
+                    'binarize': self.binarize,
+                } if self.enable_preprocessing else None,
+                'auto_crop': {
+                    'target_line_height': self.target_line_height,
+                    'scale_bounds': list(self.scale_bounds),
+                    'margin': self.crop_margin,
+                } if self.auto_crop else None,
+            }
+            if self.downscale != 1.0:
+                settings['downscale'] = self.downscale
+            if self.two_tier:
+                settings['two_tier'] = {'fast_config': self.fast_config, 'min_confidence': self.min_confidence}
+            if self.batch_size > 1:
+                # Stitched pages can OCR slightly differently from single images
+                settings['batch_size'] = self.batch_size
+            self._cache_settings = json.dumps(settings, sort_keys=True)
+        return self._cache_settings
+
+    def preprocess_image(self, image: Image.Image) -> Image.Image:
+        """
+        Preprocess image to improve OCR accuracy.
+
+        Applies the equivalent of the ImageEnhance Contrast, Brightness and Sharpness
+        passes (to within one grey level), fused into a single lookup table and a
+        single convolution.
+
+        Args:
+            image: PIL Image object
+            
+        Returns:
+            Preprocessed PIL Image object
+        """
+        # Convert to grayscale
+        if image.mode != 'L':
+            image = image.convert('L')
+
+        # Contrast pivots around the mean, which the histogram gives in one pass
+        histogram = image.histogram()
+        mean = int(sum(value * count for value, count in enumerate(histogram)) / max(sum(histogram), 1) + 0.5)
+        image = image.point(tone_lut(mean, self.CONTRAST_FACTOR, self.BRIGHTNESS_FACTOR))
+
+        if self.sharpen:
+            image = image.filter(self._sharpen_kernel)
+
+        if self.binarize:
+            threshold = otsu_threshold(image.histogram())
+            image = image.point([0] * (threshold + 1) + [255] * (255 - threshold), '1')
+
+        return image
+
+    def find_text_region(self, gray: Image.Image) -> Optional[Tuple[Tuple[int, int, int, int], Optional[float]]]:
+        """
+        Locate the text region of a grayscale screenshot.
+
+        Pixels that differ clearly from the dominant background shade count as ink.
+        Rows and columns whose ink density is very high are treated as UI chrome
+        (title bars, toolbars, solid panels) rather than text.
+
+        Args:
+            gray: Grayscale PIL Image object
+
+        Returns:
+            Tuple of (crop box, median text line height), or None if no text was found.
+            The line height is None when no clear text lines could be measured.
+        """
+        histogram = gray.histogram()
+        background = histogram.index(max(histogram))
+        mask = gray.point([255 if abs(value - background) > 48 else 0 for value in range(256)])
+        width, height = mask.size
+
+        # Row and column projections: averaging down to one pixel gives ink density
+        row_density = [v / 255 for v in mask.resize((1, height), Image.Resampling.BOX).tobytes()]
+        text_rows = [y for y, d in enumerate(row_density) if 0.002 <= d <= 0.5]
+        if not text_rows:
+            return None
+        top, bottom = text_rows[0], text_rows[-1] + 1
+
+        band = mask.crop((0, top, width, bottom))
+        col_density = [v / 255 for v in band.resize((width, 1), Image.Resampling.BOX).tobytes()]
+        text_cols = [x for x, d in enumerate(col_density) if 0.002 <= d <= 0.9]
+        if not text_cols:
+            return None
+        left, right = text_cols[0], text_cols[-1] + 1
+
+        box = (max(left - self.crop_margin, 0), max(top - self.crop_margin, 0),
+               min(right + self.crop_margin, width), min(bottom + self.crop_margin, height))
+
+        # Text lines are runs of consecutive ink rows; ignore specks shorter than 3px
+        runs = []
+        run_start = None
+        for y in range(top, bottom + 1):
+            is_text = y < bottom and 0.002 <= row_density[y] <= 0.5
+            if is_text and run_start is None:
+                run_start = y
+            elif not is_text and run_start is not None:
+                if y - run_start >= 3:
+                    runs.append(y - run_start)
+                run_start = None
+        line_height = float(sorted(runs)[len(runs) // 2]) if runs else None
+        return box, line_height
+
+    def perceptual_hash(self, image: Image.Image) -> int:
+        """
+        Compute a difference hash (dHash) of an image's text region.
+
+        Hashing the cropped text region rather than the whole capture makes the
+        hash insensitive to window position, margins and surrounding chrome.
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            Hash with PHASH_GRID columns x rows bits
+        """
+        gray = image if image.mode == 'L' else image.convert('L')
+        region = self.find_text_region(gray)
+        if region is not None:
+            gray = gray.crop(region[0])
+        cols, rows = PHASH_GRID
+        pixels = gray.resize((cols + 1, rows), Image.Resampling.BOX).tobytes()
+        phash = 0
+        for row in range(rows):
+            offset = row * (cols + 1)
+            for col in range(cols):
+                phash = (phash << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        return phash
+
+    def crop_to_text(self, image: Image.Image) -> Tuple[Image.Image, Optional[Dict]]:
+        """
+        Crop an image to its text region and resample it towards the target line height.
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            Tuple of (cropped image, crop record). The record holds the crop box in
+            source pixel coordinates, the source size, the measured line height and
+            the applied scale; it is None if no text region was detected.
+        """
+        gray = image if image.mode == 'L' else image.convert('L')
+        region = self.find_text_region(gray)
+        if region is None:
+            return image, None
+        box, line_height = region
+
+        scale = 1.0
+        if line_height:
+            min_scale, max_scale = self.scale_bounds
+            scale = min(max(self.target_line_height / line_height, min_scale), max_scale)
+            # Not worth a resampling pass for small adjustments
+            if abs(scale - 1.0) < 0.1:
+                scale = 1.0
+
+        cropped = image.crop(box)
+        if scale != 1.0:
+            size = (max(round(cropped.width * scale), 1), max(round(cropped.height * scale), 1))
+            cropped = cropped.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+        record = {
+            'box': list(box),
+            'source_size': list(image.size),
+            'line_height': line_height,
+            'scale': round(scale, 4),
+        }
+        return cropped, record
+
+    def postprocess_ocr_text(self, text: str) -> str:
+        """
+        Clean OCR text by removing common artifacts and unwanted characters.
+
+        Applies CLEANUP_RULES in order, then drops empty and single-character lines.
+        
+        Args:
+            text: Raw OCR text
+            
+        Returns:
+            Cleaned text
+        """
+        for pattern, replacement, guards in COMPILED_CLEANUP_RULES:
+            # A rule whose required literal is absent cannot match, so skip the scan
+            if guards is None or any(guard in text for guard in guards):
+                text = pattern.sub(replacement, text)
+
+        cleaned_lines = []
+        for line in text.split('\n'):
+            line = line.strip()
+            # Skip empty lines and lines that are just a single character (likely OCR artifacts)
+            if line and line not in SINGLE_CHAR_ARTIFACTS:
+                cleaned_lines.append(line)
+
+        return '\n'.join(cleaned_lines)
+
+    def parse_question_and_options(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Parse OCR text into question and options.
+        
+        Uses the structure of options B and C to find where option A starts.
+        Options in multiple choice questions often have similar patterns.
+        
+        Args:
+            text: Cleaned OCR text with newlines preserved
+            
+        Returns:
+            Tuple of (question_text, list of options)
+        """
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+        if not lines:
+            return '', []
+
+        full_text = ' '.join(lines)
+
+        if '?' in full_text:
+            q_end = full_text.rfind('?')
+            question = full_text[:q_end + 1].strip()
+            rest = full_text[q_end + 1:].strip()
+            options = [s.strip().rstrip('.') for s in re.split(r'\.\s+', rest) if s.strip()]
+            if len(options) >= 3:
+                return question, options[-3:]
+            elif options:
+                return question, options
+
+        segments = re.split(r'\.\s+', full_text)
+        segments = [s.strip() for s in segments if s.strip()]
+
+        if len(segments) >= 4:
+            # Last 3 are options, rest is question
+            options = [s.rstrip('.') for s in segments[-3:]]
+            question = '. '.join(segments[:-3]) + '.'
+            return question, options
+
+        elif len(segments) == 3:
+            seg_a, seg_b, seg_c = segments
+
+            words_b = seg_b.split()
+            words_c = seg_c.split()
+
+            if words_b and words_c:
+                first_b = words_b[0].lower().rstrip('.,;:')
+                first_c = words_c[0].lower().rstrip('.,;:')
+
+                # If options B and C start with same word (not too common), find it in segment A
+                common_words = {'a', 'an', 'the', 'to', 'in', 'on', 'at', 'of', 'or', 'and', 'is', 'are'}
+                if first_b == first_c and len(first_b) > 1 and first_b not in common_words:
+                    pattern = r'\b(' + re.escape(first_b) + r')\b'
+                    match = re.search(pattern, seg_a, re.IGNORECASE)
+                    if match:
+                        question = seg_a[:match.start()].strip()
+                        first_option = seg_a[match.start():].strip().rstrip('.')
+                        return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+
+                # Check if options B and C have same ending (e.g., "feet MSL", "knots")
+                last_b = words_b[-1].lower().rstrip('.,;:') if words_b else ''
+                last_c = words_c[-1].lower().rstrip('.,;:') if words_c else ''
+
+                if last_b == last_c and len(last_b) > 2:
+                    # Find where this ending pattern appears in seg_a
+                    # Look for: number + ending (e.g., "9,500 feet")
+                    pattern = r'(\d[\d,]*\s+' + re.escape(last_b) + r')\b'
+                    match = re.search(pattern, seg_a, re.IGNORECASE)
+                    if match:
+                        question = seg_a[:match.start()].strip()
+                        first_option = seg_a[match.start():].strip().rstrip('.')
+                        return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+
+            stem_patterns = [
+                r'^(.*\bindicates)\s+(.+)$',      # "indicates X"
+                r'^(.*\bis)\s+(.+)$',             # "is X" 
+                r'^(.*\bare)\s+(.+)$',            # "are X"
+                r'^(.*\bequipped with)\s+(.+)$',  # "equipped with X"
+                r'^(.*\bcaused by)\s+(.+)$',      # "caused by X"
+            ]
+
+            for pattern in stem_patterns:
+                match = re.match(pattern, seg_a, re.IGNORECASE)
+                if match:
+                    question = match.group(1).strip()
+                    first_option = match.group(2).strip().rstrip('.')
+                    return question, [first_option, seg_b.rstrip('.'), seg_c.rstrip('.')]
+
+            # Final fallback: return all as options with empty question
+            return '', [s.rstrip('.') for s in segments]
+
+        else:
+            return full_text.rstrip('.'), []
+
+    def display_key(self, image_path: Path, base_paths: List[Path] = None) -> str:
+        """
+        Get the key an image's result is reported under.
+
+        Args:
+            image_path: Path to the image file
+            base_paths: Folders being processed; with more than one, the key is prefixed
+                with the name of the folder the image is in
+
+        Returns:
+            File name of the image, or folder name and path relative to that folder
+        """
+        if base_paths and len(base_paths) > 1:
+            for base_path in base_paths:
+                try:
+                    relative_path = image_path.relative_to(base_path)
+                    if relative_path.parent == Path('.'):
+                        return f"{base_path.name}/{relative_path.name}"
+                    return f"{base_path.name}/{relative_path}"
+                except ValueError:
+                    continue
+            return str(image_path)
+        return image_path.name
+
+    def _add_stage_time(self, image_path: Path, stage: str, wall: float, cpu: float) -> None:
+        record = self.stage_times.setdefault(str(image_path), {'stages': {}})
+        timing = record['stages'].setdefault(stage, {'wall': 0.0, 'cpu': 0.0})
+        timing['wall'] += wall
+        timing['cpu'] += cpu
+
+    @contextlib.contextmanager
+    def _timed(self, image_path: Path, stage: str):
+        """Time a pipeline stage of one image when collecting stats."""
+        if self.stage_times is None:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self._add_stage_time(image_path, stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def _note_size(self, image_path: Path, size: Tuple[int, int]) -> None:
+        if self.stage_times is not None:
+            record = self.stage_times.setdefault(str(image_path), {'stages': {}})
+            record['width'], record['height'] = size
+
+    def pop_stage_times(self, image_path: Path) -> Optional[Dict]:
+        """
+        Take the stage timings recorded for an image.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Dictionary with 'stages' mapping stage name to {'wall', 'cpu'} seconds and,
+            if the image was opened, 'width' and 'height'; None if stats are off
+        """
+        if self.stage_times is None:
+            return None
+        return self.stage_times.pop(str(image_path), {'stages': {}})
+
+    def pop_image_record(self, image_path: Path) -> Dict:
+        """
+        Take the crop, two-tier and timeout records of an image.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Dictionary with whichever of 'crop', 'tier' and 'timeout' were recorded
+        """
+        record = {}
+        for name, records in (('crop', self.crop_boxes), ('tier', self.ocr_tiers), ('timeout', self.ocr_timeouts)):
+            value = records.pop(str(image_path), None)
+            if value is not None:
+                record[name] = value
+        return record
+
+    def _emit_stats(self, image_path: Path, display_key: str, text: str, record: Optional[Dict],
+                    image_record: Dict) -> None:
+        if record is None:
+            return
+        record.update(image=display_key, path=str(image_path), error=text.startswith(ERROR_PREFIX))
+        for name in ('tier', 'timeout'):
+            if name in image_record:
+                record[name] = image_record[name]
+        record['total'] = sum(timing['wall'] for timing in record['stages'].values())
+        for hook in self.stats_hooks:
+            hook(record)
+
+    def _lookup_text(self, image_path: Path) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        """
+        Find text for an image that does not need OCR.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Tuple of (cleaned_text, cache_key, phash). cleaned_text comes from the OCR
+            cache or the perceptual index, or is None if the image must be OCR'd.
+        """
+        with self._timed(image_path, 'lookup'):
+            return self._find_stored_text(image_path)
+
+    def _find_stored_text(self, image_path: Path) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(image_path, self.cache_settings())
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                logger.info("Cache hit: %s", image_path.name)
+                if entry.get('crop'):
+                    self.crop_boxes[str(image_path)] = entry['crop']
+                cleaned_text = entry['cleaned']
+                if self.reclean_only or entry.get('rules') != CLEANUP_RULES_VERSION:
+                    cleaned_text = self.postprocess_ocr_text(entry['raw'])
+                    self.cache.put(cache_key, entry['raw'], cleaned_text,
+                                   {'rules': CLEANUP_RULES_VERSION, 'crop': entry.get('crop')})
+                return cleaned_text, cache_key, None
+
+        if self.reclean_only:
+            return f"{ERROR_PREFIX} not in OCR cache (OCR is skipped with --reclean)", cache_key, None
+
+        phash = None
+        if self.phash_index is not None:
+            with open_image(image_path) as img:
+                phash = self.perceptual_hash(img)
+            match = self.phash_index.lookup(phash)
+            if match is not None:
+                logger.info("Perceptual match: %s reuses %s", image_path.name, match['src'])
+                # Not cached under this image's content key: a near match may carry the wrong text,
+                # so only the perceptual index, and only with --phash-dedup, may serve it
+                return self.postprocess_ocr_text(match['raw']), cache_key, phash
+
+        return None, cache_key, phash
+
+    def _load_ocr_input(self, image_path: Path, fast: bool = False) -> Tuple[Union[Image.Image, Path], Optional[Dict]]:
+        """
+        Decode, crop and preprocess an image for OCR.
+
+        Args:
+            image_path: Path to the image file
+            fast: Load the image as-is for the two-tier fast pass, skipping
+                downscaling, cropping and preprocessing
+
+        Returns:
+            Tuple of (ocr_input, crop) where ocr_input is an image or, for files tesseract
+            can read as-is, the path itself, and crop is the crop record or None
+        """
+        crop = None
+        if not fast and (self.enable_preprocessing or self.auto_crop or self.downscale != 1.0):
+            with open_image(image_path) as img:
+                with self._timed(image_path, 'decode'):
+                    img.load()
+                self._note_size(image_path, img.size)
+                with self._timed(image_path, 'preprocess'):
+                    ocr_input = img
+                    if self.enable_preprocessing and img.mode != 'L':
+                        ocr_input = img.convert('L')
+                    if self.downscale != 1.0:
+                        ocr_input = ocr_input.resize((max(1, round(ocr_input.width * self.downscale)),
+                                                      max(1, round(ocr_input.height * self.downscale))),
+                                                     Image.Resampling.LANCZOS, reducing_gap=2.0)
+                    if self.auto_crop:
+                        ocr_input, crop = self.crop_to_text(ocr_input)
+                    if self.enable_preprocessing:
+                        ocr_input = self.preprocess_image(ocr_input)
+        elif is_passthrough_image(image_path):
+            # Let tesseract decode the original file; no re-encode round-trip
+            ocr_input = image_path
+            if self.stage_times is not None:
+                with open_image(image_path) as img:
+                    self._note_size(image_path, img.size)
+        else:
+            with open_image(image_path) as img:
+                with self._timed(image_path, 'decode'):
+                    img.load()
+                self._note_size(image_path, img.size)
+                ocr_input = img
+
+        if crop is not None:
+            self.crop_boxes[str(image_path)] = crop
+            logger.debug("Cropped %s to %s at scale %s", image_path.name, crop['box'], crop['scale'])
+        return ocr_input, crop
+
+    def _store_text(self, image_path: Path, text: str, cache_key: Optional[str],
+                    phash: Optional[int], crop: Optional[Dict]) -> str:
+        """
+        Clean freshly OCR'd text and record it in the cache and perceptual index.
+
+        Args:
+            image_path: Path to the image file
+            text: Raw OCR text
+            cache_key: OCR cache key from _lookup_text(), or None without a cache
+            phash: Perceptual hash from _lookup_text(), or None without an index
+            crop: Crop record from _load_ocr_input()
+
+        Returns:
+            Cleaned text
+        """
+        with self._timed(image_path, 'cleanup'):
+            cleaned_text = self.postprocess_ocr_text(text)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, text, cleaned_text, {'rules': CLEANUP_RULES_VERSION, 'crop': crop})
+        if phash is not None:
+            self.phash_index.add(phash, text, image_path)
+
+        return cleaned_text
+
+    def _finish_text(self, image_path: Path, text: Optional[str], cache_key: Optional[str],
+                     phash: Optional[int], crop: Optional[Dict]) -> str:
+        """
+        Turn the outcome of _ocr_loaded() into an image's result text.
+
+        Args:
+            image_path: Path to the image file
+            text: Raw OCR text, or None if OCR timed out even on retry
+            cache_key: OCR cache key from _lookup_text(), or None without a cache
+            phash: Perceptual hash from _lookup_text(), or None without an index
+            crop: Crop record from _load_ocr_input()
+
+        Returns:
+            Cleaned text, or a TIMEOUT_PREFIX status
+        """
+        if text is None:
+            return f"{TIMEOUT_PREFIX} OCR did not finish within {self.ocr_timeout:g}s, even with the fallback"
+        if str(image_path) in self.ocr_timeouts:
+            # Keep the lower-quality fallback text out of the cache so later runs try again
+            cache_key = phash = None
+        return self._store_text(image_path, text, cache_key, phash, crop)
+
+    def _error_result(self, image_path: Path, base_paths: Optional[List[Path]], error: Exception) -> Tuple[str, str]:
+        logger.error("Error processing %s: %s", image_path.name, str(error))
+        display_key = image_path.name if not base_paths else str(image_path)
+        return display_key, f"{ERROR_PREFIX} {str(error)}"
+
+    def process_image(self, image_path: Path, base_paths: List[Path] = None) -> Tuple[str, str]:
+        """
+        Process a single image and extract text.
+
+        Args:
+            image_path: Path to the image file
+            base_paths: List of base paths to compute relative path from
+
+        Returns:
+            Tuple of (display_key, extracted_text) where display_key includes folder info
+        """
+        try:
+            display_key = self.display_key(image_path, base_paths)
+            cleaned_text, cache_key, phash = self._lookup_text(image_path)
+            if cleaned_text is not None:
+                return display_key, cleaned_text
+
+            logger.info("Processing: %s", image_path.name)
+            ocr_input, crop = self._load_ocr_input(image_path, fast=self.two_tier)
+            try:
+                [(text, crop)] = self._ocr_loaded([(image_path, ocr_input, crop)])
+            finally:
+                close_images([ocr_input])
+            return display_key, self._finish_text(image_path, text, cache_key, phash, crop)
+        except Exception as e:
+            return self._error_result(image_path, base_paths, e)
+
+    def _fast_pass_tier(self, words: List[Dict], text: str) -> str:
+        """
+        Decide whether a two-tier fast-pass result is good enough to keep.
+
+        Args:
+            words: Words from the fast pass
+            text: Raw text of those words
+
+        Returns:
+            'fast' to keep the result, otherwise the reason to escalate it:
+            'low_confidence' or 'unparsed'
+        """
+        confidences = [word['conf'] for word in words if word['conf'] >= 0]
+        if not confidences or sum(confidences) / len(confidences) < self.min_confidence:
+            return 'low_confidence'
+        _, options = self.parse_question_and_options(self.postprocess_ocr_text(text))
+        if len(options) != 3:
+            return 'unparsed'
+        return 'fast'
+
+    def _ocr_images(self, image_paths: List[Path], images: List[Union[Image.Image, Path]], config: str,
+                    stage: str = 'ocr', words: bool = False) -> List:
+        """
+        OCR loaded images with one backend call, stitching several into one page.
+
+        Args:
+            image_paths: Source path of each image
+            images: OCR inputs from _load_ocr_input()
+            config: Tesseract command-line config
+            stage: Stats stage charged with the call; images share it equally
+            words: Return word records instead of text
+
+        Returns:
+            Raw OCR text, or words from parse_tesseract_tsv(), of each image; None for
+            images whose OCR exceeded ocr_timeout. A stitched page gets ocr_timeout per
+            image on it and is OCR'd again image by image if it times out.
+        """
+        if len(images) > 1 and any(isinstance(image, Path) for image in images):
+            # Stitching needs pixels; decode files that were to be passed by path, and release them after
+            decoded = []
+            for image_path, image in zip(image_paths, images):
+                if isinstance(image, Path):
+                    with open_image(image) as img, self._timed(image_path, 'decode'):
+                        img.load()
+                        image = img
+                decoded.append(image)
+            try:
+                return self._ocr_images(image_paths, decoded, config, stage, words)
+            finally:
+                close_images(image for image, original in zip(decoded, images) if isinstance(original, Path))
+
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            if len(images) == 1 and words:
+                results = [self.backend.image_to_data(images[0], config, self.ocr_timeout)]
+            elif len(images) == 1:
+                results = [self.backend.image_to_string(images[0], config, self.ocr_timeout).strip()]
+            else:
+                tiles = self.ocr_stitched_words(images, config)
+                results = tiles if words else [words_to_text(tile) for tile in tiles]
+        except OCRTimeout:
+            results = None
+        if self.stage_times is not None:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            for image_path in image_paths:
+                self._add_stage_time(image_path, stage, wall / len(images), cpu / len(images))
+
+        if results is None and len(images) == 1:
+            return [None]
+        if results is None:
+            logger.warning("Stitched page of %d images timed out; OCRing them one at a time", len(images))
+            return [self._ocr_images([image_path], [image], config, stage, words)[0]
+                    for image_path, image in zip(image_paths, images)]
+        return results
+
+    def _load_fallback_input(self, image_path: Path) -> Image.Image:
+        """
+        Decode an image for the retry after an OCR timeout: grayscale, resampled and binarized.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            1-bit PIL Image object
+        """
+        with open_image(image_path) as img, self._timed(image_path, 'preprocess'):
+            image = img.convert('L')
+            if self.fallback_downscale != 1.0:
+                image = image.resize((max(1, round(image.width * self.fallback_downscale)),
+                                      max(1, round(image.height * self.fallback_downscale))),
+                                     Image.Resampling.LANCZOS, reducing_gap=2.0)
+            threshold = otsu_threshold(image.histogram())
+            return image.point([0] * (threshold + 1) + [255] * (255 - threshold), '1')
+
+    def _record_retry(self, image_path: Path, text: Optional[str]) -> None:
+        self.ocr_timeouts[str(image_path)] = 'timed_out' if text is None else 'recovered'
+        if text is None:
+            logger.error("OCR of %s timed out again with the fallback", image_path.name)
+
+    def _ocr_fallback(self, image_paths: List[Path]) -> Dict[Path, Optional[str]]:
+        """
+        Retry images whose OCR timed out, one at a time, with the cheaper fallback.
+
+        Args:
+            image_paths: Images that timed out
+
+        Returns:
+            Dictionary mapping each image to its raw OCR text, or None if it timed out again
+        """
+        results = {}
+        for image_path in image_paths:
+            logger.warning("OCR of %s exceeded %gs; retrying with the fallback", image_path.name, self.ocr_timeout)
+            fallback_input = self._load_fallback_input(image_path)
+            try:
+                [text] = self._ocr_images([image_path], [fallback_input], self.fallback_config, 'retry')
+            finally:
+                fallback_input.close()
+            self._record_retry(image_path, text)
+            results[image_path] = text
+        return results
+
+    def _ocr_loaded(self, loaded: List[Tuple[Path, Union[Image.Image, Path], Optional[Dict]]]
+                    ) -> List[Tuple[str, Optional[Dict]]]:
+        """
+        OCR loaded images, through a fast pass first when two-tier OCR is on.
+
+        Escalated images are loaded again with the full pipeline and OCR'd
+        together with the regular tesseract config. Images whose OCR exceeds
+        ocr_timeout in either pass are retried with the fallback.
+
+        Args:
+            loaded: (image_path, ocr_input, crop) tuples from _load_ocr_input(),
+                loaded with fast=self.two_tier
+
+        Returns:
+            (raw_text, crop) of each image, in order; raw_text is None if OCR timed out even on retry
+        """
+        image_paths = [image_path for image_path, _, _ in loaded]
+        images = [ocr_input for _, ocr_input, _ in loaded]
+        results = {}
+        timed_out = []
+        if not self.two_tier:
+            for (image_path, _, crop), text in zip(loaded, self._ocr_images(image_paths, images,
+                                                                             self.tesseract_config)):
+                if text is None:
+                    timed_out.append(image_path)
+                else:
+                    results[image_path] = text, crop
+            results.update((image_path, (text, None)) for image_path, text in self._ocr_fallback(timed_out).items())
+            return [results[image_path] for image_path in image_paths]
+
+        escalated = []
+        for image_path, words in zip(image_paths, self._ocr_images(image_paths, images, self.fast_config,
+                                                                   words=True)):
+            if words is None:
+                # Even the cheap pass stalled; go straight to the fallback
+                timed_out.append(image_path)
+                continue
+            text = words_to_text(words)
+            tier = self._fast_pass_tier(words, text)
+            self.ocr_tiers[str(image_path)] = tier
+            if tier == 'fast':
+                results[image_path] = text, None
+            else:
+                logger.info("Escalating %s: %s", image_path.name, tier.replace('_', ' '))
+                escalated.append((image_path, *self._load_ocr_input(image_path)))
+
+        if escalated:
+            try:
+                texts = self._ocr_images([image_path for image_path, _, _ in escalated],
+                                         [ocr_input for _, ocr_input, _ in escalated], self.tesseract_config,
+                                         'escalate')
+            finally:
+                close_images(ocr_input for _, ocr_input, _ in escalated)
+            for (image_path, _, crop), text in zip(escalated, texts):
+                if text is None:
+                    timed_out.append(image_path)
+                else:
+                    results[image_path] = text, crop
+        results.update((image_path, (text, None)) for image_path, text in self._ocr_fallback(timed_out).items())
+        return [results[image_path] for image_path in image_paths]
+
+    def process_batch(self, image_paths: List[Path], base_paths: List[Path] = None) -> List[Tuple[str, str]]:
+        """
+        Process several images with one OCR call on a stitched page.
+
+        Images served by the cache or the perceptual index are not stitched.
+        The rest are preprocessed as usual, stacked into one page and OCR'd
+        once, and the words are split back per image by their bounding boxes.
+
+        Args:
+            image_paths: List of image file paths
+            base_paths: List of base paths to compute relative paths from
+
+        Returns:
+            List of (display_key, extracted_text) tuples in the order of image_paths
+        """
+        if len(image_paths) == 1:
+            return [self.process_image(image_paths[0], base_paths)]
+
+        results = {}
+        pending = []
+        for image_path in image_paths:
+            try:
+                display_key = self.display_key(image_path, base_paths)
+                cleaned_text, cache_key, phash = self._lookup_text(image_path)
+                if cleaned_text is not None:
+                    results[image_path] = display_key, cleaned_text
+                    continue
+                logger.info("Processing: %s", image_path.name)
+                ocr_input, crop = self._load_ocr_input(image_path, fast=self.two_tier)
+                pending.append((image_path, display_key, ocr_input, cache_key, phash, crop))
+            except Exception as e:
+                results[image_path] = self._error_result(image_path, base_paths, e)
+
+        try:
+            texts = self._ocr_loaded([(image_path, ocr_input, crop)
+                                      for image_path, _, ocr_input, _, _, crop in pending]) if pending else []
+            for (image_path, display_key, _, cache_key, phash, _), (text, crop) in zip(pending, texts):
+                results[image_path] = display_key, self._finish_text(image_path, text, cache_key, phash, crop)
+        except Exception as e:
+            for image_path, _, _, _, _, _ in pending:
+                results[image_path] = self._error_result(image_path, base_paths, e)
+        finally:
+            close_images(ocr_input for _, _, ocr_input, _, _, _ in pending)
+
+        return [results[image_path] for image_path in image_paths]
+
+    def ocr_stitched(self, images: List[Image.Image]) -> List[str]:
+        """
+        OCR several images as stitched pages and split the text back per image.
+
+        Args:
+            images: Preprocessed images
+
+        Returns:
+            Raw OCR text of each image
+        """
+        return [words_to_text(tile) for tile in self.ocr_stitched_words(images, self.tesseract_config)]
+
+    def ocr_stitched_words(self, images: List[Image.Image], config: str) -> List[List[Dict]]:
+        """
+        OCR several images as stitched pages and split the words back per image.
+
+        Args:
+            images: Images to OCR
+            config: Tesseract command-line config
+
+        Returns:
+            Words of each image, with boxes relative to the stitched page
+        """
+        tiles = []
+        start = 0
+        while start < len(images):
+            # Fill each page up to the height tesseract accepts
+            end = start + 1
+            height = images[start].height + 2 * STITCH_GAP
+            while end < len(images) and height + images[end].height + STITCH_GAP <= MAX_STITCH_HEIGHT:
+                height += images[end].height + STITCH_GAP
+                end += 1
+
+            montage, tops = stitch_images(images[start:end])
+            timeout = self.ocr_timeout * (end - start) if self.ocr_timeout else None
+            try:
+                tiles.extend(split_words_by_tile(self.backend.image_to_data(montage, config, timeout), tops))
+            finally:
+                montage.close()
+            start = end
+        return tiles
+
+    def process_images_parallel(self, image_paths: List[Path], base_paths: List[Path] = None) -> Dict[str, str]:
+        """
+        Process multiple images in parallel.
+
+        Args:
+            image_paths: List of image file paths
+            base_paths: List of base paths to compute relative paths from
+
+        Returns:
+            Dictionary mapping display key (with folder info) to extracted text
+        """
+        return dict(self.iter_images(image_paths, base_paths))
+
+    def iter_images(self, image_paths: List[Path], base_paths: List[Path] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Process multiple images in parallel, yielding each result as soon as it completes.
+
+        Args:
+            image_paths: List of image file paths
+            base_paths: List of base paths to compute relative paths from
+
+        Yields:
+            Tuples of (display_key, extracted_text) in completion order
+        """
+        for _, display_key, text, _, _ in self.iter_results(image_paths, base_paths):
+            yield display_key, text
+
+    def run_pipeline(self, image_path: Path, base_paths: List[Path] = None,
+                     parse: bool = False) -> Tuple[str, str, Optional[Tuple[str, List[str]]]]:
+        """
+        Run the full per-image pipeline: OCR and cleanup, then optionally parsing.
+
+        Args:
+            image_path: Path to the image file
+            base_paths: List of base paths to compute relative path from
+            parse: Whether to parse the text into question and options
+
+        Returns:
+            Tuple of (display_key, extracted_text, question) where question is the
+            (question_text, options) tuple, or None if not parsed or OCR failed
+        """
+        display_key, text = self.process_image(image_path, base_paths)
+        question = None
+        if parse and not text.startswith(FAILURE_PREFIXES):
+            with self._timed(image_path, 'parse'):
+                question = self.parse_question_and_options(text)
+        return display_key, text, question
+
+    def run_batch_pipeline(self, image_paths: List[Path], base_paths: List[Path] = None,
+                           parse: bool = False) -> List[Tuple[str, str, Optional[Tuple[str, List[str]]]]]:
+        """
+        Run the per-image pipeline over a batch of images sharing one OCR call.
+
+        Args:
+            image_paths: List of image file paths
+            base_paths: List of base paths to compute relative paths from
+            parse: Whether to parse each text into question and options
+
+        Returns:
+            List of (display_key, extracted_text, question) tuples in the order of image_paths
+        """
+        results = []
+        for image_path, (display_key, text) in zip(image_paths, self.process_batch(image_paths, base_paths)):
+            question = None
+            if parse and not text.startswith(FAILURE_PREFIXES):
+                with self._timed(image_path, 'parse'):
+                    question = self.parse_question_and_options(text)
+            results.append((display_key, text, question))
+        return results
+
+    def iter_results(self, image_paths: Iterable[Path], base_paths: List[Path] = None,
+                     parse: bool = False, max_in_flight: int = None
+                     ) -> Iterator[Tuple[Path, str, str, Optional[Tuple[str, List[str]]], Dict]]:
+        """
+        Like iter_images(), but also yields the source path, optionally the parsed question, and the image's record.
+
+        Batches are submitted only while fewer than max_in_flight are unfinished
+        or unconsumed, so memory and open files stay flat for any number of
+        images. Closing the iterator early cancels images that have not started yet.
+
+        Args:
+            image_paths: Image file paths; may be a lazy iterable
+            base_paths: List of base paths to compute relative paths from
+            parse: Whether workers also parse the text into question and options
+            max_in_flight: Maximum number of batches submitted but not yet yielded.
+                Defaults to twice max_workers.
+
+        Yields:
+            Tuples of (image_path, display_key, extracted_text, question, record) in completion
+            order, where question is None unless parse is set and OCR succeeded, and record is
+            from pop_image_record(). Records are counted in tally and not kept otherwise.
+        """
+        batch_size = self.batch_size
+        if isinstance(image_paths, (list, tuple)):
+            # Never batch so much that workers sit idle
+            batch_size = max(1, min(batch_size, -(-len(image_paths) // self.max_workers)))
+        paths = iter(image_paths)
+        batches = iter(lambda: list(itertools.islice(paths, batch_size)), [])
+
+        if self.executor == 'process':
+            task = functools.partial(_process_in_worker, base_paths=base_paths, parse=parse)
+        else:
+            task = functools.partial(self.run_batch_pipeline, base_paths=base_paths, parse=parse)
+
+        executor = self._pool or self._create_executor()
+        completed = submit_bounded(executor, task, batches, max_in_flight or 2 * self.max_workers)
+        try:
+            for batch, future in completed:
+                for image_path, result in zip(batch, future.result()):
+                    if self.executor == 'process':
+                        display_key, text, question, record, stats = result
+                        if question is not None:
+                            question = (question[0], list(question[1]))
+                    else:
+                        display_key, text, question = result
+                        record = self.pop_image_record(image_path)
+                        stats = self.pop_stage_times(image_path)
+                    logger.info("Completed: %s", display_key)
+                    self._emit_stats(image_path, display_key, text, stats, record)
+                    self.tally.add(image_path, record)
+                    yield image_path, display_key, text, question, record
+        finally:
+            completed.close()
+            if executor is not self._pool:
+                executor.shutdown()
+
+    async def aprocess_image(self, image_path: Path, base_paths: List[Path] = None) -> Tuple[str, str]:
+        """
+        Async version of process_image().
+
+        Cache lookups, decoding and preprocessing run in the event loop's default
+        executor; OCR goes through the backend's async API, at most max_workers
+        calls at a time across the aprocess_image() calls on this processor that
+        run in the same event loop.
+
+        Args:
+            image_path: Path to the image file
+            base_paths: List of base paths to compute relative path from
+
+        Returns:
+            Tuple of (display_key, extracted_text)
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._ocr_slots:
+            # A semaphore is bound to the loop that first waits on it, so each loop gets its own
+            self._ocr_slots[loop] = asyncio.Semaphore(self.max_workers)
+        try:
+            display_key = self.display_key(image_path, base_paths)
+            cleaned_text, cache_key, phash = await asyncio.to_thread(self._lookup_text, image_path)
+            if cleaned_text is not None:
+                return display_key, cleaned_text
+
+            logger.info("Processing: %s", image_path.name)
+            text, crop, timed_out = None, None, False
+            if self.two_tier:
+                ocr_input, _ = await asyncio.to_thread(self._load_ocr_input, image_path, True)
+                try:
+                    words = await self._aocr(image_path, ocr_input, self.fast_config, 'ocr', words=True)
+                finally:
+                    close_images([ocr_input])
+                timed_out = words is None
+                if words is not None:
+                    tier = self._fast_pass_tier(words, words_to_text(words))
+                    self.ocr_tiers[str(image_path)] = tier
+                    if tier == 'fast':
+                        text = words_to_text(words)
+                    else:
+                        logger.info("Escalating %s: %s", image_path.name, tier.replace('_', ' '))
+
+            if text is None and not timed_out:
+                ocr_input, crop = await asyncio.to_thread(self._load_ocr_input, image_path)
+                try:
+                    text = await self._aocr(image_path, ocr_input, self.tesseract_config,
+                                            'escalate' if self.two_tier else 'ocr')
+                finally:
+                    close_images([ocr_input])
+            if text is None:
+                logger.warning("OCR of %s exceeded %gs; retrying with the fallback", image_path.name, self.ocr_timeout)
+                ocr_input = await asyncio.to_thread(self._load_fallback_input, image_path)
+                try:
+                    text = await self._aocr(image_path, ocr_input, self.fallback_config, 'retry')
+                finally:
+                    ocr_input.close()
+                self._record_retry(image_path, text)
+                crop = None
+            cleaned_text = await asyncio.to_thread(self._finish_text, image_path, text, cache_key, phash, crop)
+            return display_key, cleaned_text
+        except Exception as e:
+            return self._error_result(image_path, base_paths, e)
+
+    async def _aocr(self, image_path: Path, image: Union[Image.Image, Path], config: str, stage: str,
+                    words: bool = False) -> Optional[Union[str, List[Dict]]]:
+        """
+        OCR one loaded image through the backend's async API within ocr_timeout.
+
+        Args:
+            image_path: Path to the image file
+            image: OCR input
+            config: Tesseract command-line config
+            stage: Stats stage charged with the call
+            words: Return word records instead of text
+
+        Returns:
+            Raw OCR text or words, or None if OCR exceeded ocr_timeout
+        """
+        async with self._ocr_slots[asyncio.get_running_loop()]:
+            wall = time.perf_counter()
+            try:
+                if words:
+                    result = await self.backend.aimage_to_data(image, config, self.ocr_timeout)
+                else:
+                    result = (await self.backend.aimage_to_string(image, config, self.ocr_timeout)).strip()
+            except OCRTimeout:
+                result = None
+        if self.stage_times is not None:
+            # The event loop thread runs other images meanwhile, so only wall time is meaningful
+            self._add_stage_time(image_path, stage, time.perf_counter() - wall, 0.0)
+        return result
+
+    async def aprocess(self, image_paths: Iterable[Path], base_paths: List[Path] = None,
+                       max_in_flight: int = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Process images on the running event loop, yielding each result as soon as it completes.
+
+        Paths are pulled from image_paths only while fewer than max_in_flight
+        images are unfinished or unconsumed, so a slow consumer holds back new
+        work. Closing the iterator or cancelling the consumer cancels every
+        in-flight image and kills its tesseract subprocess. Images are always
+        OCR'd one at a time; batch_size and executor do not apply.
+
+        Args:
+            image_paths: Image file paths; may be a lazy iterable
+            base_paths: List of base paths to compute relative paths from
+            max_in_flight: Maximum number of images started but not yet yielded.
+                Defaults to twice max_workers.
+
+        Yields:
+            Tuples of (display_key, extracted_text) in completion order
+        """
+        max_in_flight = max_in_flight or 2 * self.max_workers
+        paths = iter(image_paths)
+        pending = set()
+        task_paths = {}
+        try:
+            while True:
+                for image_path in paths:
+                    task = asyncio.ensure_future(self.aprocess_image(image_path, base_paths))
+                    task_paths[task] = image_path
+                    pending.add(task)
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    image_path = task_paths.pop(task)
+                    display_key, text = task.result()
+                    record = self.pop_image_record(image_path)
+                    logger.info("Completed: %s", display_key)
+                    self._emit_stats(image_path, display_key, text, self.pop_stage_times(image_path), record)
+                    self.tally.add(image_path, record)
+                    yield display_key, text
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Sorted sample values
+        q: Percentile in [0, 100]
+
+    Returns:
+        Smallest value with at least q percent of the values at or below it, or 0.0 if empty
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+class StatsReport:
+    """
+    Collects the per-image stage timings of a run and summarizes them.
+
+    An instance is a stats hook: append it to ImageProcessor.stats_hooks.
+    """
+
+    def __init__(self):
+        """Start the run clock."""
+        self.records = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.elapsed = None
+
+    def __call__(self, record: Dict) -> None:
+        """
+        Record one image's timings.
+
+        Args:
+            record: Stage timings passed to ImageProcessor.stats_hooks
+        """
+        with self._lock:
+            self.records.append(record)
+
+    def finish(self) -> None:
+        """Stop the run clock."""
+        self.elapsed = time.perf_counter() - self._start
+
+    def summary(self, top_n: int = DEFAULT_STATS_TOP_N) -> Dict:
+        """
+        Summarize the collected timings.
+
+        Args:
+            top_n: Number of slowest images to list
+
+        Returns:
+            Dictionary with 'images', 'elapsed', 'images_per_sec', per-stage 'stages'
+            (count, total and p50/p95/p99 of wall and CPU seconds) and 'slowest' images
+        """
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self._start
+        stages = {}
+        for stage in STATS_STAGES:
+            timings = [record['stages'][stage] for record in self.records if stage in record['stages']]
+            if not timings:
+                continue
+            stages[stage] = {'count': len(timings)}
+            for kind in ('wall', 'cpu'):
+                values = sorted(timing[kind] for timing in timings)
+                stages[stage][kind] = {
+                    'total': sum(values),
+                    'p50': percentile(values, 50),
+                    'p95': percentile(values, 95),
+                    'p99': percentile(values, 99),
+                }
+        slowest = sorted(self.records, key=lambda record: record['total'], reverse=True)[:top_n]
+        return {
+            'images': len(self.records),
+            'elapsed': elapsed,
+            'images_per_sec': len(self.records) / elapsed if elapsed > 0 else 0.0,
+            'stages': stages,
+            'slowest': [{
+                'image': record['image'],
+                'total': record['total'],
+                'width': record.get('width'),
+                'height': record.get('height'),
+                'stages': {stage: timing['wall'] for stage, timing in record['stages'].items()},
+            } for record in slowest],
+        }
+
+    def write(self, output_path: Path, top_n: int = DEFAULT_STATS_TOP_N) -> None:
+        """
+        Write the summary and every per-image record as JSON.
+
+        Args:
+            output_path: Path of the JSON file
+            top_n: Number of slowest images to list in the summary
+        """
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': self.summary(top_n), 'images': self.records}, f, indent=1)
+
+    def print_summary(self, top_n: int = DEFAULT_STATS_TOP_N) -> None:
+        """
+        Print per-stage percentiles and the slowest images.
+
+        Args:
+            top_n: Number of slowest images to list
+        """
+        summary = self.summary(top_n)
+        print(f"\n⏱️  {summary['images']} image(s) in {summary['elapsed']:.2f} s "
+              f"({summary['images_per_sec']:.2f} images/sec)")
+        print(f"   {'stage':<12}{'images':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'wall s':>10}{'cpu s':>10}")
+        for stage, stats in summary['stages'].items():
+            wall = stats['wall']
+            print(f"   {stage:<12}{stats['count']:>8}{wall['p50'] * 1000:>10.1f}{wall['p95'] * 1000:>10.1f}"
+                  f"{wall['p99'] * 1000:>10.1f}{wall['total']:>10.2f}{stats['cpu']['total']:>10.2f}")
+        if summary['slowest']:
+            print("   Slowest images:")
+            for record in summary['slowest']:
+                size = f"{record['width']}x{record['height']}" if record['width'] else "size unknown"
+                stages = ', '.join(f"{stage} {wall * 1000:.0f}" for stage, wall in record['stages'].items())
+                print(f"   - {record['image']} ({size}): {record['total'] * 1000:.0f} ms ({stages})")
+
+
+def print_tier_summary(tier_counts: Dict[str, int]) -> None:
+    """
+    Print how many OCR'd images the two-tier fast pass settled and why the rest were escalated.
+
+    Args:
+        tier_counts: RunTally.tier_counts
+    """
+    total = sum(tier_counts.values())
+    counts = dict({tier: 0 for tier in ('fast', 'low_confidence', 'unparsed')}, **tier_counts)
+    escalated = total - counts['fast']
+    print(f"\n🎯 Two-tier OCR: {counts['fast']}/{total} image(s) kept the fast pass "
+          f"({counts['fast'] / total * 100:.1f}%), {escalated} escalated ({escalated / total * 100:.1f}%: "
+          f"{counts['low_confidence']} low confidence, {counts['unparsed']} without three options)")
+
+
+def host_fingerprint(ocr_backend: str) -> str:
+    """
+    Identify this host and backend for stored autotune results.
+
+    Args:
+        ocr_backend: Name of the OCR backend
+
+    Returns:
+        Fingerprint string
+    """
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}|{ocr_backend}"
+
+
+def load_tuned_settings(ocr_backend: str) -> Optional[Dict[str, int]]:
+    """
+    Load the autotuned worker settings stored for this host.
+
+    Args:
+        ocr_backend: Name of the OCR backend
+
+    Returns:
+        Dictionary with 'workers' and 'ocr_threads', or None if this host was never tuned
+    """
+    try:
+        with open(AUTOTUNE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get(host_fingerprint(ocr_backend))
+    except (OSError, ValueError):
+        return None
+
+
+def save_tuned_settings(ocr_backend: str, settings: Dict[str, int]) -> None:
+    """
+    Persist autotuned worker settings for this host.
+
+    Args:
+        ocr_backend: Name of the OCR backend
+        settings: Dictionary with 'workers' and 'ocr_threads'
+    """
+    try:
+        with open(AUTOTUNE_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    stored[host_fingerprint(ocr_backend)] = settings
+    AUTOTUNE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(AUTOTUNE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+
+def autotune_candidates(cpu_count: int, vary_threads: bool = True) -> List[Tuple[int, Optional[int]]]:
+    """
+    List the (workers, ocr_threads) combinations worth benchmarking.
+
+    Args:
+        cpu_count: Number of CPUs on the host
+        vary_threads: Whether the OCR backend honours ocr_threads; if not, only worker
+            counts are listed, with ocr_threads None
+
+    Returns:
+        List of (workers, ocr_threads) tuples
+    """
+    worker_counts = {cpu_count}
+    workers = 1
+    while workers < cpu_count:
+        worker_counts.add(workers)
+        workers *= 2
+    if not vary_threads:
+        return [(workers, None) for workers in sorted(worker_counts)]
+    return [
+        (workers, threads)
+        for workers in sorted(worker_counts)
+        for threads in (1, 2, 4)
+        if workers * threads <= cpu_count * 2
+    ]
+
+
+def autotune_sample(image_paths: List[Path], size: int) -> List[Path]:
+    """
+    Pick the images autotune benchmarks with, spread across folders.
+
+    Folders are taken in turn, so a sample from several practice tests mixes
+    their screenshot sizes instead of only covering the first folder.
+
+    Args:
+        image_paths: Images to sample from
+        size: Number of images to pick
+
+    Returns:
+        Up to size images
+    """
+    folders = {}
+    for image_path in image_paths:
+        folders.setdefault(image_path.parent, []).append(image_path)
+    interleaved = [image_path for group in itertools.zip_longest(*folders.values())
+                   for image_path in group if image_path is not None]
+    return interleaved[:size]
+
+
+def autotune(image_paths: List[Path], processor_kwargs: Dict,
+             sample_size: int = DEFAULT_AUTOTUNE_SAMPLE) -> Dict[str, Optional[int]]:
+    """
+    Benchmark worker/thread combinations on a sample of images and store the fastest.
+
+    The sample holds at least AUTOTUNE_IMAGES_PER_WORKER images per worker of
+    the largest candidate, and is processed once untimed first so the first
+    candidate does not pay for loading the model and filling the page cache.
+
+    Args:
+        image_paths: Images to sample from
+        processor_kwargs: ImageProcessor settings to benchmark with (cache is ignored)
+        sample_size: Minimum number of images processed per combination
+
+    Returns:
+        Dictionary with the best 'workers' and 'ocr_threads'
+    """
+    kwargs = dict(processor_kwargs, cache=None, reclean_only=False)
+    # In-process engines cannot change their OpenMP limit, so every thread count would measure the same
+    vary_threads = kwargs.get('ocr_backend', 'pytesseract') != 'tesserocr'
+    candidates = autotune_candidates(os.cpu_count() or 1, vary_threads)
+    max_workers = max(workers for workers, _ in candidates)
+    wanted = max(sample_size, AUTOTUNE_IMAGES_PER_WORKER * max_workers)
+    sample = autotune_sample(image_paths, wanted)
+    if not sample:
+        raise ValueError("No images to autotune with")
+    if len(sample) < wanted:
+        logger.warning("Autotune has only %d images for up to %d workers; results for large worker counts "
+                       "will be less reliable", len(sample), max_workers)
+
+    processor = ImageProcessor(**dict(kwargs, max_workers=max_workers))
+    try:
+        processor.process_images_parallel(sample)
+    finally:
+        processor.close()
+
+    best = None
+    for workers, threads in candidates:
+        processor = ImageProcessor(**dict(kwargs, max_workers=workers, ocr_threads=threads))
+        try:
+            start = time.perf_counter()
+            processor.process_images_parallel(sample)
+            rate = len(sample) / (time.perf_counter() - start)
+        finally:
+            processor.close()
+        logger.info("Autotune: %d workers x %s threads: %.2f images/sec", workers, threads or 'default', rate)
+        if best is None or rate > best[0]:
+            best = (rate, workers, threads)
+
+    settings = {'workers': best[1], 'ocr_threads': best[2]}
+    save_tuned_settings(kwargs.get('ocr_backend', 'pytesseract'), settings)
+    logger.info("Autotune picked %d workers x %s threads (%.2f images/sec), saved to %s",
+                best[1], best[2] or 'default', best[0], AUTOTUNE_FILE)
+    return settings
+
+
+def get_image_files(folder_path: Path) -> List[Path]:
+    """
+    Get all supported image files from the specified folder.
+
+    Multi-page TIFF files are listed as one page reference per page (see image_pages()).
+
+    Args:
+        folder_path: Path to the folder containing images
+
+    Returns:
+        List of image file paths and page references
+    """
+    if not folder_path.exists():
+        raise FileNotFoundError(f"Folder not found: {folder_path}")
+
+    if not folder_path.is_dir():
+        raise NotADirectoryError(f"Path is not a directory: {folder_path}")
+
+    image_files = [
+        file_path for file_path in folder_path.iterdir()
+        if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS
+    ]
+
+    if not image_files:
+        logger.warning("No supported image files found in %s", folder_path)
+        return []
+
+    image_paths = [page for file_path in sorted(image_files) for page in image_pages(file_path)]
+    if len(image_paths) > len(image_files):
+        logger.info("Found %d image files with %d pages in %s", len(image_files), len(image_paths), folder_path)
+    else:
+        logger.info("Found %d image files in %s", len(image_files), folder_path)
+    return image_paths
+
+
+def get_image_files_from_multiple_folders(folder_paths: List[Path]) -> List[Path]:
+    """
+    Get all supported image files from multiple folders.
+
+    Args:
+        folder_paths: List of paths to folders containing images
+
+    Returns:
+        List of image file paths from all folders
+    """
+    all_image_files = []
+    for folder_path in folder_paths:
+        try:
+            image_files = get_image_files(folder_path)
+            all_image_files.extend(image_files)
+        except (FileNotFoundError, NotADirectoryError) as e:
+            logger.warning("Skipping %s: %s", folder_path, str(e))
+            continue
+
+    if all_image_files:
+        logger.info("Total: %d image files found across %d folder(s)",
+                   len(all_image_files), len(folder_paths))
+    return sorted(all_image_files)
+
+
+def display_results(results: Dict[str, str]) -> None:
+    """
+    Display the OCR results to console.
+
+    Args:
+        results: Dictionary mapping display key (with folder info) to extracted text
+    """
+    print("\n" + "="*80)
+    print("OCR RESULTS")
+    print("="*80)
+
+    for display_key, text in sorted(results.items()):
+        print(f"\n--- {display_key} ---")
+        if text.startswith(ERROR_PREFIX):
+            print(f"❌ {text}")
+        elif text.startswith(TIMEOUT_PREFIX):
+            print(f"⏱️  {text}")
+        else:
+            lines = text.split('\n')
+            for line in lines:
+                if line.strip():
+                    print(line.strip())
+        print("-" * 40)
+
+
+def parse_answer_key(answer_key_path: Path) -> Dict[int, Tuple[str, str]]:
+    """
+    Parse an answer key file and extract question number and answer text.
+
+    Args:
+        answer_key_path: Path to the answer-key.md file
+
+    Returns:
+        Dictionary mapping question number to (answer_letter, answer_text) tuple.
+        answer_letter will be an empty string since answer keys now only contain text.
+    """
+    answers = {}
+    if not answer_key_path.exists():
+        logger.warning("Answer key not found: %s", answer_key_path)
+        return answers
+
+    try:
+        with open(answer_key_path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                answer_text = line
+                answers[line_num] = ('', answer_text)
+    except Exception as e:
+        logger.error("Error reading answer key %s: %s", answer_key_path, str(e))
+
+    return answers
+
+
+def get_question_images(folder_path: Path) -> Dict[int, Path]:
+    """
+    Get question image files from a folder, sorted by question number.
+
+    A multi-page TIFF named qN holds questions N, N+1, ..., one per page. If
+    two files claim the same question number, the file with the lower N wins.
+
+    Args:
+        folder_path: Path to the folder containing question images
+
+    Returns:
+        Dictionary mapping question number to image path or page reference
+    """
+    question_images = {}
+    pattern = re.compile(r'^q(\d+)\.(png|jpg|jpeg|tif|tiff)$', re.IGNORECASE)
+
+    question_files = []
+    for file_path in folder_path.iterdir():
+        if file_path.is_file():
+            match = pattern.match(file_path.name)
+            if match:
+                question_files.append((int(match.group(1)), file_path))
+
+    for first_num, file_path in sorted(question_files):
+        for question_num, image_path in enumerate(image_pages(file_path), first_num):
+            if question_num in question_images:
+                logger.warning("Skipping %s: question %d is already %s",
+                               image_path.name, question_num, question_images[question_num].name)
+                continue
+            question_images[question_num] = image_path
+
+    return question_images
+
+
+CSV_HEADER = ['Question', 'Options', 'Answer']
+
+
+def export_to_csv(folder_path: Path, questions: Dict[int, Tuple[str, List[str]]],
+                  answers: Dict[int, Tuple[str, str]],
+                  output_path: Optional[Path] = None) -> Path:
+    """
+    Export questions and answers to a CSV file.
+
+    Args:
+        folder_path: Path to the folder containing the questions
+        questions: Dictionary mapping question number to (question_text, options) tuple
+        answers: Dictionary mapping question number to (answer_letter, answer_text) tuple
+        output_path: Optional path for the CSV file. If None, uses folder_path/questions.csv
+
+    Returns:
+        Path to the created CSV file
+    """
+    if output_path is None:
+        output_path = folder_path / "questions.csv"
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADER)
+
+        all_question_nums = sorted(set(questions.keys()) | set(answers.keys()))
+
+        for q_num in all_question_nums:
+            writer.writerow(format_csv_row(questions.get(q_num), answers.get(q_num)))
+    logger.info("Exported CSV to: %s", output_path)
+    return output_path
+
+
+def format_csv_row(question: Optional[Tuple[str, List[str]]],
+                   answer: Optional[Tuple[str, str]]) -> List[str]:
+    """
+    Format one question as a CSV row.
+
+    Args:
+        question: (question_text, options) tuple, or None if there is no question image
+        answer: (answer_letter, answer_text) tuple, or None if there is no answer
+
+    Returns:
+        Row of [question, options, answer] strings
+    """
+    if question is not None:
+        question_text, options = question
+        question_text = question_text.replace('\n', ' ').strip()
+        options_str = ' | '.join(options)
+    else:
+        question_text = ''
+        options_str = ''
+
+    answer_text = answer[1] if answer is not None else ''
+    return [question_text, options_str, answer_text]
+
+
+class StreamingCSVWriter:
+    """
+    Writes question rows to CSV in question order while results arrive out of order.
+
+    Rows are written to '<output>.partial' and flushed as soon as every earlier
+    question has been written, so an interrupted run keeps its completed prefix.
+    close() renames the partial file into place.
+    """
+
+    def __init__(self, output_path: Path, question_nums: List[int]):
+        """
+        Open the partial CSV file and write the header.
+
+        Args:
+            output_path: Final path of the CSV file
+            question_nums: Every question number that will be written
+        """
+        self.output_path = output_path
+        self.partial_path = output_path.with_name(output_path.name + '.partial')
+        self._order = sorted(question_nums)
+        self._next = 0
+        self._pending = {}
+        self._file = open(self.partial_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADER)
+        self._file.flush()
+
+    def add(self, q_num: int, row: List[str]) -> None:
+        """
+        Queue a row and write out every row that is now in order.
+
+        Args:
+            q_num: Question number of the row
+            row: CSV row from format_csv_row()
+        """
+        self._pending[q_num] = row
+        written = False
+        while self._next < len(self._order) and self._order[self._next] in self._pending:
+            self._writer.writerow(self._pending.pop(self._order[self._next]))
+            self._next += 1
+            written = True
+        if written:
+            self._file.flush()
+
+    def close(self) -> Path:
+        """
+        Finish the CSV file and move it into place.
+
+        Returns:
+            Path to the completed CSV file
+        """
+        missing = self._order[self._next:]
+        if missing:
+            logger.warning("No result for questions %s in %s", missing, self.output_path)
+            for q_num in missing:
+                self._writer.writerow(self._pending.pop(q_num, format_csv_row(None, None)))
+            self._next = len(self._order)
+        self._file.close()
+        os.replace(self.partial_path, self.output_path)
+        return self.output_path
+
+    def abort(self) -> None:
+        """Close the partial file without moving it into place."""
+        self._file.close()
+
+
+MANIFEST_NAME = "questions.manifest.json"
+
+
+class ExportManifest:
+    """
+    Records the inputs and parsed rows of a folder's CSV export.
+
+    Every question image is stored with its size, mtime and SHA-256 next to its
+    parsed (question, options). A re-run reuses the row of any image whose
+    size and mtime are unchanged, or whose content hash still matches, and only
+    OCRs the rest. The manifest is rewritten as results arrive, so an interrupted
+    export resumes where it stopped.
+    """
+
+    SAVE_INTERVAL = 1.0
+
+    def __init__(self, path: Path, settings: str, reuse: bool = True):
+        """
+        Load the manifest, discarding it if it was built with different settings.
+
+        Args:
+            path: Path of the manifest file
+            settings: Fingerprint of the OCR and cleanup settings the rows depend on
+            reuse: Whether rows from an existing manifest may be reused
+        """
+        self.path = path
+        self.settings = settings
+        self.images = {}
+        self.answer_key = None
+        self._last_save = 0.0
+        if reuse and path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('settings') == settings:
+                    self.images = data.get('images', {})
+                else:
+                    logger.info("OCR settings changed since %s was written, rebuilding", path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable manifest %s: %s", path, str(e))
+
+    def lookup(self, image_path: Path) -> Optional[Tuple[str, List[str]]]:
+        """
+        Get the stored row for an image if the image is unchanged.
+
+        Args:
+            image_path: Path of the question image
+
+        Returns:
+            (question_text, options) tuple, or None if the image is new or changed
+        """
+        entry = self.images.get(image_path.name)
+        if entry is None:
+            return None
+        # Pages of a multi-page TIFF are checked against the whole file
+        file_path, _ = split_page_reference(image_path)
+        stat = file_path.stat()
+        if entry['size'] != stat.st_size:
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            # Touched but possibly identical (e.g. re-copied); fall back to the content hash
+            if _file_sha256_at(file_path, stat.st_size, stat.st_mtime_ns) != entry['sha256']:
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+        return entry['question'][0], list(entry['question'][1])
+
+    def record(self, image_path: Path, question: Tuple[str, List[str]]) -> None:
+        """
+        Store the parsed row of a freshly OCR'd image.
+
+        Args:
+            image_path: Path of the question image
+            question: (question_text, options) tuple
+        """
+        file_path, _ = split_page_reference(image_path)
+        stat = file_path.stat()
+        self.images[image_path.name] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_sha256_at(file_path, stat.st_size, stat.st_mtime_ns),
+            'question': [question[0], list(question[1])],
+        }
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self.save()
+
+    def record_answer_key(self, answer_key_path: Path) -> None:
+        """
+        Store the size, mtime and hash of the answer key the CSV was built from.
+
+        Args:
+            answer_key_path: Path of answer-key.md
+        """
+        stat = answer_key_path.stat()
+        self.answer_key = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(answer_key_path),
+        }
+
+    def prune(self, image_names: List[str]) -> None:
+        """
+        Drop entries for images that no longer exist.
+
+        Args:
+            image_names: File names of the folder's current question images
+        """
+        keep = set(image_names)
+        self.images = {name: entry for name, entry in self.images.items() if name in keep}
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        data = {
+            'settings': self.settings,
+            'answer_key': self.answer_key,
+            'images': self.images,
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+
+class FolderExport:
+    """Tracks the CSV export of one practice-test folder while its images are OCR'd."""
+
+    def __init__(self, folder_path: Path, answers: Dict[int, Tuple[str, str]],
+                 question_images: Dict[int, Path], manifest: Optional[ExportManifest] = None):
+        """
+        Start the folder's CSV and write the rows that need no OCR.
+
+        Args:
+            folder_path: Path to the practice-test folder
+            answers: Parsed answer key from parse_answer_key()
+            question_images: Question images from get_question_images()
+            manifest: Optional manifest supplying rows for unchanged images
+        """
+        self.folder_path = folder_path
+        self.answers = answers
+        self.question_images = question_images
+        self.manifest = manifest
+        self.path_to_question = {img_path: q_num for q_num, img_path in question_images.items()}
+        self.questions = {}
+
+        all_question_nums = sorted(set(question_images.keys()) | set(answers.keys()))
+        self.writer = StreamingCSVWriter(folder_path / "questions.csv", all_question_nums)
+        self.pending_images = []
+        for q_num in all_question_nums:
+            if q_num not in question_images:
+                self.writer.add(q_num, format_csv_row(None, answers.get(q_num)))
+                continue
+            question = manifest.lookup(question_images[q_num]) if manifest is not None else None
+            if question is not None:
+                self.questions[q_num] = question
+                self.writer.add(q_num, format_csv_row(question, answers.get(q_num)))
+            else:
+                self.pending_images.append(question_images[q_num])
+        self.remaining = len(self.pending_images)
+
+        if manifest is not None and len(self.pending_images) < len(question_images):
+            logger.info("Reusing %d unchanged question(s) from %s",
+                        len(question_images) - len(self.pending_images), manifest.path)
+
+    def add_result(self, img_path: Path, question: Optional[Tuple[str, List[str]]]) -> None:
+        """
+        Hand one parsed question's row to the CSV writer.
+
+        Args:
+            img_path: Path of the question image
+            question: (question_text, options) tuple, or None if OCR failed
+        """
+        q_num = self.path_to_question[img_path]
+        if question is not None:
+            self.questions[q_num] = question
+        self.writer.add(q_num, format_csv_row(question or ('', []), self.answers.get(q_num)))
+        # Failed images are left out of the manifest so the next run retries them
+        if question is not None and self.manifest is not None:
+            self.manifest.record(img_path, question)
+        self.remaining -= 1
+
+    def finish(self) -> Path:
+        """
+        Complete the CSV file and save the manifest.
+
+        Returns:
+            Path to the created CSV file
+        """
+        csv_path = self.writer.close()
+        if self.manifest is not None:
+            self.manifest.record_answer_key(self.folder_path / "answer-key.md")
+            self.manifest.prune([img_path.name for img_path in self.question_images.values()])
+            self.manifest.save()
+        logger.info("Exported CSV to: %s", csv_path)
+        return csv_path
+
+    def abort(self) -> None:
+        """Stop the export, keeping the partial CSV and the manifest written so far."""
+        self.writer.abort()
+        if self.manifest is not None:
+            self.manifest.save()
+
+
+def prepare_folder_export(folder_path: Path, manifest_settings: Optional[str] = None,
+                          reuse: bool = True, manifest_images: Optional[Dict[str, Dict]] = None
+                          ) -> Optional[FolderExport]:
+    """
+    Read a folder's answer key and question images and start its CSV export.
+
+    Args:
+        folder_path: Path to the folder to process
+        manifest_settings: Settings fingerprint for the folder's manifest; None disables the manifest
+        reuse: Whether rows recorded in an existing manifest may be reused
+        manifest_images: Manifest entries to start from instead of the folder's existing
+            manifest, e.g. merged from shard manifests
+
+    Returns:
+        FolderExport for the folder, or None if it cannot be exported
+    """
+    answer_key_path = folder_path / "answer-key.md"
+    if not answer_key_path.exists():
+        logger.warning("No answer-key.md found in %s, skipping", folder_path)
+        return None
+
+    answers = parse_answer_key(answer_key_path)
+    logger.info("Parsed %d answers from %s", len(answers), answer_key_path)
+
+    question_images = get_question_images(folder_path)
+    if not question_images:
+        logger.warning("No question images found in %s", folder_path)
+        return None
+
+    logger.info("Found %d question images in %s", len(question_images), folder_path)
+    manifest = None
+    if manifest_settings is not None:
+        manifest = ExportManifest(folder_path / MANIFEST_NAME, manifest_settings,
+                                  reuse and manifest_images is None)
+        if manifest_images is not None:
+            manifest.images = dict(manifest_images)
+    return FolderExport(folder_path, answers, question_images, manifest)
+
+
+class QuestionBankDB:
+    """
+    SQLite question bank with normalized tables and an FTS5 full-text index.
+
+    Each exported folder becomes a test. Its questions, options and answers
+    are upserted in a single transaction, so re-exporting a folder updates its
+    rows in place and keeps question ids stable. question_fts indexes question
+    and option text with rowid = questions.id.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tests (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            exported_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY,
+            test_id INTEGER NOT NULL REFERENCES tests(id) ON DELETE CASCADE,
+            number INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            image TEXT,
+            UNIQUE (test_id, number)
+        );
+        CREATE TABLE IF NOT EXISTS options (
+            question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+            letter TEXT NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (question_id, letter)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS answers (
+            question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+            letter TEXT NOT NULL,
+            text TEXT NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5(
+            question, options, tokenize = 'porter unicode61'
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open the database, creating the schema if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def upsert_test(self, folder_path: Path, questions: Dict[int, Tuple[str, List[str]]],
+                    answers: Dict[int, Tuple[str, str]], question_images: Dict[int, Path]) -> int:
+        """
+        Insert or update one practice test and all of its questions.
+
+        Questions no longer in the folder are deleted with their options,
+        answers and index entries.
+
+        Args:
+            folder_path: Path to the practice-test folder
+            questions: Dictionary mapping question number to (question_text, options) tuple
+            answers: Dictionary mapping question number to (answer_letter, answer_text) tuple
+            question_images: Dictionary mapping question number to image path
+
+        Returns:
+            Id of the test row
+        """
+        numbers = sorted(set(questions.keys()) | set(answers.keys()))
+        with self.conn:
+            test_id = self.conn.execute(
+                "INSERT INTO tests (path, name, exported_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET name = excluded.name, exported_at = excluded.exported_at "
+                "RETURNING id",
+                (str(folder_path), folder_path.name, time.strftime('%Y-%m-%dT%H:%M:%S')),
+            ).fetchone()[0]
+
+            self.conn.execute(
+                "DELETE FROM question_fts WHERE rowid IN (SELECT id FROM questions WHERE test_id = ?)",
+                (test_id,))
+            self.conn.execute(
+                f"DELETE FROM questions WHERE test_id = ? AND number NOT IN ({','.join('?' * len(numbers))})",
+                (test_id, *numbers))
+            self.conn.executemany(
+                "INSERT INTO questions (test_id, number, text, image) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (test_id, number) DO UPDATE SET text = excluded.text, image = excluded.image",
+                [(test_id, q_num, questions.get(q_num, ('', []))[0].replace('\n', ' ').strip(),
+                  question_images[q_num].name if q_num in question_images else None)
+                 for q_num in numbers])
+            question_ids = dict(self.conn.execute(
+                "SELECT number, id FROM questions WHERE test_id = ?", (test_id,)))
+
+            id_list = [question_ids[q_num] for q_num in numbers]
+            self.conn.execute(
+                f"DELETE FROM options WHERE question_id IN ({','.join('?' * len(id_list))})", id_list)
+            self.conn.executemany(
+                "INSERT INTO options (question_id, letter, text) VALUES (?, ?, ?)",
+                [(question_ids[q_num], chr(ord('A') + position), option)
+                 for q_num in numbers
+                 for position, option in enumerate(questions.get(q_num, ('', []))[1])])
+            self.conn.execute(
+                f"DELETE FROM answers WHERE question_id IN ({','.join('?' * len(id_list))})", id_list)
+            self.conn.executemany(
+                "INSERT INTO answers (question_id, letter, text) VALUES (?, ?, ?)",
+                [(question_ids[q_num], *answers[q_num]) for q_num in numbers if q_num in answers])
+            self.conn.executemany(
+                "INSERT INTO question_fts (rowid, question, options) VALUES (?, ?, ?)",
+                [(question_ids[q_num], questions[q_num][0].replace('\n', ' ').strip(),
+                  ' | '.join(questions[q_num][1]))
+                 for q_num in numbers if q_num in questions])
+
+        logger.info("Exported %d questions from %s to: %s", len(numbers), folder_path.name, self.db_path)
+        return test_id
+
+    def search(self, query: str, limit: int = 50, rank: bool = False) -> List[Tuple[str, int, str, str]]:
+        """
+        Full-text search over question and option text.
+
+        Args:
+            query: FTS5 query, e.g. 'VOR' or 'density NEAR altitude'
+            limit: Maximum number of results
+            rank: Order by relevance (bm25) instead of export order. Ranking scores
+                every match before applying the limit, so it is slower for common terms.
+
+        Returns:
+            List of (test_name, question_number, question_text, answer_text) tuples
+        """
+        return self.conn.execute(
+            "SELECT tests.name, questions.number, questions.text, COALESCE(answers.text, '') "
+            "FROM question_fts "
+            "JOIN questions ON questions.id = question_fts.rowid "
+            "JOIN tests ON tests.id = questions.test_id "
+            "LEFT JOIN answers ON answers.question_id = questions.id "
+            f"WHERE question_fts MATCH ? ORDER BY {'rank' if rank else 'question_fts.rowid'} LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+
+def export_settings(processor: ImageProcessor) -> str:
+    """
+    Fingerprint of the OCR and cleanup settings that exported rows depend on.
+
+    Args:
+        processor: ImageProcessor instance for OCR
+
+    Returns:
+        Settings string stored in export and shard manifests
+    """
+    settings = [processor.cache_settings(), CLEANUP_RULES_VERSION]
+    phash_index = getattr(processor, 'phash_index', None)
+    if phash_index is not None:
+        # Rows reused from a perceptual match must not be reused by runs that would OCR them
+        settings.append({'phash_threshold': phash_index.threshold})
+    return json.dumps(settings)
+
+
+def process_folders_to_csv(folder_paths: List[Path], processor: ImageProcessor,
+                           incremental: bool = True,
+                           question_bank: Optional[QuestionBankDB] = None) -> List[Path]:
+    """
+    Export several folders to CSV through one shared pool of OCR workers.
+
+    Images from every folder are scheduled together, largest file first, so
+    workers never idle at the tail of one folder while another still has work.
+    Each folder's CSV is finished as soon as its last question completes.
+    A manifest next to each CSV lets re-runs OCR only new or changed images.
+
+    Args:
+        folder_paths: Paths to the folders to process
+        processor: ImageProcessor instance for OCR
+        incremental: Whether to reuse rows of unchanged images from each folder's manifest
+        question_bank: Optional SQLite question bank that each finished folder is upserted into
+
+    Returns:
+        Paths to the created CSV files, in the order of folder_paths
+    """
+    manifest_settings = export_settings(processor)
+    exports = []
+    for folder_path in folder_paths:
+        if not folder_path.exists() or not folder_path.is_dir():
+            logger.warning("Skipping invalid folder: %s", folder_path)
+            continue
+        export = prepare_folder_export(folder_path, manifest_settings, reuse=incremental)
+        if export is not None:
+            exports.append(export)
+
+    csv_paths = {}
+    path_to_export = {}
+
+    def finish(export: FolderExport) -> None:
+        csv_paths[export.folder_path] = export.finish()
+        if question_bank is not None:
+            question_bank.upsert_test(export.folder_path, export.questions, export.answers,
+                                      export.question_images)
+
+    for export in exports:
+        if export.remaining == 0:
+            finish(export)
+        for img_path in export.pending_images:
+            path_to_export[img_path] = export
+    # Largest images take longest to OCR; starting them first shortens the makespan
+    image_paths = sorted(path_to_export, key=image_file_size, reverse=True)
+
+    try:
+        for img_path, _, _, question, _ in processor.iter_results(image_paths, folder_paths, parse=True):
+            export = path_to_export[img_path]
+            export.add_result(img_path, question)
+            if export.remaining == 0:
+                finish(export)
+    except BaseException:
+        for export in exports:
+            if export.remaining:
+                export.abort()
+        raise
+
+    return [csv_paths[export.folder_path] for export in exports]
+
+
+def process_folder_to_csv(folder_path: Path, processor: ImageProcessor) -> Optional[Path]:
+    """
+    Process a folder containing question images and answer key, then export to CSV.
+
+    Args:
+        folder_path: Path to the folder to process
+        processor: ImageProcessor instance for OCR
+
+    Returns:
+        Path to the created CSV file, or None if processing failed
+    """
+    csv_paths = process_folders_to_csv([folder_path], processor)
+    return csv_paths[0] if csv_paths else None
+
+
+SHARD_MANIFEST_NAME = "questions.shard-{index}-of-{count}.manifest.json"
+SHARD_MANIFEST_PATTERN = re.compile(r'^questions\.shard-(\d+)-of-(\d+)\.manifest\.json$')
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard given as 'I/N' on the command line.
+
+    Args:
+        value: Shard number and shard count, 1 <= I <= N
+
+    Returns:
+        Tuple of (index, count)
+
+    Raises:
+        argparse.ArgumentTypeError: If value is not a valid shard
+    """
+    index, separator, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not separator or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"expected I/N with 1 <= I <= N, got '{value}'")
+    return index, count
+
+
+def shard_of(image_path: Path, count: int) -> int:
+    """
+    Deterministic shard of an image, the same on every machine.
+
+    The hash covers only the folder name and file name, so nodes that mount
+    the archive at different paths still agree.
+
+    Args:
+        image_path: Path of the image
+        count: Number of shards
+
+    Returns:
+        Shard index, from 1 to count
+    """
+    key = f"{image_path.parent.name}/{image_path.name}".encode('utf-8')
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'big') % count + 1
+
+
+def process_folders_to_shard(folder_paths: List[Path], processor: ImageProcessor, shard: Tuple[int, int],
+                             incremental: bool = True) -> List[Path]:
+    """
+    OCR one shard of the question images of several folders, for a later merge_shards().
+
+    Each folder gets a shard manifest with the parsed rows of its images in
+    this shard. Failed images are left out, like in the export manifest. A
+    retried shard reuses its manifest and only OCRs new, changed or failed
+    images.
+
+    Args:
+        folder_paths: Paths to the folders to process
+        processor: ImageProcessor instance for OCR
+        shard: (index, count) from parse_shard()
+        incremental: Whether to reuse rows of unchanged images from the shard manifests
+
+    Returns:
+        Paths to the written shard manifests
+    """
+    index, count = shard
+    settings = export_settings(processor)
+    manifests = []
+    path_to_manifest = {}
+    for folder_path in folder_paths:
+        if not folder_path.is_dir():
+            logger.warning("Skipping invalid folder: %s", folder_path)
+            continue
+        if not (folder_path / "answer-key.md").exists():
+            logger.warning("No answer-key.md found in %s, skipping", folder_path)
+            continue
+        question_images = get_question_images(folder_path)
+        mine = [img_path for img_path in question_images.values() if shard_of(img_path, count) == index]
+        manifest = ExportManifest(folder_path / SHARD_MANIFEST_NAME.format(index=index, count=count),
+                                  settings, incremental)
+        manifest.prune([img_path.name for img_path in mine])
+        pending = [img_path for img_path in mine if manifest.lookup(img_path) is None]
+        logger.info("Shard %d/%d has %d of %d question images in %s, %d to OCR",
+                    index, count, len(mine), len(question_images), folder_path, len(pending))
+        manifests.append(manifest)
+        for img_path in pending:
+            path_to_manifest[img_path] = manifest
+    image_paths = sorted(path_to_manifest, key=image_file_size, reverse=True)
+
+    try:
+        for img_path, _, _, question, _ in processor.iter_results(image_paths, folder_paths, parse=True):
+            if question is not None:
+                path_to_manifest[img_path].record(img_path, question)
+    finally:
+        for manifest in manifests:
+            manifest.save()
+    return [manifest.path for manifest in manifests]
+
+
+def merge_shards(folder_path: Path, question_bank: Optional[QuestionBankDB] = None) -> Optional[Path]:
+    """
+    Combine a folder's shard manifests into its questions.csv and export manifest.
+
+    The shard manifests are only read, so the merge can be re-run at any time,
+    e.g. after a failed shard was retried. Shards written with different OCR
+    settings are not mixed: the settings of the newest shard manifest win.
+    Images without a valid row in any shard get an empty row.
+
+    Args:
+        folder_path: Path to the practice-test folder
+        question_bank: Optional SQLite question bank the merged folder is upserted into
+
+    Returns:
+        Path to the merged CSV file, or None if the folder has no shard results
+    """
+    shards = []
+    for path in folder_path.iterdir():
+        match = SHARD_MANIFEST_PATTERN.match(path.name)
+        if not match:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable shard manifest %s: %s", path, str(e))
+            continue
+        shards.append((path.stat().st_mtime_ns, path, int(match.group(2)), data))
+    if not shards:
+        logger.warning("No shard results found in %s", folder_path)
+        return None
+
+    shards.sort(key=lambda shard: shard[0])
+    _, _, count, newest = shards[-1]
+    settings = newest['settings']
+    images = {}
+    for _, path, _, data in shards:
+        if data.get('settings') != settings:
+            logger.warning("Ignoring %s: written with different OCR settings than the newest shard", path.name)
+            continue
+        images.update(data.get('images', {}))
+
+    export = prepare_folder_export(folder_path, settings, manifest_images=images)
+    if export is None:
+        return None
+    if export.pending_images:
+        missing = ', '.join(f"{img_path.name} (shard {shard_of(img_path, count)}/{count})"
+                            for img_path in sorted(export.pending_images))
+        logger.warning("%d question image(s) in %s have no shard result: %s",
+                       len(export.pending_images), folder_path, missing)
+        for img_path in list(export.pending_images):
+            export.add_result(img_path, None)
+    csv_path = export.finish()
+    if question_bank is not None:
+        question_bank.upsert_test(folder_path, export.questions, export.answers, export.question_images)
+    return csv_path
+
+
+def merge_main(argv: List[str]) -> None:
+    """
+    Command-line entry point for the merge subcommand.
+
+    Args:
+        argv: Arguments after 'merge'
+    """
+    parser = argparse.ArgumentParser(
+        prog='faa_test_parser.py merge',
+        description="Combine the results of --shard runs into each folder's questions.csv",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python faa_test_parser.py --export-csv --shard 1/3 -s practice-tests/*/   # on each of three machines
+  python faa_test_parser.py merge practice-tests/*/
+  python faa_test_parser.py merge practice-tests/*/ --export-sqlite questions.db
+        """
+    )
+    parser.add_argument(
+        'sources',
+        nargs='+',
+        help='Practice-test folders holding shard results'
+    )
+    parser.add_argument(
+        '--export-sqlite',
+        type=str,
+        metavar='DB',
+        default=None,
+        help='Also upsert the merged questions into this SQLite question bank'
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    question_bank = QuestionBankDB(Path(args.export_sqlite)) if args.export_sqlite else None
+    csv_files = []
+    try:
+        for source in args.sources:
+            folder_path = Path(source).resolve()
+            if not folder_path.is_dir():
+                logger.warning("Skipping invalid folder: %s", folder_path)
+                continue
+            csv_path = merge_shards(folder_path, question_bank)
+            if csv_path is not None:
+                csv_files.append(csv_path)
+    finally:
+        if question_bank is not None:
+            question_bank.close()
+
+    if not csv_files:
+        print("No shard results found. Run --export-csv --shard I/N first.")
+        sys.exit(1)
+    print(f"\n✅ Merged shard results into {len(csv_files)} CSV file(s):")
+    for csv_path in csv_files:
+        print(f"   - {csv_path}")
+
+
+# A file still changing after this long is treated as partially written
+DEFAULT_WATCH_SETTLE = 0.5
+DEFAULT_WATCH_INTERVAL = 1.0
+
+
+def is_watched_file(path: Path) -> bool:
+    """Whether a change to this file can change its folder's CSV."""
+    return path.name == "answer-key.md" or path.suffix.lower() in SUPPORTED_EXTENSIONS
+
+
+class Inotify:
+    """
+    Minimal ctypes binding of Linux inotify for a set of directories.
+
+    The constructor raises OSError where inotify is unavailable (other
+    platforms, exhausted watch limits), so callers can fall back to polling.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    # After these events the file is complete or gone, so it needs no settling
+    FINAL_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+    EVENT_HEADER = struct.Struct('iIII')
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, folder_paths: List[Path]):
+        """
+        Start watching the folders.
+
+        Args:
+            folder_paths: Directories to watch
+
+        Raises:
+            OSError: If inotify is unavailable or a folder cannot be watched
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            inotify_init1, inotify_add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f"inotify is not available: {e}") from e
+
+        self.fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1 failed: {os.strerror(error)}")
+        self.folders = {}
+        try:
+            for folder_path in folder_paths:
+                wd = inotify_add_watch(self.fd, os.fsencode(folder_path), self.WATCH_MASK)
+                if wd < 0:
+                    error = ctypes.get_errno()
+                    raise OSError(error, f"cannot watch {folder_path}: {os.strerror(error)}")
+                self.folders[wd] = folder_path
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def read(self, timeout: Optional[float]) -> Optional[List[Tuple[Path, int]]]:
+        """
+        Wait for file events.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            List of (path, event mask) tuples, empty on timeout, or None if the
+            kernel queue overflowed and events were lost
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, self.READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+            elif wd in self.folders and name:
+                events.append((self.folders[wd] / os.fsdecode(name), mask))
+        return None if overflow else events
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """
+    Reports settled changes to the images and answer keys of a set of folders.
+
+    Uses inotify where available and otherwise polls the folder listings. A
+    file counts as settled once it was closed after writing, moved into place
+    or deleted, or once its size and mtime have not changed for the settle
+    time, so a screenshot that is still being written is never OCR'd.
+    """
+
+    def __init__(self, folder_paths: List[Path], settle: float = DEFAULT_WATCH_SETTLE,
+                 interval: float = DEFAULT_WATCH_INTERVAL, poll: bool = False):
+        """
+        Snapshot the folders and start watching them.
+
+        Args:
+            folder_paths: Folders to watch
+            settle: Seconds a file must stay unchanged before it counts as written
+            interval: Seconds between folder scans when polling
+            poll: Poll even if inotify is available, e.g. for network shares
+        """
+        self.folder_paths = list(folder_paths)
+        self.settle = settle
+        self.interval = interval
+        self.snapshots = {folder_path: self._scan(folder_path) for folder_path in self.folder_paths}
+        # Changed files waiting to settle: path -> (size and mtime when last seen, deadline)
+        self.pending = {}
+        self.inotify = None
+        if not poll:
+            try:
+                self.inotify = Inotify(self.folder_paths)
+            except OSError as e:
+                logger.warning("Polling every %.1f s instead of using inotify: %s", interval, str(e))
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _scan(self, folder_path: Path) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    path = Path(entry.path)
+                    if is_watched_file(path) and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            logger.warning("Cannot scan %s: %s", folder_path, str(e))
+        return snapshot
+
+    def _note(self, path: Path, deadline: float) -> None:
+        self.pending[path] = (self._signature(path), deadline)
+
+    def _rescan(self) -> None:
+        """Queue every file that differs from the folder snapshots."""
+        deadline = time.monotonic() + self.settle
+        for folder_path in self.folder_paths:
+            current = self._scan(folder_path)
+            previous = self.snapshots[folder_path]
+            for path in current.keys() | previous.keys():
+                if current.get(path) != previous.get(path) and path not in self.pending:
+                    self._note(path, deadline)
+
+    def _settled(self) -> Dict[Path, List[Path]]:
+        """Take the pending files whose deadline passed without further changes."""
+        now = time.monotonic()
+        changes = {}
+        for path, (signature, deadline) in list(self.pending.items()):
+            if deadline > now:
+                continue
+            current = self._signature(path)
+            if current != signature:
+                # Still being written
+                self.pending[path] = (current, now + self.settle)
+                continue
+            del self.pending[path]
+            snapshot = self.snapshots[path.parent]
+            if current == snapshot.get(path):
+                continue
+            if current is None:
+                del snapshot[path]
+            else:
+                snapshot[path] = current
+            changes.setdefault(path.parent, []).append(path)
+        return changes
+
+    def wait(self) -> Dict[Path, List[Path]]:
+        """
+        Block until at least one file has settled.
+
+        Returns:
+            Dictionary mapping each folder with settled changes to its changed files
+        """
+        while True:
+            changes = self._settled()
+            if changes:
+                return changes
+            timeout = self.interval
+            if self.pending:
+                next_deadline = min(deadline for _, deadline in self.pending.values())
+                timeout = min(timeout, max(0.0, next_deadline - time.monotonic()))
+
+            if self.inotify is None:
+                time.sleep(timeout)
+                self._rescan()
+                continue
+            events = self.inotify.read(timeout)
+            if events is None:
+                logger.warning("Missed file events, rescanning the watched folders")
+                self._rescan()
+                continue
+            now = time.monotonic()
+            for path, mask in events:
+                if is_watched_file(path):
+                    self._note(path, now if mask & Inotify.FINAL_EVENTS else now + self.settle)
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+
+def watch_folders(folder_paths: List[Path], processor: ImageProcessor, incremental: bool = True,
+                  question_bank: Optional[QuestionBankDB] = None, settle: float = DEFAULT_WATCH_SETTLE,
+                  interval: float = DEFAULT_WATCH_INTERVAL, poll: bool = False) -> None:
+    """
+    Export folders to CSV, then keep each CSV current as screenshots land, until Ctrl+C.
+
+    The worker pool stays open between updates, and each folder's manifest
+    limits an update to the images that are new or changed.
+
+    Args:
+        folder_paths: Paths to the folders to watch
+        processor: ImageProcessor instance for OCR
+        incremental: Whether the first export may reuse rows from each folder's manifest
+        question_bank: Optional SQLite question bank that every updated folder is upserted into
+        settle: Seconds a file must stay unchanged before it counts as written
+        interval: Seconds between folder scans when polling
+        poll: Poll even if inotify is available
+    """
+    valid_paths = []
+    for folder_path in folder_paths:
+        if folder_path.is_dir():
+            valid_paths.append(folder_path)
+        else:
+            logger.warning("Skipping invalid folder: %s", folder_path)
+
+    # An OCRClient needs no pool; the server keeps its own warm
+    if isinstance(processor, ImageProcessor):
+        processor.open_pool()
+    # Watch before the first export so screenshots saved during it are not missed
+    watcher = FolderWatcher(valid_paths, settle, interval, poll)
+    try:
+        process_folders_to_csv(valid_paths, processor, incremental, question_bank)
+        logger.info("Watching %d folder(s) for new screenshots, press Ctrl+C to stop", len(valid_paths))
+        while True:
+            changes = watcher.wait()
+            for folder_path, paths in sorted(changes.items()):
+                logger.info("%d new, changed or removed file(s) in %s", len(paths), folder_path)
+            try:
+                process_folders_to_csv(sorted(changes), processor, question_bank=question_bank)
+            except OSError as e:
+                # E.g. an image renamed mid-update; its own event triggers another update
+                logger.warning("Update failed, waiting for the next change: %s", str(e))
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
+
+
+DEFAULT_SERVER_HOST = '127.0.0.1'
+DEFAULT_SERVER_PORT = 8765
+SERVER_FILE = DEFAULT_CONFIG_DIR / 'server.json'
+# How long the server waits for more requests to merge into one batch
+DEFAULT_BATCH_WINDOW_MS = 10
+MAX_SERVER_BATCH = 256
+# Batches run at once: the next starts while one drains, later requests wait and merge
+SERVER_BATCHES_IN_FLIGHT = 2
+# The client sends images in chunks, several at a time, so the server always has the next chunk queued
+CLIENT_CHUNK_SIZE = 16
+CLIENT_CONCURRENCY = 4
+
+
+def processor_options(processor: ImageProcessor) -> Dict:
+    """
+    Settings of a processor that change how it runs but not its cache_settings() fingerprint.
+
+    Args:
+        processor: ImageProcessor to describe
+
+    Returns:
+        Dictionary mapping command-line option to its JSON-compatible value
+    """
+    cache = processor.cache
+    options = {
+        '--workers': processor.max_workers,
+        '--ocr-threads': processor.ocr_threads,
+        '--executor': processor.executor,
+        '--ocr-timeout': processor.ocr_timeout,
+        '--fallback-config': processor.fallback_config,
+        '--fallback-downscale': processor.fallback_downscale,
+        '--no-cache': cache is None,
+        '--cache-dir': str(cache.cache_dir.parent) if cache is not None else None,
+        '--cache-max-mb': cache.max_bytes // (1024 * 1024) if cache is not None else None,
+        '--phash-dedup': processor.phash_index is not None,
+        '--phash-threshold': processor.phash_index.threshold if processor.phash_index is not None else None,
+    }
+    return json.loads(json.dumps(options))
+
+
+class OCRService:
+    """
+    Runs OCR requests from many clients on one warm ImageProcessor.
+
+    Requests that arrive within the batch window are merged into one
+    iter_results() call, so --batch-size can stitch images from different
+    requests and a process pool is fed without gaps.
+    """
+
+    def __init__(self, processor: ImageProcessor, batch_window: float = DEFAULT_BATCH_WINDOW_MS / 1000,
+                 max_batch: int = MAX_SERVER_BATCH):
+        """
+        Open the processor's worker pool and start the batching thread.
+
+        Args:
+            processor: ImageProcessor shared by every request
+            batch_window: Seconds to wait for more requests before starting a batch
+            max_batch: Maximum number of images merged into one batch
+        """
+        self.processor = processor
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._jobs = queue.Queue()
+        self._batch_slots = threading.BoundedSemaphore(SERVER_BATCHES_IN_FLIGHT)
+        processor.open_pool()
+        threading.Thread(target=self._batch_loop, name='ocr-batcher', daemon=True).start()
+
+    def health(self) -> Dict:
+        """
+        Describe the running service.
+
+        Returns:
+            Dictionary with the processor's OCR settings fingerprint and pool size
+        """
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'settings': self.processor.cache_settings(),
+            'options': processor_options(self.processor),
+            'workers': self.processor.max_workers,
+            'ocr_threads': self.processor.ocr_threads,
+        }
+
+    def handle(self, request: Dict) -> List[Dict]:
+        """
+        OCR and parse the images of one request, blocking until all are done.
+
+        Args:
+            request: Dictionary with optional 'paths' (image files readable by the
+                server), 'base_paths' (folders used for display keys) and 'images'
+                (list of {'name', 'data'} with base64-encoded image bytes)
+
+        Returns:
+            One result dictionary per image, paths first, then uploaded images
+
+        Raises:
+            ValueError: If the request is malformed
+        """
+        paths = [Path(path) for path in request.get('paths') or []]
+        base_paths = [Path(path) for path in request.get('base_paths') or []]
+        images = request.get('images') or []
+        if not paths and not images:
+            raise ValueError("request has no 'paths' or 'images'")
+
+        with tempfile.TemporaryDirectory(prefix='faa-ocr-') as upload_dir:
+            for index, image in enumerate(images):
+                try:
+                    # The index keeps uploads with the same name apart
+                    upload_path = Path(upload_dir) / f"{index}-{Path(image['name']).name}"
+                    upload_path.write_bytes(base64.b64decode(image['data'], validate=True))
+                except (KeyError, TypeError, binascii.Error) as e:
+                    raise ValueError(f"invalid image #{index}: {e}")
+                paths.append(upload_path)
+
+            future = Future()
+            self._jobs.put((paths, base_paths, future))
+            results = future.result()
+
+        for result, image in zip(results[len(results) - len(images):], images):
+            result['path'] = result['key'] = image['name']
+        return results
+
+    def _batch_loop(self) -> None:
+        while True:
+            # While every slot is busy, new requests queue up and merge into the next batch
+            self._batch_slots.acquire()
+            jobs = [self._jobs.get()]
+            count = len(jobs[0][0])
+            deadline = time.monotonic() + self.batch_window
+            while count < self.max_batch:
+                try:
+                    job = self._jobs.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                count += len(job[0])
+            threading.Thread(target=self._run_batch, args=(jobs,), daemon=True).start()
+
+    def _run_batch(self, jobs: List[Tuple[List[Path], List[Path], Future]]) -> None:
+        try:
+            self._serve_batch(jobs)
+        finally:
+            self._batch_slots.release()
+
+    def _serve_batch(self, jobs: List[Tuple[List[Path], List[Path], Future]]) -> None:
+        image_paths = list(dict.fromkeys(path for paths, _, _ in jobs for path in paths))
+        logger.info("Serving %d image(s) for %d request(s)", len(image_paths), len(jobs))
+        results = {}
+        try:
+            for image_path, _, text, question, record in self.processor.iter_results(image_paths, parse=True):
+                results[image_path] = text, question, record
+        except Exception as e:
+            for _, _, future in jobs:
+                future.set_exception(e)
+            return
+
+        for paths, base_paths, future in jobs:
+            future.set_result([{
+                'path': str(path),
+                'key': self.processor.display_key(path, base_paths),
+                'text': results[path][0],
+                'question': results[path][1][0] if results[path][1] else None,
+                'options': results[path][1][1] if results[path][1] else None,
+                'crop': results[path][2].get('crop'),
+                'tier': results[path][2].get('tier'),
+                'timeout': results[path][2].get('timeout'),
+            } for path in paths])
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of OCRService: GET /health and POST /ocr with a JSON body."""
+
+    server_version = 'faa-test-parser'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': f'unknown endpoint: {self.path}'})
+            return
+        self._send_json(200, self.server.service.health())
+
+    def do_POST(self):
+        if self.path != '/ocr':
+            self._send_json(404, {'error': f'unknown endpoint: {self.path}'})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if not isinstance(request, dict):
+                raise ValueError("request body must be a JSON object")
+            results = self.server.service.handle(request)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.error("Error serving request: %s", str(e))
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'results': results})
+
+
+class OCRClient:
+    """
+    Forwards OCR to a running 'serve' process.
+
+    Provides the parts of the ImageProcessor interface the CLI uses, so
+    exports run unchanged against the server's warm workers. Paths are sent,
+    not image bytes, so the server must be able to read them.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        """
+        Connect to a server and read its settings.
+
+        Args:
+            url: Base URL of the server, e.g. http://127.0.0.1:8765
+            timeout: Seconds to wait for the health check
+
+        Raises:
+            OSError: If no server answers at url
+        """
+        self.url = url.rstrip('/')
+        health = self._request('/health', timeout=timeout)
+        self.settings = health['settings']
+        self.options = health.get('options', {})
+        self.max_workers = health['workers']
+        self.ocr_threads = health['ocr_threads']
+        self.tally = RunTally()
+
+    def _request(self, endpoint: str, body: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.url + endpoint, data=data,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.load(response)
+
+    def cache_settings(self) -> str:
+        """
+        Fingerprint of the server's OCR settings.
+
+        Returns:
+            JSON string describing the server's OCR configuration
+        """
+        return self.settings
+
+    def close(self) -> None:
+        """Nothing to release; the server keeps running."""
+
+    def process_images_parallel(self, image_paths: List[Path], base_paths: List[Path] = None) -> Dict[str, str]:
+        """Same as ImageProcessor.process_images_parallel(), run by the server."""
+        return dict(self.iter_images(image_paths, base_paths))
+
+    def iter_images(self, image_paths: List[Path], base_paths: List[Path] = None) -> Iterator[Tuple[str, str]]:
+        """Same as ImageProcessor.iter_images(), run by the server."""
+        for _, display_key, text, _, _ in self.iter_results(image_paths, base_paths):
+            yield display_key, text
+
+    def iter_results(self, image_paths: Iterable[Path], base_paths: List[Path] = None,
+                     parse: bool = False, max_in_flight: int = None
+                     ) -> Iterator[Tuple[Path, str, str, Optional[Tuple[str, List[str]]], Dict]]:
+        """Same as ImageProcessor.iter_results(), run by the server; max_in_flight counts chunks."""
+        paths = iter(image_paths)
+        chunks = iter(lambda: list(itertools.islice(paths, CLIENT_CHUNK_SIZE)), [])
+        base = [str(path) for path in base_paths or []]
+
+        def request(chunk: List[Path]) -> Dict:
+            return self._request('/ocr', {'paths': [str(path) for path in chunk], 'base_paths': base})
+
+        with ThreadPoolExecutor(max_workers=CLIENT_CONCURRENCY) as executor:
+            completed = submit_bounded(executor, request, chunks, max_in_flight or 2 * CLIENT_CONCURRENCY)
+            try:
+                for chunk, future in completed:
+                    for image_path, result in zip(chunk, future.result()['results']):
+                        record = {name: result[name] for name in ('crop', 'tier', 'timeout')
+                                  if result.get(name) is not None}
+                        self.tally.add(image_path, record)
+                        question = None
+                        if parse and result['question'] is not None:
+                            question = (result['question'], result['options'])
+                        logger.info("Completed: %s", result['key'])
+                        yield image_path, result['key'], result['text'], question, record
+            finally:
+                completed.close()
+
+
+def connect_ocr_server(url: Optional[str] = None) -> Optional[OCRClient]:
+    """
+    Connect to a running OCR server.
+
+    Args:
+        url: Server URL; defaults to the server registered in SERVER_FILE
+
+    Returns:
+        OCRClient, or None if no server is registered or it does not answer
+    """
+    if url is None:
+        try:
+            url = json.loads(SERVER_FILE.read_text(encoding='utf-8'))['url']
+        except (OSError, ValueError, KeyError):
+            return None
+    try:
+        return OCRClient(url)
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug("No OCR server at %s: %s", url, e)
+        return None
+
+
+def server_differences(client: OCRClient, processor: ImageProcessor, explicit: List[str]) -> List[str]:
+    """
+    Find the explicitly given OCR options that a server would not honour.
+
+    Args:
+        client: Connected OCRClient
+        processor: Local ImageProcessor built from the same command line
+        explicit: Options given on the command line, from explicit_processor_options()
+
+    Returns:
+        The options in explicit whose local value differs from the server's
+    """
+    local_options = processor_options(processor)
+    differing = [option for option in explicit
+                 if option in local_options and client.options.get(option) != local_options[option]]
+    if client.settings != processor.cache_settings():
+        # Anything else feeds the fingerprint; any of those options may be the cause
+        differing.extend(option for option in explicit if option not in local_options)
+    return differing
+
+
+DEFAULT_DEDUPE_THRESHOLD = 0.7
+DEFAULT_NUM_PERM = 128
+SHINGLE_SIZE = 5
+MINHASH_SLOTS_PER_SHINGLE = 4
+LSH_RECALL = 0.99
+BANK_HEADER = ['Cluster'] + CSV_HEADER + ['Count', 'Sources']
+
+
+def question_shingles(text: str, size: int = SHINGLE_SIZE) -> frozenset:
+    """
+    Break question text into overlapping character shingles.
+
+    Text is lowercased and punctuation is collapsed to single spaces first, so
+    OCR noise such as stray punctuation or doubled spaces only touches a few
+    shingles instead of the whole text.
+
+    Args:
+        text: Question and options text
+        size: Characters per shingle
+
+    Returns:
+        Set of shingles
+    """
+    normalized = ' '.join(re.sub(r'[^0-9a-z]+', ' ', text.lower()).split())
+    if len(normalized) <= size:
+        return frozenset([normalized])
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def minhash_signature(shingles: frozenset, num_perm: int = DEFAULT_NUM_PERM) -> List[int]:
+    """
+    Compute a MinHash signature with one-permutation hashing.
+
+    Each shingle is hashed once into MINHASH_SLOTS_PER_SHINGLE (bin, value)
+    pairs and every bin keeps its minimum value. Spreading each shingle over
+    several bins leaves few bins empty for short question texts without
+    changing the Jaccard similarity being estimated. Remaining empty bins
+    borrow the value of the next non-empty bin, offset by the distance, so
+    signatures stay comparable position by position. This costs
+    O(shingles + num_perm) instead of O(shingles * num_perm) for num_perm
+    independent hash functions.
+
+    Args:
+        shingles: Set of shingles
+        num_perm: Signature length
+
+    Returns:
+        Signature values, one per bin
+    """
+    empty = 1 << 64
+    signature = [empty] * num_perm
+    unpack = struct.Struct(f'<{MINHASH_SLOTS_PER_SHINGLE}Q').unpack
+    for shingle in shingles:
+        for value in unpack(hashlib.blake2b(shingle.encode(), digest_size=8 * MINHASH_SLOTS_PER_SHINGLE).digest()):
+            slot = value % num_perm
+            if value < signature[slot]:
+                signature[slot] = value
+
+    if empty in signature and len(set(signature)) > 1:
+        dense = list(signature)
+        for slot in range(num_perm):
+            distance = 0
+            while signature[(slot + distance) % num_perm] == empty:
+                distance += 1
+            if distance:
+                dense[slot] = signature[(slot + distance) % num_perm] + distance * empty
+        signature = dense
+    return signature
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick the LSH band layout for a similarity threshold.
+
+    With b bands of r rows, two signatures with Jaccard similarity s share a
+    bucket with probability 1 - (1 - s^r)^b. Candidates are verified exactly,
+    so the layout favours recall: the most rows per band (fewest false
+    candidates) that still finds LSH_RECALL of the pairs at the threshold.
+
+    Args:
+        num_perm: Signature length
+        threshold: Target Jaccard similarity
+
+    Returns:
+        (bands, rows) tuple with bands * rows <= num_perm
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= LSH_RECALL:
+            return bands, rows
+    return num_perm, 1
+
+
+def cluster_near_duplicates(texts: List[str], threshold: float = DEFAULT_DEDUPE_THRESHOLD,
+                            num_perm: int = DEFAULT_NUM_PERM) -> List[int]:
+    """
+    Group texts whose shingle sets have Jaccard similarity of at least threshold.
+
+    MinHash/LSH buckets find candidate pairs in roughly linear time; each
+    candidate is confirmed with the exact Jaccard similarity before the two
+    texts are merged. Texts whose numbers differ are never merged, since FAA
+    questions are often reused with only a heading or altitude changed.
+    Clusters are transitive: A~B and B~C puts A, B and C together.
+
+    Args:
+        texts: Texts to cluster
+        threshold: Minimum Jaccard similarity between shingle sets
+        num_perm: MinHash signature length
+
+    Returns:
+        Cluster index for each text, numbered in order of first appearance
+    """
+    shingle_sets = [question_shingles(text) for text in texts]
+    numbers = [re.findall(r'\d{2,}', text) for text in texts]
+    bands, rows = lsh_bands(num_perm, threshold)
+    parent = list(range(len(texts)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    buckets = [{} for _ in range(bands)]
+    for index, shingles in enumerate(shingle_sets):
+        signature = minhash_signature(shingles, num_perm)
+        # index stays the root of its cluster: merged clusters are attached to it
+        root = index
+        for band, bucket in enumerate(buckets):
+            members = bucket.setdefault(tuple(signature[band * rows:(band + 1) * rows]), [])
+            # Members are one representative per cluster seen in this bucket,
+            # so a bucket of many exact duplicates stays linear
+            for other in members:
+                other_root = find(other)
+                if other_root == root:
+                    break
+                other_shingles = shingle_sets[other]
+                if (numbers[index] == numbers[other]
+                        and len(shingles & other_shingles) >= threshold * len(shingles | other_shingles)):
+                    parent[other_root] = root
+                    break
+            else:
+                members.append(index)
+
+    cluster_ids = {}
+    return [cluster_ids.setdefault(find(index), len(cluster_ids)) for index in range(len(texts))]
+
+
+def read_question_bank(csv_path: Path) -> List[Tuple[str, List[str]]]:
+    """
+    Read the question rows of an exported CSV with their source references.
+
+    Args:
+        csv_path: Path to a questions.csv file
+
+    Returns:
+        List of (source_reference, [question, options, answer]) tuples for rows with question text
+    """
+    rows = []
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row_num, row in enumerate(reader, 1):
+            row = (row + [''] * len(CSV_HEADER))[:len(CSV_HEADER)]
+            if row[0].strip():
+                rows.append((f"{csv_path}#{row_num}", row))
+    return rows
+
+
+def dedupe_question_banks(csv_paths: List[Path], output_path: Path,
+                          threshold: float = DEFAULT_DEDUPE_THRESHOLD,
+                          num_perm: int = DEFAULT_NUM_PERM) -> Tuple[int, int]:
+    """
+    Merge question CSVs into one bank with near-duplicate questions collapsed.
+
+    Each cluster is written once, using its most common question/options text
+    and answer, with the number of rows and the source references it merges.
+
+    Args:
+        csv_paths: Exported questions.csv files
+        output_path: Path of the merged bank CSV
+        threshold: Minimum Jaccard similarity for two questions to be merged
+        num_perm: MinHash signature length
+
+    Returns:
+        (rows_read, clusters_written) tuple
+    """
+    rows = []
+    for csv_path in csv_paths:
+        rows.extend(read_question_bank(csv_path))
+
+    cluster_ids = cluster_near_duplicates([f"{row[0]} {row[1]}" for _, row in rows], threshold, num_perm)
+    clusters = {}
+    for (source, row), cluster_id in zip(rows, cluster_ids):
+        clusters.setdefault(cluster_id, []).append((source, row))
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(BANK_HEADER)
+        for cluster_id, members in sorted(clusters.items()):
+            texts = [tuple(row[:2]) for _, row in members]
+            # max() keeps the first of equally common values, i.e. the earliest source
+            canonical = max(texts, key=texts.count)
+            answers = [row[2] for _, row in members if row[2]]
+            answer = max(answers, key=answers.count) if answers else ''
+            if len(set(answers)) > 1:
+                logger.warning("Cluster %d has conflicting answers: %s", cluster_id, sorted(set(answers)))
+            writer.writerow([cluster_id, *canonical, answer, len(members),
+                             '; '.join(source for source, _ in members)])
+
+    logger.info("Wrote %d questions (%d rows) to: %s", len(clusters), len(rows), output_path)
+    return len(rows), len(clusters)
+
+
+def dedupe_main(argv: List[str]) -> None:
+    """
+    Command-line entry point for the dedupe subcommand.
+
+    Args:
+        argv: Arguments after 'dedupe'
+    """
+    parser = argparse.ArgumentParser(
+        prog='faa_test_parser.py dedupe',
+        description="Merge exported questions.csv files into one deduplicated question bank",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python faa_test_parser.py dedupe practice-tests/*/ -o question-bank.csv
+  python faa_test_parser.py dedupe practice-tests/2025-10-11/questions.csv practice-tests/2025-11-02 --threshold 0.7
+        """
+    )
+    parser.add_argument(
+        'sources',
+        nargs='+',
+        help='questions.csv files, or folders containing one'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default='question-bank.csv',
+        help='Path of the merged question bank (default: question-bank.csv)'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_DEDUPE_THRESHOLD,
+        help=f'Minimum Jaccard similarity of question text to merge (default: {DEFAULT_DEDUPE_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--num-perm',
+        type=int,
+        default=DEFAULT_NUM_PERM,
+        help=f'MinHash signature length (default: {DEFAULT_NUM_PERM})'
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    if not 0 < args.threshold <= 1:
+        parser.error('--threshold must be in (0, 1]')
+
+    csv_paths = []
+    for source in args.sources:
+        path = Path(source)
+        if path.is_dir():
+            path = path / "questions.csv"
+        if path.is_file():
+            csv_paths.append(path)
+        else:
+            logger.warning("Skipping missing question CSV: %s", path)
+    if not csv_paths:
+        print("No question CSVs found. Run --export-csv first.")
+        sys.exit(1)
+
+    rows, clusters = dedupe_question_banks(csv_paths, Path(args.output), args.threshold, args.num_perm)
+    print(f"\n✅ Merged {rows} questions from {len(csv_paths)} CSV file(s) into {clusters} unique questions:")
+    print(f"   - {args.output}")
+
+
+def search_main(argv: List[str]) -> None:
+    """
+    Command-line entry point for the search subcommand.
+
+    Args:
+        argv: Arguments after 'search'
+    """
+    parser = argparse.ArgumentParser(
+        prog='faa_test_parser.py search',
+        description="Full-text search of a question bank written with --export-sqlite",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python faa_test_parser.py search questions.db VOR
+  python faa_test_parser.py search questions.db '"density altitude"' --limit 10
+        """
+    )
+    parser.add_argument('database', help='SQLite question bank')
+    parser.add_argument('query', help='FTS5 query over question and option text')
+    parser.add_argument(
+        '--limit', '-n',
+        type=int,
+        default=50,
+        help='Maximum number of results (default: 50)'
+    )
+    parser.add_argument(
+        '--rank',
+        action='store_true',
+        help='Order results by relevance instead of export order'
+    )
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.database)
+    if not db_path.is_file():
+        parser.error(f'no such database: {db_path}')
+
+    question_bank = QuestionBankDB(db_path)
+    try:
+        start = time.perf_counter()
+        results = question_bank.search(args.query, args.limit, args.rank)
+        elapsed = time.perf_counter() - start
+    except sqlite3.OperationalError as e:
+        parser.error(f'invalid query: {e}')
+    finally:
+        question_bank.close()
+
+    for test_name, number, question, answer in results:
+        print(f"{test_name} #{number}: {question}")
+        if answer:
+            print(f"    Answer: {answer}")
+    print(f"\n🔎 {len(results)} match(es) in {elapsed * 1000:.2f} ms")
+
+
+LABELS_NAME = "labels.json"
+# Parsed text counts as correct when its similarity to the label is at least this
+DEFAULT_MATCH_RATIO = 0.9
+DEFAULT_SWEEP_PSM = [3, 6]
+DEFAULT_SWEEP_OEM = [1, 3]
+DEFAULT_SWEEP_DOWNSCALE = [1.0, 0.5]
+
+
+def text_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two texts, ignoring case, punctuation at the ends and repeated whitespace.
+
+    Args:
+        a: First text
+        b: Second text
+
+    Returns:
+        Ratio in [0, 1] from difflib.SequenceMatcher
+    """
+    a = ' '.join(a.lower().split()).strip(' .?')
+    b = ' '.join(b.lower().split()).strip(' .?')
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def load_sweep_labels(folder_path: Path) -> Dict[Path, Dict]:
+    """
+    Collect the known answers and question text of a labelled practice-test folder.
+
+    Answers come from answer-key.md. An optional labels.json holds a list of
+    {"image", "question", "options"} objects with the true text of each image.
+
+    Args:
+        folder_path: Path to the practice-test folder
+
+    Returns:
+        Dictionary mapping image path to a dict with any of 'answer', 'question' and 'options'
+    """
+    question_images = get_question_images(folder_path)
+    answers = parse_answer_key(folder_path / "answer-key.md")
+    labels = {path: {} for path in question_images.values()}
+    for q_num, path in question_images.items():
+        if q_num in answers:
+            labels[path]['answer'] = answers[q_num][1]
+
+    labels_path = folder_path / LABELS_NAME
+    if labels_path.is_file():
+        with open(labels_path, encoding='utf-8') as f:
+            for entry in json.load(f):
+                path = folder_path / entry['image']
+                if path in labels:
+                    labels[path].update(question=entry['question'], options=entry['options'])
+    return labels
+
+
+def score_question(question: Optional[Tuple[str, List[str]]], label: Dict,
+                   match_ratio: float = DEFAULT_MATCH_RATIO) -> Dict[str, bool]:
+    """
+    Check a parsed question against its labels.
+
+    Args:
+        question: (question_text, options) from parse_question_and_options(), or None if OCR failed
+        label: Labels of the image from load_sweep_labels()
+        match_ratio: Minimum text_similarity() for a match
+
+    Returns:
+        Dictionary with a pass/fail for each available check ('answer', 'question',
+        'options') and 'correct', which requires all of them
+    """
+    question_text, options = question if question is not None else ('', [])
+    checks = {}
+    if 'answer' in label:
+        checks['answer'] = any(text_similarity(option, label['answer']) >= match_ratio for option in options)
+    if 'question' in label:
+        checks['question'] = text_similarity(question_text, label['question']) >= match_ratio
+    if 'options' in label:
+        checks['options'] = len(options) == len(label['options']) and all(
+            text_similarity(option, expected) >= match_ratio for option, expected in zip(options, label['options']))
+    checks['correct'] = bool(checks) and all(checks.values())
+    return checks
+
+
+def sweep_grid(psms: List[int], oems: List[int], downscales: List[float], preprocessing: List[bool],
+               binarize: List[bool], sharpen: List[bool]) -> List[Dict]:
+    """
+    Expand the sweep options into a list of configurations.
+
+    Binarization and sharpening only vary when preprocessing is on.
+
+    Returns:
+        List of dicts with 'oem', 'psm', 'downscale', 'preprocessing', 'binarize' and 'sharpen'
+    """
+    configs = []
+    for oem, psm, downscale, preprocess in itertools.product(oems, psms, downscales, preprocessing):
+        for binarize_on, sharpen_on in itertools.product(binarize if preprocess else [False],
+                                                         sharpen if preprocess else [True]):
+            configs.append({'oem': oem, 'psm': psm, 'downscale': downscale, 'preprocessing': preprocess,
+                            'binarize': binarize_on, 'sharpen': sharpen_on})
+    return configs
+
+
+def sweep_config_flags(config: Dict) -> str:
+    """
+    Command-line flags that reproduce a sweep configuration.
+
+    Args:
+        config: Configuration from sweep_grid()
+
+    Returns:
+        Flags for faa_test_parser.py
+    """
+    flags = [f'--tesseract-config="--oem {config["oem"]} --psm {config["psm"]}"']
+    if config['downscale'] != 1.0:
+        flags.append(f'--downscale {config["downscale"]}')
+    if not config['preprocessing']:
+        flags.append('--no-preprocessing')
+    if config['binarize']:
+        flags.append('--binarize')
+    if not config['sharpen']:
+        flags.append('--no-sharpen')
+    return ' '.join(flags)
+
+
+def run_sweep(labels: Dict[Path, Dict], configs: List[Dict], processor_kwargs: Dict,
+              match_ratio: float = DEFAULT_MATCH_RATIO) -> List[Dict]:
+    """
+    OCR and score every labelled image under every configuration.
+
+    The OCR cache is not used, so each configuration is timed from scratch.
+
+    Args:
+        labels: Labels from load_sweep_labels(), merged across folders
+        configs: Configurations from sweep_grid()
+        processor_kwargs: ImageProcessor arguments shared by every configuration
+        match_ratio: Minimum text_similarity() for a match
+
+    Returns:
+        One result per configuration with 'config', 'flags', 'images', 'seconds',
+        'images_per_sec', 'accuracy' and the pass rate of each check
+    """
+    image_paths = sorted(labels)
+    results = []
+    for index, config in enumerate(configs, start=1):
+        processor = ImageProcessor(**dict(
+            processor_kwargs, cache=None, tesseract_config=f"--oem {config['oem']} --psm {config['psm']}",
+            downscale=config['downscale'], enable_preprocessing=config['preprocessing'],
+            binarize=config['binarize'], sharpen=config['sharpen']))
+        checks = []
+        try:
+            start = time.perf_counter()
+            for image_path, _, _, question, _ in processor.iter_results(image_paths, parse=True):
+                checks.append(score_question(question, labels[image_path], match_ratio))
+            elapsed = time.perf_counter() - start
+        finally:
+            processor.close()
+
+        result = {
+            'config': config,
+            'flags': sweep_config_flags(config),
+            'images': len(checks),
+            'seconds': elapsed,
+            'images_per_sec': len(checks) / elapsed if elapsed > 0 else 0.0,
+            'accuracy': sum(check['correct'] for check in checks) / max(len(checks), 1),
+        }
+        for name in ('answer', 'question', 'options'):
+            scored = [check[name] for check in checks if name in check]
+            result[f'{name}_accuracy'] = sum(scored) / len(scored) if scored else None
+        logger.info("Sweep %d/%d: %s: %.1f%% correct, %.2f images/sec",
+                    index, len(configs), result['flags'], result['accuracy'] * 100, result['images_per_sec'])
+        results.append(result)
+    return results
+
+
+def pareto_frontier(results: List[Dict]) -> List[Dict]:
+    """
+    Configurations that no other configuration beats on both speed and accuracy.
+
+    Args:
+        results: Results from run_sweep()
+
+    Returns:
+        Frontier results, fastest first
+    """
+    frontier = []
+    best_accuracy = -1.0
+    for result in sorted(results, key=lambda r: (-r['images_per_sec'], -r['accuracy'])):
+        if result['accuracy'] > best_accuracy:
+            frontier.append(result)
+            best_accuracy = result['accuracy']
+    return frontier
+
+
+def sweep_main(argv: List[str]) -> None:
+    """
+    Command-line entry point for the sweep subcommand.
+
+    Args:
+        argv: Arguments after 'sweep'
+    """
+    parser = argparse.ArgumentParser(
+        prog='faa_test_parser.py sweep',
+        description="Measure speed and parse accuracy of OCR configurations on labelled practice tests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Each folder needs question images and an answer-key.md. An optional {LABELS_NAME}
+([{{"image": "q1.png", "question": ..., "options": [...]}}, ...]) adds the true
+question and option text. A configuration is correct on an image when every
+available label matches.
+
+Examples:
+  python faa_test_parser.py sweep practice-tests/2025-10-11 --min-accuracy 0.95
+  python faa_test_parser.py sweep practice-tests/* --psm 3 4 6 11 --oem 1 --downscale 1 0.75 0.5
+        """
+    )
+    parser.add_argument('sources', nargs='+', help='Labelled practice-test folders')
+    parser.add_argument('--psm', type=int, nargs='+', default=DEFAULT_SWEEP_PSM,
+                        help=f'Tesseract page segmentation modes (default: {DEFAULT_SWEEP_PSM})')
+    parser.add_argument('--oem', type=int, nargs='+', default=DEFAULT_SWEEP_OEM,
+                        help=f'Tesseract engine modes; 1 is LSTM only (default: {DEFAULT_SWEEP_OEM})')
+    parser.add_argument('--downscale', type=float, nargs='+', default=DEFAULT_SWEEP_DOWNSCALE,
+                        dest='downscales', metavar='DOWNSCALE',
+                        help=f'Resampling factors (default: {DEFAULT_SWEEP_DOWNSCALE})')
+    parser.add_argument('--preprocessing', choices=('on', 'off'), nargs='+', default=['on', 'off'],
+                        help='Preprocessing settings to try (default: on off)')
+    parser.add_argument('--binarize', choices=('on', 'off'), nargs='+', default=['off', 'on'], dest='binarizing',
+                        help='Binarization settings to try with preprocessing (default: off on)')
+    parser.add_argument('--sharpen', choices=('on', 'off'), nargs='+', default=['on', 'off'],
+                        help='Sharpening settings to try with preprocessing (default: on off)')
+    parser.add_argument('--match-ratio', type=float, default=DEFAULT_MATCH_RATIO,
+                        help=f'Minimum similarity of parsed and labelled text (default: {DEFAULT_MATCH_RATIO})')
+    parser.add_argument('--min-accuracy', type=float, default=None,
+                        help='Report the fastest configuration that reaches this fraction of correct images')
+    parser.add_argument('--output', '-o', help='Write every result to this JSON file')
+    add_processor_arguments(parser, ocr_config=False)
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    check_processor_arguments(parser, args)
+    if any(factor <= 0 for factor in args.downscales):
+        parser.error('--downscale factors must be positive')
+
+    labels = {}
+    for source in args.sources:
+        folder_path = Path(source).resolve()
+        if not folder_path.is_dir():
+            logger.warning("Skipping invalid folder: %s", folder_path)
+            continue
+        labels.update((path, label) for path, label in load_sweep_labels(folder_path).items() if label)
+    if not labels:
+        print("No labelled images found. Folders need q<N> images with an answer-key.md.")
+        sys.exit(1)
+
+    configs = sweep_grid(args.psm, args.oem, args.downscales, [value == 'on' for value in args.preprocessing],
+                         [value == 'on' for value in args.binarizing], [value == 'on' for value in args.sharpen])
+    processor_kwargs = build_processor_kwargs(args)
+    apply_tuned_settings(processor_kwargs, args, load_tuned_settings(args.ocr_backend))
+    print(f"Sweeping {len(configs)} configuration(s) over {len(labels)} labelled image(s)...")
+    results = run_sweep(labels, configs, processor_kwargs, args.match_ratio)
+    frontier = pareto_frontier(results)
+
+    print(f"\n{'':2}{'images/sec':>11}{'correct':>9}{'answer':>8}{'question':>10}{'options':>9}  flags")
+    for result in sorted(results, key=lambda r: -r['images_per_sec']):
+        rates = [f"{result[f'{name}_accuracy'] * 100:.0f}%" if result[f'{name}_accuracy'] is not None else '-'
+                 for name in ('answer', 'question', 'options')]
+        print(f"{'*' if result in frontier else '':2}{result['images_per_sec']:>11.2f}"
+              f"{result['accuracy'] * 100:>8.1f}%{rates[0]:>8}{rates[1]:>10}{rates[2]:>9}  {result['flags']}")
+    print("\n* Pareto frontier: no other configuration is both faster and more accurate")
+
+    if args.min_accuracy is not None:
+        passing = [result for result in frontier if result['accuracy'] >= args.min_accuracy]
+        if passing:
+            print(f"\n✅ Fastest configuration with at least {args.min_accuracy * 100:.0f}% correct "
+                  f"({passing[0]['images_per_sec']:.2f} images/sec):\n   {passing[0]['flags']}")
+        else:
+            print(f"\n⚠️  No configuration reached {args.min_accuracy * 100:.0f}% correct")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'frontier': [result['flags'] for result in frontier]}, f, indent=1)
+        logger.info("Wrote sweep results to: %s", args.output)
+
+
+def add_processor_arguments(parser: argparse.ArgumentParser, ocr_config: bool = True) -> None:
+    """
+    Add the options that configure the ImageProcessor.
+
+    Args:
+        parser: Parser of a command that runs OCR
+        ocr_config: Whether to add the preprocessing and tesseract config options. Commands
+            that choose those themselves, like sweep, leave them out and get their defaults.
+    """
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help='Number of worker threads (default: CPU count)'
+    )
+
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default='thread',
+        help='Run the per-image pipeline in a thread pool or a process pool (default: thread)'
+    )
+
+    parser.add_argument(
+        '--ocr-threads',
+        type=int,
+        default=None,
+        help='OpenMP threads per tesseract engine (default: CPU count divided by workers)'
+    )
+
+    if ocr_config:
+        parser.add_argument(
+            '--no-preprocessing',
+            action='store_true',
+            help='Disable image preprocessing (use original image for OCR)'
+        )
+
+        parser.add_argument(
+            '--binarize',
+            action='store_true',
+            help='Finish preprocessing with Otsu binarization and feed 1-bit images to OCR'
+        )
+
+        parser.add_argument(
+            '--no-sharpen',
+            action='store_true',
+            help='Skip the sharpening convolution during preprocessing'
+        )
+
+        parser.add_argument(
+            '--downscale',
+            type=float,
+            default=1.0,
+            help='Resample images by this factor before preprocessing, e.g. 0.5 (default: 1.0)'
+        )
+
+        parser.add_argument(
+            '--tesseract-config',
+            type=str,
+            default=DEFAULT_TESSERACT_CONFIG,
+            help=f'Tesseract command-line config (default: "{DEFAULT_TESSERACT_CONFIG}")'
+        )
+
+    else:
+        parser.set_defaults(no_preprocessing=False, binarize=False, no_sharpen=False, downscale=1.0,
+                            tesseract_config=DEFAULT_TESSERACT_CONFIG)
+
+    parser.add_argument(
+        '--two-tier',
+        action='store_true',
+        help='OCR each image first with --fast-config and no preprocessing; rerun the full pipeline '
+             'only on images below --min-confidence or whose text does not parse into three options'
+    )
+
+    parser.add_argument(
+        '--fast-config',
+        type=str,
+        default=DEFAULT_FAST_TESSERACT_CONFIG,
+        help=f'Tesseract command-line config of the --two-tier fast pass (default: "{DEFAULT_FAST_TESSERACT_CONFIG}")'
+    )
+
+    parser.add_argument(
+        '--min-confidence',
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        help=f'Mean word confidence (0-100) a --two-tier fast-pass result needs to be kept '
+             f'(default: {DEFAULT_MIN_CONFIDENCE:g})'
+    )
+
+    parser.add_argument(
+        '--ocr-timeout',
+        type=float,
+        metavar='SECONDS',
+        default=None,
+        help='Stop OCR of an image after this many seconds and retry it once with the fallback '
+             '(default: no limit)'
+    )
+
+    parser.add_argument(
+        '--fallback-config',
+        type=str,
+        default=DEFAULT_FALLBACK_TESSERACT_CONFIG,
+        help=f'Tesseract command-line config of the retry after --ocr-timeout '
+             f'(default: "{DEFAULT_FALLBACK_TESSERACT_CONFIG}")'
+    )
+
+    parser.add_argument(
+        '--fallback-downscale',
+        type=float,
+        default=DEFAULT_FALLBACK_DOWNSCALE,
+        help=f'Resampling factor of the binarized retry after --ocr-timeout (default: {DEFAULT_FALLBACK_DOWNSCALE})'
+    )
+
+    parser.add_argument(
+        '--auto-crop',
+        action='store_true',
+        help='Crop images to the detected text region and rescale text to --target-line-height before OCR'
+    )
+
+    parser.add_argument(
+        '--target-line-height',
+        type=int,
+        default=DEFAULT_TARGET_LINE_HEIGHT,
+        help=f'Text line height in pixels that --auto-crop rescales towards (default: {DEFAULT_TARGET_LINE_HEIGHT})'
+    )
+
+    parser.add_argument(
+        '--scale-bounds',
+        type=float,
+        nargs=2,
+        metavar=('MIN', 'MAX'),
+        default=list(DEFAULT_SCALE_BOUNDS),
+        help=f'Lowest and highest resampling factor --auto-crop may apply '
+             f'(default: {DEFAULT_SCALE_BOUNDS[0]} {DEFAULT_SCALE_BOUNDS[1]})'
+    )
+
+    parser.add_argument(
+        '--crop-margin',
+        type=int,
+        default=DEFAULT_CROP_MARGIN,
+        help=f'Padding in pixels kept around the detected text region (default: {DEFAULT_CROP_MARGIN})'
+    )
 
-def get_image_files(folder_path: Path) -> List[Path]:
-    """
-    Get all supported image files from the specified folder.
+    parser.add_argument(
+        '--ocr-backend',
+        choices=sorted(OCR_BACKENDS),
+        default='pytesseract',
+        help='OCR backend: pytesseract spawns tesseract per image, tesserocr keeps warm '
+             'in-process engines (default: pytesseract)'
+    )
 
-    Args:
-        folder_path: Path to the folder containing images
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'Directory for the persistent OCR cache (default: {DEFAULT_CACHE_DIR})'
+    )
 
-    Returns:
-        List of image file paths
-    """
-    if not folder_path.exists():
-        raise FileNotFoundError(f"Folder not found: {folder_path}")
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=f'Maximum OCR cache size in MB before old entries are evicted (default: {DEFAULT_CACHE_MAX_MB})'
+    )
 
-    if not folder_path.is_dir():
-        raise NotADirectoryError(f"Path is not a directory: {folder_path}")
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the OCR cache and always run tesseract'
+    )
 
-    image_files = [
-        file_path for file_path in folder_path.iterdir()
-        if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1,
+        help='Stitch this many question images into one page per OCR call (default: 1, no stitching)'
+    )
 
-    if not image_files:
-        logger.warning("No supported image files found in %s", folder_path)
-        return []
+    parser.add_argument(
+        '--phash-dedup',
+        action='store_true',
+        help='Reuse OCR text for images that look like an already processed image (perceptual hash)'
+    )
 
-    logger.info("Found %d image files in %s", len(image_files), folder_path)
-    return sorted(image_files)
+    parser.add_argument(
+        '--phash-threshold',
+        type=int,
+        default=DEFAULT_PHASH_THRESHOLD,
+        help=f'Maximum perceptual hash distance in bits for --phash-dedup (default: {DEFAULT_PHASH_THRESHOLD}). '
+             'Values above a few bits can confuse questions that differ by a single digit'
+    )
 
 
-def get_image_files_from_multiple_folders(folder_paths: List[Path]) -> List[Path]:
+def explicit_processor_options(args: argparse.Namespace) -> List[str]:
     """
-    Get all supported image files from multiple folders.
+    List the options from add_processor_arguments() given with a non-default value.
 
     Args:
-        folder_paths: List of paths to folders containing images
+        args: Parsed command-line arguments
 
     Returns:
-        List of image file paths from all folders
+        Option names such as '--two-tier'
     """
-    all_image_files = []
-    for folder_path in folder_paths:
-        try:
-            image_files = get_image_files(folder_path)
-            all_image_files.extend(image_files)
-        except (FileNotFoundError, NotADirectoryError) as e:
-            logger.warning("Skipping %s: %s", folder_path, str(e))
-            continue
-
-    if all_image_files:
-        logger.info("Total: %d image files found across %d folder(s)",
-                   len(all_image_files), len(folder_paths))
-    return sorted(all_image_files)
+    defaults = argparse.ArgumentParser(add_help=False)
+    add_processor_arguments(defaults)
+    return ['--' + dest.replace('_', '-') for dest, default in vars(defaults.parse_args([])).items()
+            if getattr(args, dest) != default]
 
 
-def display_results(results: Dict[str, str]) -> None:
+def build_processor_kwargs(args: argparse.Namespace) -> Dict:
     """
-    Display the OCR results to console.
+    Turn the options from add_processor_arguments() into ImageProcessor arguments.
 
     Args:
-        results: Dictionary mapping display key (with folder info) to extracted text
+        args: Parsed command-line arguments
+
+    Returns:
+        Keyword arguments for ImageProcessor
     """
-    print("\n" + "="*80)
-    print("OCR RESULTS")
-    print("="*80)
+    if args.ocr_threads is not None and args.ocr_backend == 'tesserocr':
+        logger.warning("--ocr-threads has no effect with tesserocr; set OMP_THREAD_LIMIT before starting instead")
 
-    for display_key, text in sorted(results.items()):
-        print(f"\n--- {display_key} ---")
-        if text.startswith("ERROR:"):
-            print(f"❌ {text}")
-        else:
-            lines = text.split('\n')
-            for line in lines:
-                if line.strip():
-                    print(line.strip())
-        print("-" * 40)
+    cache = None
+    if not args.no_cache:
+        cache = OCRCache(Path(args.cache_dir).expanduser(), max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    return dict(
+        max_workers=args.workers,
+        ocr_threads=args.ocr_threads,
+        executor=args.executor,
+        enable_preprocessing=not args.no_preprocessing,
+        cache=cache,
+        ocr_backend=args.ocr_backend,
+        binarize=args.binarize,
+        sharpen=not args.no_sharpen,
+        downscale=args.downscale,
+        tesseract_config=args.tesseract_config,
+        two_tier=args.two_tier,
+        fast_config=args.fast_config,
+        min_confidence=args.min_confidence,
+        ocr_timeout=args.ocr_timeout,
+        fallback_config=args.fallback_config,
+        fallback_downscale=args.fallback_downscale,
+        auto_crop=args.auto_crop,
+        target_line_height=args.target_line_height,
+        scale_bounds=tuple(args.scale_bounds),
+        crop_margin=args.crop_margin,
+        phash_threshold=args.phash_threshold if args.phash_dedup else None,
+        batch_size=args.batch_size
+    )
 
 
-def parse_answer_key(answer_key_path: Path) -> Dict[int, Tuple[str, str]]:
+def check_processor_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
     """
-    Parse an answer key file and extract question number and answer text.
+    Reject invalid values of the options from add_processor_arguments().
 
     Args:
-        answer_key_path: Path to the answer-key.md file
-
-    Returns:
-        Dictionary mapping question number to (answer_letter, answer_text) tuple.
-        answer_letter will be an empty string since answer keys now only contain text.
+        parser: Parser that reports the error
+        args: Parsed command-line arguments
     """
-    answers = {}
-    if not answer_key_path.exists():
-        logger.warning("Answer key not found: %s", answer_key_path)
-        return answers
-
-    try:
-        with open(answer_key_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, start=1):
-                line = line.strip()
-                if not line:
-                    continue
-                answer_text = line
-                answers[line_num] = ('', answer_text)
-    except Exception as e:
-        logger.error("Error reading answer key %s: %s", answer_key_path, str(e))
-
-    return answers
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    if args.downscale <= 0:
+        parser.error('--downscale must be positive')
+    if not 0 <= args.min_confidence <= 100:
+        parser.error('--min-confidence must be between 0 and 100')
+    if args.ocr_timeout is not None and args.ocr_timeout <= 0:
+        parser.error('--ocr-timeout must be positive')
+    if args.fallback_downscale <= 0:
+        parser.error('--fallback-downscale must be positive')
 
 
-def get_question_images(folder_path: Path) -> Dict[int, Path]:
+def apply_tuned_settings(processor_kwargs: Dict, args: argparse.Namespace, tuned: Optional[Dict[str, int]]) -> None:
     """
-    Get question image files from a folder, sorted by question number.
+    Use autotuned workers and OCR threads unless given on the command line.
 
     Args:
-        folder_path: Path to the folder containing question images
-
-    Returns:
-        Dictionary mapping question number to image path
+        processor_kwargs: ImageProcessor arguments, updated in place
+        args: Parsed command-line arguments
+        tuned: Settings from autotune() or load_tuned_settings(), or None
     """
-    question_images = {}
-    pattern = re.compile(r'^q(\d+)\.(png|jpg|jpeg)$', re.IGNORECASE)
-
-    for file_path in folder_path.iterdir():
-        if file_path.is_file():
-            match = pattern.match(file_path.name)
-            if match:
-                question_num = int(match.group(1))
-                question_images[question_num] = file_path
-
-    return question_images
+    # Explicit --workers / --ocr-threads always win over tuned settings
+    if tuned:
+        if args.workers is None:
+            processor_kwargs['max_workers'] = tuned['workers']
+        if args.ocr_threads is None:
+            processor_kwargs['ocr_threads'] = tuned['ocr_threads']
 
 
-def export_to_csv(folder_path: Path, questions: Dict[int, Tuple[str, List[str]]],
-                  answers: Dict[int, Tuple[str, str]],
-                  output_path: Optional[Path] = None) -> Path:
+def is_loopback_host(host: str) -> bool:
     """
-    Export questions and answers to a CSV file.
+    Whether a listen address is only reachable from this machine.
 
     Args:
-        folder_path: Path to the folder containing the questions
-        questions: Dictionary mapping question number to (question_text, options) tuple
-        answers: Dictionary mapping question number to (answer_letter, answer_text) tuple
-        output_path: Optional path for the CSV file. If None, uses folder_path/questions.csv
+        host: Host name or IP address
 
     Returns:
-        Path to the created CSV file
+        True for 'localhost' and loopback addresses
     """
-    if output_path is None:
-        output_path = folder_path / "questions.csv"
-
-    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Question', 'Options', 'Answer'])
-
-        all_question_nums = sorted(set(questions.keys()) | set(answers.keys()))
-
-        for q_num in all_question_nums:
-            if q_num in questions:
-                question_text, options = questions[q_num]
-                question_text = question_text.replace('\n', ' ').strip()
-                options_str = ' | '.join(options)
-            else:
-                question_text = ''
-                options_str = ''
-
-            if q_num in answers:
-                _, answer_text = answers[q_num]
-            else:
-                answer_text = ''
-
-            writer.writerow([question_text, options_str, answer_text])
-    logger.info("Exported CSV to: %s", output_path)
-    return output_path
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
 
 
-def process_folder_to_csv(folder_path: Path, processor: ImageProcessor) -> Optional[Path]:
+def serve_main(argv: List[str]) -> None:
     """
-    Process a folder containing question images and answer key, then export to CSV.
+    Command-line entry point for the serve subcommand.
 
     Args:
-        folder_path: Path to the folder to process
-        processor: ImageProcessor instance for OCR
-
-    Returns:
-        Path to the created CSV file, or None if processing failed
+        argv: Arguments after 'serve'
     """
-    answer_key_path = folder_path / "answer-key.md"
-    if not answer_key_path.exists():
-        logger.warning("No answer-key.md found in %s, skipping", folder_path)
-        return None
+    parser = argparse.ArgumentParser(
+        prog='faa_test_parser.py serve',
+        description="Keep warm OCR workers behind a local HTTP endpoint",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+While the server runs, faa_test_parser.py forwards OCR to it automatically.
 
-    answers = parse_answer_key(answer_key_path)
-    logger.info("Parsed %d answers from %s", len(answers), answer_key_path)
+Endpoints:
+  GET  /health  Server settings
+  POST /ocr     {{"paths": [...], "base_paths": [...], "images": [{{"name": ..., "data": <base64>}}]}}
 
-    question_images = get_question_images(folder_path)
-    if not question_images:
-        logger.warning("No question images found in %s", folder_path)
-        return None
+Examples:
+  python faa_test_parser.py serve --workers 8 --ocr-backend tesserocr
+  python faa_test_parser.py serve --port {DEFAULT_SERVER_PORT} --batch-size 8
+        """
+    )
+    parser.add_argument('--host', default=DEFAULT_SERVER_HOST,
+                        help=f'Address to listen on (default: {DEFAULT_SERVER_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVER_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_SERVER_PORT})')
+    parser.add_argument(
+        '--allow-remote',
+        action='store_true',
+        help='Allow a --host that is reachable from other machines; clients can then read any file the server can'
+    )
+    parser.add_argument(
+        '--batch-window-ms',
+        type=float,
+        default=DEFAULT_BATCH_WINDOW_MS,
+        help=f'Milliseconds to wait for more requests to merge into one batch (default: {DEFAULT_BATCH_WINDOW_MS})'
+    )
+    add_processor_arguments(parser)
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    args = parser.parse_args(argv)
 
-    logger.info("Found %d question images in %s", len(question_images), folder_path)
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    check_processor_arguments(parser, args)
+    if not is_loopback_host(args.host):
+        if not args.allow_remote:
+            parser.error(f'--host {args.host} is reachable from other machines, and /ocr reads any path the server '
+                         f'can open; pass --allow-remote to listen on it anyway')
+        logger.warning("Listening on %s: any client that can reach it can read files readable by this process",
+                       args.host)
 
-    image_paths = list(question_images.values())
-    ocr_results = processor.process_images_parallel(image_paths, [folder_path])
-
-    questions = {}
-    for q_num, img_path in question_images.items():
-        img_name = img_path.name
-        ocr_text = ''
-
-        # Try multiple ways to find the OCR result
-        # 1. Try by filename only
-        if img_name in ocr_results:
-            ocr_text = ocr_results[img_name]
-        # 2. Try with folder prefix
-        elif f"{folder_path.name}/{img_name}" in ocr_results:
-            ocr_text = ocr_results[f"{folder_path.name}/{img_name}"]
-        # 3. Try by matching any key that ends with the filename
-        else:
-            for key, text in ocr_results.items():
-                if key.endswith(img_name) or key == str(img_path):
-                    ocr_text = text
-                    break
+    processor_kwargs = build_processor_kwargs(args)
+    apply_tuned_settings(processor_kwargs, args, load_tuned_settings(args.ocr_backend))
+    processor = ImageProcessor(**processor_kwargs)
+    try:
+        service = OCRService(processor, batch_window=args.batch_window_ms / 1000)
+        server = ThreadingHTTPServer((args.host, args.port), OCRRequestHandler)
+    except BaseException:
+        processor.close()
+        raise
+    server.service = service
+    url = f"http://{args.host}:{server.server_address[1]}"
 
-        # If still not found or error, use empty tuple
-        if ocr_text.startswith("ERROR:"):
-            questions[q_num] = ('', [])
-        else:
-            # Parse into question and options
-            question_text, options = processor.parse_question_and_options(ocr_text)
-            questions[q_num] = (question_text, options)
+    SERVER_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SERVER_FILE.write_text(json.dumps({'url': url, 'pid': os.getpid()}), encoding='utf-8')
+    print(f"🚀 Serving OCR on {url} with {processor.max_workers} workers x {processor.ocr_threads} OCR threads")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server stopped by user")
+    finally:
+        try:
+            # Another server may have registered itself since
+            if json.loads(SERVER_FILE.read_text(encoding='utf-8')).get('pid') == os.getpid():
+                SERVER_FILE.unlink()
+        except (OSError, ValueError):
+            pass
+        server.server_close()
+        processor.close()
 
-    csv_path = export_to_csv(folder_path, questions, answers)
-    return csv_path
+
+COMMANDS = {
+    'dedupe': dedupe_main,
+    'merge': merge_main,
+    'search': search_main,
+    'serve': serve_main,
+    'sweep': sweep_main,
+}
 
 
 def main():
     """
     Main function to handle command-line execution.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Process images to extract text using OCR in parallel",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -565,6 +5404,14 @@ Examples:
   python faa_test_parser.py --source ./folder1 ./folder2 ./folder3
   python faa_test_parser.py -s practice-tests/2025-10-11 practice-tests/2025-11-02
   python faa_test_parser.py --export-csv --source practice-tests/2025-10-11 practice-tests/2025-11-11
+  python faa_test_parser.py --export-sqlite questions.db -s practice-tests/2025-10-11 practice-tests/2025-11-11
+  python faa_test_parser.py --watch -s practice-tests/2025-12-06
+  python faa_test_parser.py --export-csv --shard 2/4 -s practice-tests/*/
+  python faa_test_parser.py merge practice-tests/*/
+  python faa_test_parser.py dedupe practice-tests/*/ -o question-bank.csv
+  python faa_test_parser.py search questions.db VOR
+  python faa_test_parser.py serve --workers 8
+  python faa_test_parser.py sweep practice-tests/2025-10-11 --min-accuracy 0.95
         """
     )
 
@@ -577,10 +5424,18 @@ Examples:
     )
 
     parser.add_argument(
-        '--workers', '-w',
+        '--autotune',
+        action='store_true',
+        help='Benchmark worker/thread combinations on a sample of the images, '
+             'save the fastest for this host and use it'
+    )
+
+    parser.add_argument(
+        '--autotune-sample',
         type=int,
-        default=None,
-        help='Number of worker threads (default: CPU count)'
+        default=DEFAULT_AUTOTUNE_SAMPLE,
+        help=f'Minimum number of images processed per combination during --autotune; at least '
+             f'{AUTOTUNE_IMAGES_PER_WORKER} per CPU are used (default: {DEFAULT_AUTOTUNE_SAMPLE})'
     )
 
     parser.add_argument(
@@ -590,9 +5445,10 @@ Examples:
     )
 
     parser.add_argument(
-        '--no-preprocessing',
-        action='store_true',
-        help='Disable image preprocessing (use original image for OCR)'
+        '--crop-audit',
+        type=str,
+        default=None,
+        help='Write the crop box and scale chosen for each image to this JSON file'
     )
 
     parser.add_argument(
@@ -601,6 +5457,89 @@ Examples:
         help='Export questions and answers to CSV files (one per folder with answer-key.md)'
     )
 
+    parser.add_argument(
+        '--export-sqlite',
+        type=str,
+        metavar='DB',
+        default=None,
+        help='Also upsert exported questions into this SQLite question bank (implies --export-csv)'
+    )
+
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='With --export-csv, ignore questions.manifest.json and re-OCR every image'
+    )
+
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        default=None,
+        help='Process only shard I of N (1 <= I <= N), chosen by a stable hash of folder and file name. '
+             'With --export-csv, results go to a shard manifest; combine them with the merge command'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running after the export and update each folder\'s CSV as new or changed '
+             'screenshots land (implies --export-csv)'
+    )
+
+    parser.add_argument(
+        '--watch-settle',
+        type=float,
+        metavar='SECONDS',
+        default=DEFAULT_WATCH_SETTLE,
+        help=f'With --watch, how long a file must stay unchanged before it counts as written '
+             f'(default: {DEFAULT_WATCH_SETTLE})'
+    )
+
+    parser.add_argument(
+        '--watch-poll',
+        action='store_true',
+        help='With --watch, poll the folders instead of using inotify, e.g. on network shares'
+    )
+
+    parser.add_argument(
+        '--reclean',
+        action='store_true',
+        help='Re-apply the OCR cleanup rules to cached raw text without running OCR'
+    )
+
+    parser.add_argument(
+        '--stats',
+        type=str,
+        metavar='FILE',
+        default=None,
+        help='Time every pipeline stage per image, write the timings to this JSON file and print a summary'
+    )
+
+    parser.add_argument(
+        '--stats-top',
+        type=int,
+        default=DEFAULT_STATS_TOP_N,
+        help=f'Number of slowest images listed by --stats (default: {DEFAULT_STATS_TOP_N})'
+    )
+
+    parser.add_argument(
+        '--server',
+        type=str,
+        metavar='URL',
+        default=None,
+        help='Forward OCR to the server started with \'serve\' at this URL '
+             '(default: the running server, if any)'
+    )
+
+    parser.add_argument(
+        '--no-server',
+        action='store_true',
+        help='Run OCR in this process even if a server is running'
+    )
+
+    add_processor_arguments(parser)
+
     args = parser.parse_args()
 
     if args.verbose:
@@ -609,20 +5548,89 @@ Examples:
     try:
         folder_paths = [Path(source).resolve() for source in args.source]
 
-        processor = ImageProcessor(
-            max_workers=args.workers,
-            enable_preprocessing=not args.no_preprocessing
-        )
+        if args.reclean and args.no_cache:
+            parser.error('--reclean needs the OCR cache; drop --no-cache')
+        check_processor_arguments(parser, args)
+        if args.watch and args.shard:
+            parser.error('--watch cannot be combined with --shard')
+        if args.watch_settle < 0:
+            parser.error('--watch-settle cannot be negative')
+        if args.shard and args.export_sqlite:
+            parser.error('--export-sqlite cannot be combined with --shard; pass it to merge instead')
 
-        if args.export_csv:
-            csv_files = []
-            for folder_path in folder_paths:
-                if not folder_path.exists() or not folder_path.is_dir():
-                    logger.warning("Skipping invalid folder: %s", folder_path)
-                    continue
-                csv_path = process_folder_to_csv(folder_path, processor)
-                if csv_path:
-                    csv_files.append(csv_path)
+        if args.server and (args.no_server or args.autotune or args.reclean or args.stats):
+            parser.error('--server cannot be combined with --no-server, --autotune, --reclean or --stats')
+
+        client = None
+        if not (args.no_server or args.autotune or args.reclean or args.stats):
+            client = connect_ocr_server(args.server)
+            if client is None and args.server:
+                parser.error(f'no OCR server answers at {args.server}')
+
+        # A local processor is also needed to check explicit OCR options against the server's
+        explicit = explicit_processor_options(args)
+        processor = None
+        if client is None or explicit:
+            processor_kwargs = build_processor_kwargs(args)
+            processor_kwargs['reclean_only'] = args.reclean
+            processor_kwargs['collect_stats'] = bool(args.stats)
+            if args.autotune:
+                tuned = autotune(get_image_files_from_multiple_folders(folder_paths), processor_kwargs,
+                                 args.autotune_sample)
+            else:
+                tuned = load_tuned_settings(args.ocr_backend)
+            apply_tuned_settings(processor_kwargs, args, tuned)
+            processor = ImageProcessor(**processor_kwargs)
+
+        if client is not None:
+            differing = server_differences(client, processor, explicit) if explicit else []
+            if differing and args.server:
+                processor.close()
+                parser.error(f'the OCR server at {client.url} runs with different {", ".join(differing)}; '
+                             'restart it with the same options or drop --server')
+            if differing:
+                logger.warning("The OCR server at %s runs with different %s; running OCR locally. Restart the "
+                               "server with the same options, or pass --no-server", client.url, ', '.join(differing))
+            else:
+                if processor is not None:
+                    processor.close()
+                processor = client
+                logger.info("Forwarding OCR to the server at %s; its OCR settings apply", client.url)
+
+        logger.debug("Using %d workers x %d OCR threads", processor.max_workers, processor.ocr_threads)
+
+        stats_report = None
+        if args.stats:
+            stats_report = StatsReport()
+            processor.stats_hooks.append(stats_report)
+
+        if args.crop_audit:
+            processor.tally.crop_audit = {}
+
+        if args.shard and args.export_csv:
+            manifest_paths = process_folders_to_shard(folder_paths, processor, args.shard,
+                                                      incremental=not args.rebuild)
+            index, count = args.shard
+            print(f"\n✅ Wrote results of shard {index}/{count} for {len(manifest_paths)} folder(s):")
+            for manifest_path in manifest_paths:
+                print(f"   - {manifest_path}")
+            print("Run 'faa_test_parser.py merge' on the folders once every shard has finished.")
+        elif args.watch:
+            question_bank = QuestionBankDB(Path(args.export_sqlite)) if args.export_sqlite else None
+            try:
+                watch_folders(folder_paths, processor, incremental=not args.rebuild, question_bank=question_bank,
+                              settle=args.watch_settle, poll=args.watch_poll)
+            finally:
+                if question_bank is not None:
+                    question_bank.close()
+        elif args.export_csv or args.export_sqlite:
+            question_bank = QuestionBankDB(Path(args.export_sqlite)) if args.export_sqlite else None
+            try:
+                csv_files = process_folders_to_csv(folder_paths, processor, incremental=not args.rebuild,
+                                                   question_bank=question_bank)
+            finally:
+                if question_bank is not None:
+                    question_bank.close()
 
             if csv_files:
                 print(f"\n✅ Successfully exported {len(csv_files)} CSV file(s):")
@@ -632,6 +5640,9 @@ Examples:
                 print("No CSV files were created. Make sure folders contain answer-key.md files.")
         else:
             image_files = get_image_files_from_multiple_folders(folder_paths)
+            if args.shard:
+                index, count = args.shard
+                image_files = [img_path for img_path in image_files if shard_of(img_path, count) == index]
 
             if not image_files:
                 print("No image files found to process.")
@@ -640,10 +5651,32 @@ Examples:
             results = processor.process_images_parallel(image_files, folder_paths)
             display_results(results)
 
-            successful = sum(1 for text in results.values() if not text.startswith("ERROR:"))
+            successful = sum(1 for text in results.values() if not text.startswith(FAILURE_PREFIXES))
             total = len(results)
             print(f"\n📊 Summary: {successful}/{total} images processed successfully")
 
+        timeout_counts = processor.tally.timeout_counts
+        if timeout_counts:
+            print(f"\n⏱️  {sum(timeout_counts.values())} image(s) exceeded --ocr-timeout: "
+                  f"{timeout_counts['recovered']} recovered by the fallback retry, "
+                  f"{timeout_counts['timed_out']} timed out again")
+
+        if processor.tally.tier_counts:
+            print_tier_summary(processor.tally.tier_counts)
+
+        if stats_report is not None:
+            stats_report.finish()
+            stats_report.write(Path(args.stats), args.stats_top)
+            stats_report.print_summary(args.stats_top)
+            logger.info("Wrote stage timings to: %s", args.stats)
+
+        if args.crop_audit:
+            with open(args.crop_audit, 'w', encoding='utf-8') as f:
+                json.dump(processor.tally.crop_audit, f, indent=2, sort_keys=True)
+            logger.info("Wrote crop audit to: %s", args.crop_audit)
+
+        processor.close()
+
     except KeyboardInterrupt:
         logger.info("Processing interrupted by user")
         sys.exit(1)
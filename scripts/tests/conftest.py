@@ -0,0 +1,53 @@
+"""Shared fixtures for the faa_test_parser tests."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeProcessor:
+    """
+    Stands in for ImageProcessor without running tesseract.
+
+    Every image "OCRs" to a question derived from its file content, and the
+    names of the images it was asked for are kept in seen.
+    """
+
+    def __init__(self, settings: str = 'fake', fail=()):
+        self.settings = settings
+        self.fail = set(fail)
+        self.seen = []
+
+    def cache_settings(self) -> str:
+        return self.settings
+
+    def iter_results(self, image_paths, base_paths=None, parse=False, max_in_flight=None):
+        for image_path in image_paths:
+            self.seen.append(image_path.name)
+            if image_path.name in self.fail:
+                yield image_path, image_path.name, 'Error: failed', None, {}
+                continue
+            content = image_path.read_bytes().decode()
+            question = (f"What is {content}?", [f"{content} one", f"{content} two", f"{content} three"])
+            yield image_path, image_path.name, question[0], question, {}
+
+
+@pytest.fixture
+def processor():
+    return FakeProcessor()
+
+
+@pytest.fixture
+def make_folder(tmp_path):
+    """Factory creating a practice-test folder of fake question images and an answer key."""
+    def make(name: str, images: dict, answers: int = None) -> Path:
+        folder_path = tmp_path / name
+        folder_path.mkdir(parents=True, exist_ok=True)
+        for image_name, content in images.items():
+            (folder_path / image_name).write_text(content)
+        count = len(images) if answers is None else answers
+        (folder_path / 'answer-key.md').write_text(''.join(f"Answer {i}\n" for i in range(1, count + 1)))
+        return folder_path
+    return make
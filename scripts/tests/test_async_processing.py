@@ -0,0 +1,42 @@
+"""Async processing: one processor can serve several event loops in turn."""
+import asyncio
+
+from PIL import Image
+
+from faa_test_parser import ImageProcessor
+
+
+class SlowAsyncBackend:
+    """Async OCR backend that yields to the event loop so concurrent calls contend for OCR slots."""
+
+    name = 'fake'
+
+    async def aimage_to_string(self, image, config, timeout=None):
+        await asyncio.sleep(0.01)
+        return 'What is fake?'
+
+    def close(self):
+        pass
+
+
+def run_once(processor, image_paths):
+    async def collect():
+        return sorted([result async for result in processor.aprocess(image_paths)])
+    return asyncio.run(collect())
+
+
+def test_processor_is_reusable_across_event_loops(tmp_path):
+    image_paths = []
+    for i in range(1, 5):
+        image_path = tmp_path / f"q{i}.png"
+        Image.new('L', (60, 30), 255).save(image_path)
+        image_paths.append(image_path)
+    processor = ImageProcessor(max_workers=1, enable_preprocessing=False)
+    processor.backend = SlowAsyncBackend()
+    try:
+        # max_workers=1 makes the calls of each run wait on the OCR semaphore
+        first = run_once(processor, image_paths)
+        second = run_once(processor, image_paths)
+    finally:
+        processor.close()
+    assert first == second == [(f"q{i}.png", 'What is fake?') for i in range(1, 5)]
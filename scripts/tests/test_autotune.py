@@ -0,0 +1,53 @@
+"""Autotune: the sample keeps every worker busy, spans folders and is warmed up before timing."""
+from pathlib import Path
+
+import faa_test_parser
+from faa_test_parser import AUTOTUNE_IMAGES_PER_WORKER, autotune, autotune_sample
+
+
+class RecordingProcessor:
+    """Stands in for ImageProcessor and records the runs autotune makes."""
+
+    runs = []
+
+    def __init__(self, max_workers=None, ocr_threads=None, **kwargs):
+        self.max_workers = max_workers
+        self.ocr_threads = ocr_threads
+
+    def process_images_parallel(self, image_paths):
+        RecordingProcessor.runs.append((self.max_workers, self.ocr_threads, list(image_paths)))
+        return {}
+
+    def close(self):
+        pass
+
+
+def paths(folder, count):
+    return [Path(folder) / f"q{i}.png" for i in range(1, count + 1)]
+
+
+def test_sample_alternates_between_folders():
+    image_paths = paths('test-1', 3) + paths('test-2', 1) + paths('test-3', 2)
+    assert autotune_sample(image_paths, 4) == [
+        Path('test-1/q1.png'), Path('test-2/q1.png'), Path('test-3/q1.png'), Path('test-1/q2.png')]
+    assert sorted(autotune_sample(image_paths, 100)) == sorted(image_paths)
+
+
+def test_sample_covers_largest_worker_count_and_is_warmed_up(monkeypatch):
+    RecordingProcessor.runs = []
+    saved = {}
+    monkeypatch.setattr(faa_test_parser, 'ImageProcessor', RecordingProcessor)
+    monkeypatch.setattr(faa_test_parser.os, 'cpu_count', lambda: 16)
+    monkeypatch.setattr(faa_test_parser, 'save_tuned_settings', lambda backend, settings: saved.update(settings))
+
+    image_paths = paths('test-1', 60) + paths('test-2', 60)
+    settings = autotune(image_paths, {'ocr_backend': 'tesserocr'}, sample_size=8)
+
+    warmup, *timed = RecordingProcessor.runs
+    assert [workers for workers, _, _ in timed] == [1, 2, 4, 8, 16]
+    assert warmup[0] == 16
+    sample = warmup[2]
+    assert len(sample) == AUTOTUNE_IMAGES_PER_WORKER * 16
+    assert {image_path.parent for image_path in sample} == {Path('test-1'), Path('test-2')}
+    assert all(run[2] == sample for run in timed)
+    assert saved == settings
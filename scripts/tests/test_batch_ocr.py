@@ -0,0 +1,51 @@
+"""Batched OCR: words read off a stitched page are handed back to the tile they came from."""
+from PIL import Image
+
+from faa_test_parser import split_words_by_tile, stitch_images, words_to_text
+
+
+def word(text, top, height=10, line=(1, 1, 1)):
+    return {'line': line, 'left': 0, 'top': top, 'width': 10, 'height': height, 'conf': 95.0, 'text': text}
+
+
+def test_stitch_offsets_match_pasted_tiles():
+    images = [Image.new('L', (40, 20), 0), Image.new('L', (30, 50), 0), Image.new('L', (50, 10), 0)]
+    montage, tops = stitch_images(images, gap=8)
+    assert tops == [8, 36, 94]
+    assert montage.size == (66, 112)
+    for image, top in zip(images, tops):
+        assert montage.getpixel((8, top)) == 0
+        assert montage.getpixel((8, top - 1)) == 255
+
+
+def test_words_go_to_the_tile_containing_them():
+    tops = [8, 36, 94]
+    words = [word('alpha', 10), word('beta', 40, line=(2, 1, 1)), word('gamma', 70, line=(2, 1, 2)),
+             word('delta', 95, line=(3, 1, 1))]
+    tiles = split_words_by_tile(words, tops)
+    assert [[w['text'] for w in tile] for tile in tiles] == [['alpha'], ['beta', 'gamma'], ['delta']]
+    assert words_to_text(tiles[1]) == 'beta\ngamma'
+
+
+def test_word_in_gap_goes_to_preceding_tile():
+    # Tile 0 spans 8-28; a word centred at 31 sits in the gap before tile 1 at 36
+    tiles = split_words_by_tile([word('stray', 26)], [8, 36])
+    assert [len(tile) for tile in tiles] == [1, 0]
+
+
+def test_word_straddling_boundary_follows_its_centre():
+    tops = [8, 36]
+    # Centre 34 is above the boundary, centre 41 below it
+    tiles = split_words_by_tile([word('upper', 24, height=20), word('lower', 31, height=20)], tops)
+    assert [[w['text'] for w in tile] for tile in tiles] == [['upper'], ['lower']]
+
+
+def test_word_above_first_tile_goes_to_first_tile():
+    tiles = split_words_by_tile([word('margin', 0, height=4)], [8, 36])
+    assert [len(tile) for tile in tiles] == [1, 0]
+
+
+def test_empty_tiles_are_kept():
+    tiles = split_words_by_tile([word('only', 95)], [8, 36, 94])
+    assert [len(tile) for tile in tiles] == [0, 0, 1]
+    assert words_to_text(tiles[0]) == ''
@@ -0,0 +1,101 @@
+"""Near-duplicate clustering of question banks with MinHash/LSH."""
+import csv
+import random
+
+import pytest
+
+from faa_test_parser import (
+    DEFAULT_NUM_PERM, cluster_near_duplicates, dedupe_question_banks, lsh_bands, minhash_signature,
+    question_shingles,
+)
+
+BASE = ("What is the maximum airspeed permitted below 10,000 feet MSL? "
+        "250 knots | 200 knots | 230 knots")
+
+
+def test_ocr_noise_is_clustered_with_the_clean_text():
+    noisy = BASE.replace('maximum', 'maxirnum').replace('?', ' ?')
+    other = "Which color is the beacon of a civilian land airport? White and green | White | Green"
+
+    assert cluster_near_duplicates([BASE, other, noisy]) == [0, 1, 0]
+
+
+def test_different_numbers_are_never_merged():
+    altered = BASE.replace('10,000', '18,000')
+
+    assert cluster_near_duplicates([BASE, altered]) == [0, 1]
+
+
+def test_single_digits_do_not_block_a_merge():
+    # Option letters or stray single digits are OCR noise, not question numbers
+    assert cluster_near_duplicates([BASE, BASE + ' 1']) == [0, 0]
+
+
+def test_clusters_are_transitive():
+    words = [f"word{n}" for n in range(40)]
+    first = ' '.join(words)
+    middle = ' '.join(words[4:] + ['extra', 'tail'] * 2)
+    last = ' '.join(words[8:] + ['extra', 'tail'] * 4)
+
+    # first and last are only ~0.76 similar, but both are above 0.8 with middle
+    assert cluster_near_duplicates([first, middle, last], threshold=0.8) == [0, 0, 0]
+    assert cluster_near_duplicates([first, last], threshold=0.8) == [0, 1]
+
+
+def test_cluster_ids_follow_first_appearance():
+    a = "Which way does a left-hand traffic pattern turn? Left | Right | Either"
+    b = "What does a flashing white light from the tower mean? Return | Land | Stop"
+
+    assert cluster_near_duplicates([b, a, b, a]) == [0, 1, 0, 1]
+
+
+def test_similarity_below_the_threshold_stays_apart():
+    first = "alpha bravo charlie delta echo foxtrot golf hotel india juliet"
+    second = "alpha bravo charlie delta echo kilo lima mike november oscar"
+
+    assert cluster_near_duplicates([first, second], threshold=0.9) == [0, 1]
+
+
+def test_minhash_estimates_jaccard_similarity():
+    rng = random.Random(7)
+    words = [''.join(rng.choice('abcdefghij') for _ in range(6)) for _ in range(200)]
+    first = question_shingles(' '.join(words[:150]))
+    second = question_shingles(' '.join(words[50:]))
+    exact = len(first & second) / len(first | second)
+
+    sig_a = minhash_signature(first, DEFAULT_NUM_PERM)
+    sig_b = minhash_signature(second, DEFAULT_NUM_PERM)
+    estimate = sum(a == b for a, b in zip(sig_a, sig_b)) / DEFAULT_NUM_PERM
+
+    assert estimate == pytest.approx(exact, abs=0.15)
+
+
+def test_identical_shingles_give_identical_signatures():
+    shingles = question_shingles("Short text")
+
+    assert minhash_signature(shingles) == minhash_signature(frozenset(shingles))
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.7, 0.9])
+def test_lsh_bands_reach_the_recall_target(threshold):
+    bands, rows = lsh_bands(DEFAULT_NUM_PERM, threshold)
+
+    assert bands * rows <= DEFAULT_NUM_PERM
+    assert 1 - (1 - threshold ** rows) ** bands >= 0.99
+
+
+def test_dedupe_writes_one_row_per_cluster(tmp_path):
+    first = tmp_path / 'a.csv'
+    second = tmp_path / 'b.csv'
+    for path, rows in ((first, [['Q one 100?', 'x | y | z', 'x'], ['Q two?', 'a | b | c', 'a']]),
+                       (second, [['Q  one 100 ?', 'x | y | z', 'x'], ['', '', 'b']])):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([['Question', 'Options', 'Answer']] + rows)
+    output = tmp_path / 'bank.csv'
+
+    assert dedupe_question_banks([first, second], output) == (3, 2)
+    with open(output, newline='', encoding='utf-8') as f:
+        bank = list(csv.reader(f))[1:]
+    assert [row[0] for row in bank] == ['0', '1']
+    assert bank[0][1:5] == ['Q one 100?', 'x | y | z', 'x', '2']
+    assert bank[0][5] == f"{first}#1; {second}#1"
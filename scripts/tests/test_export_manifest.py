@@ -0,0 +1,133 @@
+"""Incremental CSV export: manifest reuse, invalidation and resume."""
+import csv
+import json
+import os
+
+import pytest
+
+from faa_test_parser import MANIFEST_NAME, ExportManifest, export_settings, process_folders_to_csv
+
+
+def read_rows(folder_path):
+    with open(folder_path / 'questions.csv', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_rerun_reuses_every_unchanged_row(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    process_folders_to_csv([folder], processor)
+    first_rows = read_rows(folder)
+
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert processor.seen == []
+    assert read_rows(folder) == first_rows
+    assert first_rows[1] == ['What is beta?', 'beta one | beta two | beta three', 'Answer 2']
+
+
+def test_changed_image_is_ocrd_again(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    process_folders_to_csv([folder], processor)
+
+    (folder / 'q2.png').write_text('gamma!')
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert processor.seen == ['q2.png']
+    assert read_rows(folder)[1][0] == 'What is gamma!?'
+
+
+def test_same_size_edit_is_caught_by_the_hash(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha'})
+    process_folders_to_csv([folder], processor)
+
+    stat = (folder / 'q1.png').stat()
+    (folder / 'q1.png').write_text('omega')
+    os.utime(folder / 'q1.png', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert processor.seen == ['q1.png']
+
+
+def test_touched_but_identical_image_is_reused(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha'})
+    process_folders_to_csv([folder], processor)
+
+    stat = (folder / 'q1.png').stat()
+    os.utime(folder / 'q1.png', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert processor.seen == []
+    # The new mtime is remembered, so the next run does not hash the file again
+    entry = json.loads((folder / MANIFEST_NAME).read_text())['images']['q1.png']
+    assert entry['mtime_ns'] == (folder / 'q1.png').stat().st_mtime_ns
+
+
+def test_settings_change_discards_the_manifest(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    process_folders_to_csv([folder], processor)
+
+    processor.settings = 'other'
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert sorted(processor.seen) == ['q1.png', 'q2.png']
+
+
+def test_rebuild_ignores_the_manifest(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha'})
+    process_folders_to_csv([folder], processor)
+
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor, incremental=False)
+
+    assert processor.seen == ['q1.png']
+
+
+def test_failed_images_are_retried(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    processor.fail = {'q2.png'}
+    process_folders_to_csv([folder], processor)
+
+    processor.fail = set()
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert processor.seen == ['q2.png']
+
+
+def test_interrupted_export_resumes(make_folder, processor):
+    folder = make_folder('test', {f'q{n}.png': f'image {n}' for n in range(1, 5)})
+    iter_results = processor.iter_results
+
+    def interrupted(*args, **kwargs):
+        for index, result in enumerate(iter_results(*args, **kwargs)):
+            if index == 2:
+                raise KeyboardInterrupt
+            yield result
+
+    processor.iter_results = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        process_folders_to_csv([folder], processor)
+    done = set(processor.seen[:2])
+
+    processor.iter_results = iter_results
+    processor.seen.clear()
+    process_folders_to_csv([folder], processor)
+
+    assert set(processor.seen) == {f'q{n}.png' for n in range(1, 5)} - done
+    assert [row[0] for row in read_rows(folder)] == [f'What is image {n}?' for n in range(1, 5)]
+
+
+def test_removed_images_are_pruned(make_folder, processor):
+    folder = make_folder('test', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    process_folders_to_csv([folder], processor)
+
+    (folder / 'q2.png').unlink()
+    process_folders_to_csv([folder], processor)
+
+    manifest = ExportManifest(folder / MANIFEST_NAME, export_settings(processor))
+    assert list(manifest.images) == ['q1.png']
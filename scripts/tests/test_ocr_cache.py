@@ -0,0 +1,109 @@
+"""OCR cache: content-addressed hits and misses, size accounting and LRU eviction."""
+import os
+
+from PIL import Image
+import pytest
+
+from faa_test_parser import ImageProcessor, OCRCache
+
+
+class CountingBackend:
+    """OCR backend that returns a fixed text and counts how often it was called."""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+
+    def version(self):
+        return '1.0'
+
+    def image_to_string(self, image, config, timeout=None):
+        self.calls += 1
+        return 'What is cached?'
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OCRCache(tmp_path / 'cache')
+
+
+def disk_size(cache):
+    return sum(size for _, size, _ in cache._scan())
+
+
+def make_processor(cache, **kwargs):
+    processor = ImageProcessor(max_workers=1, enable_preprocessing=False, cache=cache, **kwargs)
+    processor.backend = CountingBackend()
+    return processor
+
+
+def test_key_follows_content_and_settings(cache, tmp_path):
+    (tmp_path / 'a.png').write_bytes(b'same pixels')
+    (tmp_path / 'b.png').write_bytes(b'same pixels')
+    (tmp_path / 'c.png').write_bytes(b'other pixels')
+
+    key = cache.make_key(tmp_path / 'a.png', 'settings')
+    # Renamed or copied screenshots share an entry
+    assert cache.make_key(tmp_path / 'b.png', 'settings') == key
+    assert cache.make_key(tmp_path / 'c.png', 'settings') != key
+    assert cache.make_key(tmp_path / 'a.png', 'other settings') != key
+
+
+def test_put_then_get(cache):
+    assert cache.get('ab' * 32) is None
+    cache.put('ab' * 32, 'raw  text', 'text', extra={'crop': [0, 0, 10, 10]})
+    assert cache.get('ab' * 32) == {'crop': [0, 0, 10, 10], 'raw': 'raw  text', 'cleaned': 'text'}
+
+
+def test_overwritten_entry_is_counted_once(cache):
+    cache.put('ab' * 32, 'x' * 100, 'x')
+    cache.put('cd' * 32, 'y' * 100, 'y')
+    for length in (500, 50, 200):
+        cache.put('ab' * 32, 'x' * length, 'x')
+        assert cache._size == disk_size(cache)
+    assert cache.get('ab' * 32)['raw'] == 'x' * 200
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path / 'cache', max_bytes=1000)
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for age, key in enumerate(keys):
+        cache.put(key, 'x' * 200, 'x')
+        # Older entries get older mtimes, as if written in order over time
+        entry_path = cache._entry_path(key)
+        os.utime(entry_path, (1_000_000 + age, 1_000_000 + age))
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+
+    cache.put('ff' * 32, 'x' * 200, 'x')
+
+    assert cache._size == disk_size(cache) <= 900
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get('ff' * 32) is not None
+
+
+def test_processor_hits_cache_until_content_or_settings_change(cache, tmp_path):
+    image_path = tmp_path / 'q1.png'
+    Image.new('L', (60, 30), 255).save(image_path)
+
+    processor = make_processor(cache)
+    assert processor.process_image(image_path) == ('q1.png', 'What is cached?')
+    assert processor.process_image(image_path) == ('q1.png', 'What is cached?')
+    assert processor.backend.calls == 1
+
+    # A different tesseract config is a different cache entry
+    other = make_processor(cache, tesseract_config='--oem 1 --psm 6')
+    other.process_image(image_path)
+    assert other.backend.calls == 1
+
+    # So is a changed image
+    Image.new('L', (60, 30), 0).save(image_path)
+    processor.process_image(image_path)
+    assert processor.backend.calls == 2
+    processor.close()
+    other.close()
@@ -0,0 +1,101 @@
+"""SQLite question bank: upserts keep question ids and refresh the FTS index."""
+from pathlib import Path
+
+import pytest
+
+from faa_test_parser import QuestionBankDB, process_folders_to_csv
+
+QUESTIONS = {
+    1: ('What does VOR stand for?', ['VHF omnidirectional range', 'Visual orientation radio', 'None']),
+    2: ('What is density altitude?', ['Pressure altitude corrected for temperature', 'True altitude', 'MSL']),
+}
+ANSWERS = {1: ('A', 'VHF omnidirectional range'), 2: ('A', 'Pressure altitude corrected for temperature')}
+IMAGES = {1: Path('q1.png'), 2: Path('q2.png')}
+
+
+@pytest.fixture
+def bank(tmp_path):
+    db = QuestionBankDB(tmp_path / 'bank.db')
+    yield db
+    db.close()
+
+
+def question_ids(bank):
+    return dict(bank.conn.execute("SELECT number, id FROM questions"))
+
+
+def test_reexport_keeps_question_ids(bank, tmp_path):
+    folder = tmp_path / 'test-1'
+    bank.upsert_test(folder, QUESTIONS, ANSWERS, IMAGES)
+    first_ids = question_ids(bank)
+
+    edited = {**QUESTIONS, 2: ('What is density altitude, exactly?', QUESTIONS[2][1])}
+    test_id = bank.upsert_test(folder, edited, ANSWERS, IMAGES)
+
+    assert question_ids(bank) == first_ids
+    assert bank.conn.execute("SELECT COUNT(*) FROM tests").fetchone()[0] == 1
+    assert bank.conn.execute("SELECT text FROM questions WHERE test_id = ? AND number = 2",
+                             (test_id,)).fetchone()[0] == 'What is density altitude, exactly?'
+
+
+def test_reexport_replaces_options_and_answers(bank, tmp_path):
+    folder = tmp_path / 'test-1'
+    bank.upsert_test(folder, QUESTIONS, ANSWERS, IMAGES)
+
+    edited = {**QUESTIONS, 1: (QUESTIONS[1][0], ['VHF omnidirectional range', 'Other'])}
+    bank.upsert_test(folder, edited, {**ANSWERS, 1: ('B', 'Other')}, IMAGES)
+
+    q1 = question_ids(bank)[1]
+    assert bank.conn.execute("SELECT letter, text FROM options WHERE question_id = ? ORDER BY letter",
+                             (q1,)).fetchall() == [('A', 'VHF omnidirectional range'), ('B', 'Other')]
+    assert bank.conn.execute("SELECT letter, text FROM answers WHERE question_id = ?",
+                             (q1,)).fetchall() == [('B', 'Other')]
+
+
+def test_fts_follows_edits(bank, tmp_path):
+    folder = tmp_path / 'test-1'
+    bank.upsert_test(folder, QUESTIONS, ANSWERS, IMAGES)
+    assert [row[1] for row in bank.search('density')] == [2]
+
+    edited = {**QUESTIONS, 2: ('What is pressure altitude?', ['Indicated altitude at 29.92', 'MSL', 'AGL'])}
+    bank.upsert_test(folder, edited, ANSWERS, IMAGES)
+
+    assert bank.search('density') == []
+    assert [row[1] for row in bank.search('pressure')] == [2]
+    # Options are indexed too, and the old ones are gone
+    assert [row[1] for row in bank.search('"29.92"')] == [2]
+    assert bank.search('temperature') == []
+
+
+def test_removed_questions_are_deleted_everywhere(bank, tmp_path):
+    folder = tmp_path / 'test-1'
+    bank.upsert_test(folder, QUESTIONS, ANSWERS, IMAGES)
+
+    bank.upsert_test(folder, {1: QUESTIONS[1]}, {1: ANSWERS[1]}, {1: IMAGES[1]})
+
+    assert list(question_ids(bank)) == [1]
+    assert bank.search('density') == []
+    assert bank.conn.execute("SELECT COUNT(*) FROM options").fetchone()[0] == 3
+    assert bank.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] == 1
+
+
+def test_tests_are_kept_apart(bank, tmp_path):
+    bank.upsert_test(tmp_path / 'test-1', QUESTIONS, ANSWERS, IMAGES)
+    bank.upsert_test(tmp_path / 'test-2', {1: QUESTIONS[2]}, {1: ANSWERS[2]}, {1: IMAGES[1]})
+
+    assert sorted((name, number) for name, number, _, _ in bank.search('density')) == [
+        ('test-1', 2), ('test-2', 1)]
+    assert bank.search('VOR')[0][3] == 'VHF omnidirectional range'
+
+
+def test_export_fills_the_bank(make_folder, processor, bank):
+    folder = make_folder('test-1', {'q1.png': 'alpha', 'q2.png': 'beta'})
+    process_folders_to_csv([folder], processor, question_bank=bank)
+    first_ids = question_ids(bank)
+
+    (folder / 'q2.png').write_text('gamma')
+    process_folders_to_csv([folder], processor, question_bank=bank)
+
+    assert question_ids(bank) == first_ids
+    assert [row[1] for row in bank.search('gamma')] == [2]
+    assert bank.search('beta') == []
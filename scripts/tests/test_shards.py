@@ -0,0 +1,101 @@
+"""Sharded export: stable shard assignment and a merge that can be re-run."""
+import csv
+from pathlib import Path
+
+from faa_test_parser import MANIFEST_NAME, SHARD_MANIFEST_NAME, merge_shards, process_folders_to_shard, shard_of
+
+IMAGES = {f"q{i}.png": f"content {i}" for i in range(1, 9)}
+
+
+def read_rows(folder_path):
+    with open(folder_path / 'questions.csv', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def run_all_shards(folders, processor, count):
+    for index in range(1, count + 1):
+        process_folders_to_shard(folders, processor, (index, count))
+
+
+def test_shard_depends_only_on_folder_and_file_name():
+    names = [f"q{i}.png" for i in range(1, 50)]
+    here = [shard_of(Path('/mnt/a/test-1') / name, 4) for name in names]
+    elsewhere = [shard_of(Path('D:/archive/test-1') / name, 4) for name in names]
+    assert here == elsewhere
+    assert set(here) == {1, 2, 3, 4}
+    assert here != [shard_of(Path('/mnt/a/test-2') / name, 4) for name in names]
+
+
+def test_single_shard_takes_everything():
+    assert {shard_of(Path('t') / f"q{i}.png", 1) for i in range(20)} == {1}
+
+
+def test_shards_partition_the_images(make_folder, processor):
+    folder = make_folder('test-1', IMAGES)
+    seen_by_shard = []
+    for index in range(1, 4):
+        processor.seen.clear()
+        paths = process_folders_to_shard([folder], processor, (index, 3))
+        assert paths == [folder / SHARD_MANIFEST_NAME.format(index=index, count=3)]
+        seen_by_shard.append(set(processor.seen))
+        assert all(shard_of(folder / name, 3) == index for name in processor.seen)
+    assert set().union(*seen_by_shard) == set(IMAGES)
+    assert sum(len(seen) for seen in seen_by_shard) == len(IMAGES)
+
+
+def test_retried_shard_only_ocrs_failed_images(make_folder, processor):
+    folder = make_folder('test-1', IMAGES)
+    mine = [name for name in IMAGES if shard_of(folder / name, 2) == 1]
+    processor.fail.add(mine[0])
+    process_folders_to_shard([folder], processor, (1, 2))
+
+    processor.fail.clear()
+    processor.seen.clear()
+    process_folders_to_shard([folder], processor, (1, 2))
+    assert processor.seen == [mine[0]]
+
+
+def test_merge_matches_unsharded_rows(make_folder, processor):
+    folder = make_folder('test-1', IMAGES)
+    run_all_shards([folder], processor, 3)
+
+    assert merge_shards(folder) == folder / 'questions.csv'
+    rows = read_rows(folder)
+    assert [row[0] for row in rows] == [f"What is content {i}?" for i in range(1, 9)]
+    assert rows[2] == ['What is content 3?', 'content 3 one | content 3 two | content 3 three', 'Answer 3']
+    assert (folder / MANIFEST_NAME).exists()
+
+
+def test_merge_is_idempotent(make_folder, processor):
+    folder = make_folder('test-1', IMAGES)
+    run_all_shards([folder], processor, 3)
+    merge_shards(folder)
+    first = (folder / 'questions.csv').read_bytes()
+    shard_manifests = {path.name: path.read_bytes() for path in folder.glob('questions.shard-*')}
+
+    merge_shards(folder)
+
+    assert (folder / 'questions.csv').read_bytes() == first
+    assert {path.name: path.read_bytes() for path in folder.glob('questions.shard-*')} == shard_manifests
+
+
+def test_merge_fills_missing_shard_with_empty_rows(make_folder, processor):
+    folder = make_folder('test-1', IMAGES)
+    process_folders_to_shard([folder], processor, (1, 2))
+    merge_shards(folder)
+
+    rows = read_rows(folder)
+    for name, row in zip(IMAGES, rows):
+        if shard_of(folder / name, 2) == 1:
+            assert row[0].startswith('What is')
+        else:
+            assert row[:2] == ['', '']
+
+    # Once the missing shard arrives, merging again completes the CSV
+    process_folders_to_shard([folder], processor, (2, 2))
+    merge_shards(folder)
+    assert all(row[0].startswith('What is') for row in read_rows(folder))
+
+
+def test_merge_without_shards_returns_none(make_folder):
+    assert merge_shards(make_folder('test-1', IMAGES)) is None
@@ -0,0 +1,127 @@
+"""tesserocr engine pool: failed engine starts and close() during a call never wedge the pool."""
+import threading
+from types import SimpleNamespace
+
+from PIL import Image
+import pytest
+
+import faa_test_parser
+from faa_test_parser import TesserocrBackend
+
+
+class StubEngine:
+    """Stands in for tesserocr.PyTessBaseAPI; 'bad' variables fail like an unknown -c option."""
+
+    started = []
+
+    def __init__(self, **kwargs):
+        self.ended = False
+        StubEngine.started.append(self)
+
+    def SetVariable(self, name, value):
+        if name == 'bad':
+            raise RuntimeError(f"unknown variable {name}")
+
+    def SetImage(self, image):
+        pass
+
+    def GetUTF8Text(self):
+        return 'text'
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        self.ended = True
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    StubEngine.started = []
+    monkeypatch.setattr(faa_test_parser, 'tesserocr', SimpleNamespace(PyTessBaseAPI=StubEngine))
+    backend = TesserocrBackend(pool_size=1)
+    backend.ENGINE_RECHECK = 0.05
+    yield backend
+    backend.close()
+
+
+def call_with_deadline(function, *args, deadline=5.0):
+    """Run function in a thread and fail the test instead of hanging if it blocks."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = function(*args)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(deadline)
+    assert not thread.is_alive(), "call blocked waiting for an engine"
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def test_engines_are_reused(backend):
+    image = Image.new('L', (10, 10))
+    assert backend.image_to_string(image, '--psm 6') == 'text'
+    assert backend.image_to_string(image, '--psm 6') == 'text'
+    assert len(StubEngine.started) == 1
+
+
+def test_failed_engine_start_frees_its_slot(backend):
+    image = Image.new('L', (10, 10))
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match='unknown variable'):
+            call_with_deadline(backend.image_to_string, image, '-c bad=1')
+    assert backend._created['-c bad=1'] == 0
+    # Other configs are unaffected
+    assert call_with_deadline(backend.image_to_string, image, '--psm 6') == 'text'
+
+
+def test_waiter_recovers_when_engine_start_fails(backend, monkeypatch):
+    image = Image.new('L', (10, 10))
+    starting = threading.Event()
+    release = threading.Event()
+    attempts = []
+
+    def create_engine(config):
+        attempts.append(config)
+        if len(attempts) == 1:
+            starting.set()
+            release.wait(5)
+            raise RuntimeError("tessdata not found")
+        return StubEngine()
+
+    def failing_call():
+        with pytest.raises(RuntimeError, match='tessdata'):
+            backend.image_to_string(image, '')
+
+    monkeypatch.setattr(backend, '_create_engine', create_engine)
+    first = threading.Thread(target=failing_call)
+    first.start()
+    starting.wait(5)
+    # The only slot is taken by the failing start, so this call has to wait for it
+    threading.Timer(0.1, release.set).start()
+    assert call_with_deadline(backend.image_to_string, image, '') == 'text'
+    first.join(5)
+    assert len(attempts) == 2
+
+
+def test_close_during_call_ends_the_engine(backend):
+    image = Image.new('L', (10, 10))
+    backend.image_to_string(image, '')
+    engine = StubEngine.started[0]
+
+    def close_mid_call():
+        backend.close()
+        return 'text'
+
+    engine.GetUTF8Text = close_mid_call
+    assert call_with_deadline(backend.image_to_string, image, '') == 'text'
+    assert engine.ended
+    # Calls after close() start a new engine
+    assert call_with_deadline(backend.image_to_string, image, '') == 'text'
+    assert len(StubEngine.started) == 2
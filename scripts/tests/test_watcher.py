@@ -0,0 +1,112 @@
+"""Watch mode: the polling backend only reports files once they stop changing."""
+import threading
+import time
+
+import pytest
+
+from faa_test_parser import FolderWatcher, is_watched_file
+
+SETTLE = 0.2
+INTERVAL = 0.02
+
+
+@pytest.fixture
+def folder(make_folder):
+    return make_folder('test-1', {'q1.png': 'alpha'})
+
+
+@pytest.fixture
+def watcher(folder):
+    watcher = FolderWatcher([folder], settle=SETTLE, interval=INTERVAL, poll=True)
+    yield watcher
+    watcher.close()
+
+
+def test_watched_files(tmp_path):
+    assert is_watched_file(tmp_path / 'answer-key.md')
+    assert is_watched_file(tmp_path / 'q1.PNG')
+    assert not is_watched_file(tmp_path / 'notes.txt')
+    assert not is_watched_file(tmp_path / 'questions.csv')
+
+
+def test_polling_is_used_when_asked(watcher):
+    assert watcher.inotify is None
+
+
+def test_new_file_is_reported_after_settle_time(folder, watcher):
+    (folder / 'q2.png').write_text('beta')
+    written = time.monotonic()
+
+    assert watcher.wait() == {folder: [folder / 'q2.png']}
+    assert time.monotonic() - written >= SETTLE
+    assert watcher.pending == {}
+
+
+def test_file_still_being_written_is_reported_once_when_done(folder, watcher):
+    path = folder / 'q2.png'
+
+    def write_slowly():
+        with open(path, 'w') as f:
+            for _ in range(10):
+                f.write('x' * 100)
+                f.flush()
+                time.sleep(SETTLE / 4)
+
+    writer = threading.Thread(target=write_slowly)
+    writer.start()
+    try:
+        changes = watcher.wait()
+        done = writer.is_alive()
+    finally:
+        writer.join()
+
+    assert not done
+    assert changes == {folder: [path]}
+    assert watcher.snapshots[folder][path][0] == 1000
+
+
+def test_rapid_writes_are_coalesced(folder, watcher):
+    for i in range(5):
+        (folder / 'q1.png').write_text('alpha' + '!' * (i + 1))
+        watcher._rescan()
+        time.sleep(INTERVAL)
+
+    assert watcher.wait() == {folder: [folder / 'q1.png']}
+    assert watcher.pending == {}
+
+
+def test_deleted_image_is_reported(folder, watcher):
+    (folder / 'q1.png').unlink()
+
+    assert watcher.wait() == {folder: [folder / 'q1.png']}
+    assert folder / 'q1.png' not in watcher.snapshots[folder]
+
+
+def test_answer_key_change_is_reported(folder, watcher):
+    (folder / 'answer-key.md').write_text('Answer 1\nAnswer 2\n')
+
+    assert watcher.wait() == {folder: [folder / 'answer-key.md']}
+
+
+def test_unwatched_files_are_ignored(folder, watcher):
+    (folder / 'notes.txt').write_text('scratch')
+    (folder / 'questions.csv').write_text('Question,Answers,Correct Answer\n')
+    watcher._rescan()
+    assert watcher.pending == {}
+
+    (folder / 'q2.png').write_text('beta')
+    assert watcher.wait() == {folder: [folder / 'q2.png']}
+
+
+def test_file_gone_before_settling_is_not_reported(folder, watcher):
+    (folder / 'q2.png').write_text('beta')
+    watcher._rescan()
+    (folder / 'q2.png').unlink()
+    time.sleep(SETTLE * 1.5)
+
+    # The deletion restarts the settle time, after which nothing differs from the snapshot
+    assert watcher._settled() == {}
+    assert folder / 'q2.png' in watcher.pending
+    time.sleep(SETTLE * 1.5)
+    assert watcher._settled() == {}
+    assert watcher.pending == {}